@@ -0,0 +1,68 @@
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from repositories import UserRepo
+
+CHUNK_SIZE = 1000
+
+
+def _hash_batch(passwords, method):
+    return [generate_password_hash(p, method=method) for p in passwords]
+
+
+def hash_passwords(passwords, method, workers=0):
+    """Hash ``passwords`` in order, across ``workers`` processes when > 1.
+
+    Hashing dominates provisioning time (scrypt is deliberately slow).
+    """
+    if workers <= 1 or len(passwords) < 2 * workers:
+        return _hash_batch(passwords, method)
+    size = -(-len(passwords) // workers)
+    batches = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    hashes = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in executor.map(_hash_batch, batches, [method] * len(batches)):
+            hashes.extend(batch)
+    return hashes
+
+
+def provision(conn, hash_method, username_format="emp{emp_id}", department=None, workers=0):
+    """Create logins for every active employee that has none.
+
+    Usernames come from ``username_format`` and passwords are random; the
+    caller has to hand them out. Accounts are inserted in multi-row batches
+    of CHUNK_SIZE, one transaction each. Employees that registered, or whose
+    username was taken, in the meantime are reported as skipped.
+    """
+    started = time.perf_counter()
+    users = UserRepo(conn)
+    pending = users.employees_without_login(department)
+    conn.commit()
+
+    created, skipped = [], []
+    for i in range(0, len(pending), CHUNK_SIZE):
+        chunk = pending[i:i + CHUNK_SIZE]
+        passwords = [secrets.token_urlsafe(9) for _ in chunk]
+        hashes = hash_passwords(passwords, hash_method, workers)
+        rows = [(emp_id, username_format.format(emp_id=emp_id), pw_hash, role)
+                for (emp_id, role), pw_hash in zip(chunk, hashes)]
+        try:
+            done = set(users.create_many(rows))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        for (emp_id, username, _, role), password in zip(rows, passwords):
+            if emp_id in done:
+                created.append({"emp_id": emp_id, "username": username, "password": password, "role": role})
+            else:
+                skipped.append({"emp_id": emp_id, "username": username})
+
+    return {
+        "created": created,
+        "skipped": skipped,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
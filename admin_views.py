@@ -0,0 +1,691 @@
+"""Admin pages, the /api/v1 JSON twins of their tables, analytics and exports."""
+import hmac
+import io
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+from flask import (Blueprint, current_app, render_template, request, redirect, url_for, flash, session,
+                   jsonify, Response, stream_with_context, abort)
+
+import analytics
+import api
+import attendance_summary
+import auth
+import dashboard
+import exports
+import page_cache
+import punches
+import search
+import sessions
+from repositories import (EmployeeFilter, EmployeeRepo, UserRepo, AttendanceRepo, SalaryRepo,
+                          month_bounds)
+from web import (cache, db_pool, search_index, resources, get_db_connection, get_read_connection, get_stream_connection,
+                 tables_changed, cached_page, get_cached_employee_count, set_cached_employee_count,
+                 archived_years, login_required, admin_required, api_admin_required, import_punches,
+                 ensure_journal_drainer, run_payroll)
+
+bp = Blueprint("admin", __name__)
+
+# ---------- Report Queries ----------
+# Shared by the admin pages and their CSV/XLSX exports
+def parse_attendance_filters(args):
+    attendance_date = args.get("date", "").strip() or date.today().isoformat()
+    emp_id_raw = args.get("emp_id", "").strip()
+    filters = {
+        "attendance_date": attendance_date,
+        "emp_id": int(emp_id_raw) if emp_id_raw.isdigit() else None,
+    }
+    try:
+        sel = datetime.strptime(attendance_date, "%Y-%m-%d").date()
+    except ValueError:
+        sel = date.today()
+    filters["archived"] = sel.year in archived_years("attendance")
+    if filters["emp_id"]:
+        # Employee mode covers the whole month of the selected date
+        filters["range_start"], filters["range_end"] = month_bounds(sel.year, sel.month)
+    return filters
+
+def parse_salary_filters(args):
+    raw_month = args.get("month")
+    emp_id_raw = args.get("emp_id", "").strip()
+
+    # Parse month input
+    if raw_month:
+        try:
+            dt = datetime.strptime(raw_month, "%Y-%m")  # expects YYYY-MM
+        except ValueError:
+            dt = datetime.today()
+    else:
+        dt = datetime.today()
+
+    emp_id = int(emp_id_raw) if emp_id_raw.isdigit() else None
+    return dt, emp_id
+
+def parse_amount(raw):
+    # Empty -> None; raises ValueError for anything but a non-negative amount
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    try:
+        amount = Decimal(raw)
+    except ArithmeticError:
+        raise ValueError(raw) from None
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(raw)
+    return amount.quantize(Decimal("0.01"))
+
+# ---------- Admin Listings ----------
+# Template context for the admin tables, shared by the pages and /api/v1
+def employee_listing(args):
+    conn = get_read_connection()
+    employees_repo = EmployeeRepo(conn)
+
+    # Get filter parameters
+    department = args.get("department", "").strip()
+    q = args.get("q", "").strip()
+    sort = args.get("sort", "asc").lower()
+    page = args.get("page", 1, type=int)
+    if page < 1: 
+        page = 1
+
+    after_id = args.get("after_id", type=int)
+    before_id = args.get("before_id", type=int)
+
+    limit = 10
+    offset = (page - 1) * limit
+    # Name searches page through at most SEARCH_MAX_RESULTS matches
+    max_results = current_app.config["SEARCH_MAX_RESULTS"]
+    truncated = False
+
+    # Build query conditions
+    if q and q.isdigit():
+        flt = EmployeeFilter(emp_id=int(q), department=department)
+    elif q and search.indexable(q):
+        search_index.ensure_loaded(conn)
+        ids = search_index.search(q)
+        truncated = len(ids) > max_results
+        flt = EmployeeFilter(ids=ids[:max_results], department=department)
+    elif q:
+        # One- and two-letter words have no trigrams: match them inside names with LIKE
+        flt = EmployeeFilter(name_like=q, department=department)
+    else:
+        flt = EmployeeFilter(department=department)
+
+    # Get total count (cached per filter, the COUNT(*) is the slow part)
+    count_key = (q, department)
+    total_records = get_cached_employee_count(count_key)
+    if total_records is None:
+        total_records = employees_repo.count(flt)
+        set_cached_employee_count(count_key, total_records)
+    total_pages = (total_records + limit - 1) // limit
+
+    descending = sort == "descending"
+    prev_cursor = next_cursor = None
+
+    if after_id is not None or before_id is not None:
+        # Keyset mode: seek by primary key instead of skipping OFFSET rows
+        forward = after_id is not None
+        pivot = after_id if forward else before_id
+        # Walking backwards runs the query in the opposite order, then flips it
+        scan_desc = descending if forward else not descending
+        employees = employees_repo.seek(flt, pivot, scan_desc, limit + 1)
+        has_more = len(employees) > limit
+        employees = employees[:limit]
+        if not forward:
+            employees.reverse()
+
+        if employees:
+            if forward or has_more:
+                prev_cursor = employees[0].emp_id
+            if has_more or not forward:
+                next_cursor = employees[-1].emp_id
+        page = None
+        page_range = range(0)
+    else:
+        employees = employees_repo.page(flt, descending, limit, offset)
+
+        # Numbered links only for shallow pages, deeper pages continue by cursor
+        max_page = min(total_pages, current_app.config["EMPLOYEE_MAX_OFFSET_PAGE"])
+        if page >= max_page and page < total_pages and employees:
+            next_cursor = employees[-1].emp_id
+
+        window = 2
+        start_page = max(1, min(page, max_page) - window)
+        end_page = min(max_page, page + window)
+        page_range = range(start_page, end_page + 1)
+        total_pages = max_page if total_pages > max_page else total_pages
+
+    return dict(
+        employees=employees,
+        total_records=total_records,
+        total_pages=total_pages,
+        current_page=page,
+        page_range=page_range,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
+        q=q,
+        department=department,
+        sort=sort,
+        truncated=truncated,
+        max_results=max_results
+    )
+
+def attendance_listing(args):
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    filters = parse_attendance_filters(args)
+    attendance_date = filters["attendance_date"]
+    emp_id = filters["emp_id"]
+
+    attendance = AttendanceRepo(conn).list(filters)
+
+    if emp_id:
+        # Summary counts come from the monthly rollup
+        summary = attendance_summary.get_monthly_totals(cursor, emp_id, filters["range_start"])
+        cursor.close()
+        return dict(
+            attendance=attendance,
+            mode="employee",
+            archived=filters["archived"],
+            attendance_date=attendance_date,
+            emp_id=emp_id,
+            month_start=filters["range_start"].isoformat(),
+            month_end=(filters["range_end"] - timedelta(days=1)).isoformat(),
+            present_days=summary["present_days"],
+            leave_days=summary["leave_days"],
+            absent_days=summary["absent_days"]
+        )
+
+    # Totals for the date come from the daily rollup
+    totals = attendance_summary.get_daily_totals(cursor, attendance_date)
+    cursor.close()
+    return dict(
+        attendance=attendance,
+        mode="date",
+        archived=filters["archived"],
+        attendance_date=attendance_date,
+        present_count=totals["present_count"],
+        leave_count=totals["leave_count"],
+        absent_count=totals["absent_count"]
+    )
+
+def salary_listing(args):
+    salaries_repo = SalaryRepo(get_read_connection())
+
+    dt, emp_id = parse_salary_filters(args)
+    archived = dt.year in archived_years("salaries")
+    page = args.get("page", 1, type=int)
+    if page < 1:
+        page = 1
+    limit = current_app.config["SALARY_PAGE_SIZE"]
+
+    totals = salaries_repo.month_totals(dt.year, dt.month, emp_id, archived)
+    total_pages = max(1, (totals.rows + limit - 1) // limit)
+    page = min(page, total_pages)
+
+    salaries = salaries_repo.month_page(dt.year, dt.month, emp_id, limit, (page - 1) * limit, archived)
+
+    return dict(
+        salaries=salaries,
+        totals=totals,
+        counts=totals,
+        month_display=dt.strftime("%b-%Y"),  # display like Feb-2026
+        month_value=dt.strftime("%Y-%m"),
+        current_page=page,
+        total_pages=total_pages,
+        emp_id=emp_id,
+        archived=archived
+    )
+
+# ---------- Admin Routes ----------
+@bp.route("/admin/dashboard")
+@login_required
+@admin_required
+def admin_dashboard():
+    counters = dashboard.get_dashboard_counters(cache, get_db_connection(),
+                                                ttl=current_app.config["DASHBOARD_CACHE_TTL"])
+    return render_template("admin/dashboard.html", 
+                          total_employees=counters["total_employees"],
+                          UnPaidEmplyees=counters["unpaid_salaries"], 
+                          PresentEmployees=counters["present_today"])
+
+@bp.route("/admin/employees")
+@login_required
+@admin_required
+@cached_page("employees")
+def admin_employees():
+    return render_template("admin/employees.html", **employee_listing(request.args))
+
+@bp.route("/admin/employees/autocomplete")
+@login_required
+@admin_required
+def admin_employee_autocomplete():
+    q = request.args.get("q", "").strip()
+    limit = min(request.args.get("limit", 10, type=int), 50)
+    if not q or limit < 1:
+        return jsonify([])
+
+    search_index.ensure_loaded(get_db_connection())
+    suggestions = [search_index.describe(emp_id) for emp_id in search_index.search(q, limit=limit)]
+    return jsonify([s for s in suggestions if s])
+
+@bp.route("/admin/employees/new", methods=["GET", "POST"])
+@login_required
+@admin_required
+def admin_employee_new():
+    if request.method == "POST":
+        conn = get_db_connection()
+        try:
+            base_salary = parse_amount(request.form.get("base_salary"))
+        except ValueError:
+            flash("Base salary must be a non-negative amount", "warning")
+            return render_template("admin/employee_form.html")
+        emp_id = EmployeeRepo(conn).create(
+            request.form.get("first_name"),
+            request.form.get("last_name"),
+            request.form.get("email"),
+            request.form.get("phone"),
+            request.form.get("department"),
+            request.form.get("role"),
+            base_salary)
+        conn.commit()
+        search_index.upsert(emp_id, request.form.get("first_name"),
+                            request.form.get("last_name"), request.form.get("department"))
+        tables_changed("employees")
+        dashboard.record_employee_created(cache)
+        flash("Employee added successfully", "success")
+        return redirect(url_for("admin.admin_employees"))
+    
+    return render_template("admin/employee_form.html")
+
+@bp.route("/admin/employees/<int:employee_id>/edit", methods=["GET", "POST"])
+@login_required
+@admin_required
+def admin_employee_edit(employee_id):
+    conn = get_db_connection()
+    employees_repo = EmployeeRepo(conn)
+    
+    if request.method == "POST":
+        try:
+            base_salary = parse_amount(request.form.get("base_salary"))
+        except ValueError:
+            flash("Base salary must be a non-negative amount", "warning")
+            return redirect(url_for("admin.admin_employee_edit", employee_id=employee_id))
+        employees_repo.update(
+            employee_id,
+            request.form.get("first_name"),
+            request.form.get("last_name"),
+            request.form.get("email"),
+            request.form.get("phone"),
+            request.form.get("department"),
+            request.form.get("role"),
+            base_salary)
+        conn.commit()
+        # Role changes must reach the next login, not wait out the cached row,
+        # and the employee's open sessions
+        auth.forget_login_users(cache, *UserRepo(conn).usernames_for_employee(employee_id))
+        sessions.employee_changed(cache, current_app.config["SESSION_REVALIDATE_SECONDS"], employee_id)
+        search_index.upsert(employee_id, request.form.get("first_name"),
+                            request.form.get("last_name"), request.form.get("department"))
+        # Names also appear on the attendance and salary pages
+        tables_changed(*page_cache.TABLES)
+        flash("Employee updated successfully", "success")
+        return redirect(url_for("admin.admin_employees"))
+    
+    employee = employees_repo.get(employee_id)
+    
+    if not employee:
+        flash("Employee not found", "warning")
+        return redirect(url_for("admin.admin_employees"))
+        
+    return render_template("admin/employee_form.html", employee=employee)
+
+@bp.route("/admin/employees/<int:employee_id>/delete", methods=["POST"])
+@login_required
+@admin_required
+def admin_employee_delete(employee_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    attendance_summary.forget_employee(cursor, employee_id)
+    cursor.close()
+    usernames = UserRepo(conn).usernames_for_employee(employee_id)
+    deleted = EmployeeRepo(conn).delete(employee_id)
+    conn.commit()
+    auth.forget_login_users(cache, *usernames)
+    sessions.employee_changed(cache, current_app.config["SESSION_REVALIDATE_SECONDS"], employee_id)
+    search_index.remove(employee_id)
+    # Attendance and salary rows went with the employee
+    tables_changed(*page_cache.TABLES)
+    if deleted:
+        dashboard.record_employee_deleted(cache)
+    flash("Employee deleted successfully", "success")
+    return redirect(url_for("admin.admin_employees"))
+
+@bp.route("/admin/attendance")
+@login_required
+@admin_required
+@cached_page("employees", "attendance")
+def admin_attendance():
+    return render_template("admin/attendance.html", **attendance_listing(request.args))
+
+@bp.route("/admin/salary")
+@login_required
+@admin_required
+@cached_page("employees", "salaries")
+def admin_salary():
+    return render_template("admin/salary.html", **salary_listing(request.args))
+
+
+# ---------- JSON API ----------
+# /api/v1 mirrors the admin pages' filters; ?fields=a,b picks row fields and
+# ?compact=1 sends rows as arrays. app.js uses it to patch table bodies.
+@bp.app_errorhandler(api.FieldError)
+def api_field_error(exc):
+    return jsonify(error=str(exc)), 400
+
+@bp.after_request
+def compress_api_response(response):
+    config = current_app.config
+    if config["API_COMPRESSION"] and request.path.startswith("/api/"):
+        api.compress(response, request.accept_encodings, config["API_COMPRESSION_MIN_SIZE"])
+    return response
+
+def api_rows(rows, fields, **extra):
+    payload = api.rows_payload(rows, fields, compact=request.args.get("compact") == "1")
+    return jsonify(**extra, **payload)
+
+@bp.route("/api/v1/employees")
+@api_admin_required
+@cached_page("employees")
+def api_employees():
+    fields = api.parse_fields(request.args.get("fields"), api.EMPLOYEE_FIELDS)
+    listing = employee_listing(request.args)
+    page_range = listing["page_range"]
+    return api_rows(
+        listing["employees"], fields,
+        total=listing["total_records"],
+        page=listing["current_page"],
+        pages=listing["total_pages"],
+        page_range=[page_range[0], page_range[-1]] if page_range else None,
+        prev_cursor=listing["prev_cursor"],
+        next_cursor=listing["next_cursor"],
+        truncated=listing["truncated"],
+        max_results=listing["max_results"],
+        filters={"q": listing["q"], "department": listing["department"], "sort": listing["sort"]}
+    )
+
+@bp.route("/api/v1/attendance")
+@api_admin_required
+@cached_page("employees", "attendance")
+def api_attendance():
+    fields = api.parse_fields(request.args.get("fields"), api.ATTENDANCE_FIELDS)
+    listing = attendance_listing(request.args)
+    if listing["mode"] == "employee":
+        summary_keys = ("present_days", "leave_days", "absent_days", "month_start", "month_end")
+    else:
+        summary_keys = ("present_count", "leave_count", "absent_count")
+    return api_rows(
+        listing["attendance"], fields,
+        mode=listing["mode"],
+        archived=listing["archived"],
+        filters={"date": listing["attendance_date"], "emp_id": listing.get("emp_id")},
+        summary={k: api.json_value(listing[k]) for k in summary_keys}
+    )
+
+@bp.route("/api/v1/salaries")
+@api_admin_required
+@cached_page("employees", "salaries")
+def api_salaries():
+    fields = api.parse_fields(request.args.get("fields"), api.SALARY_FIELDS)
+    listing = salary_listing(request.args)
+    totals = listing["totals"]
+    return api_rows(
+        listing["salaries"], fields,
+        month=listing["month_value"],
+        month_display=listing["month_display"],
+        archived=listing["archived"],
+        page=listing["current_page"],
+        pages=listing["total_pages"],
+        filters={"month": listing["month_value"], "emp_id": listing["emp_id"]},
+        summary={
+            "rows": totals.rows,
+            "paid": totals.paid,
+            "unpaid": totals.unpaid,
+            "base": api.json_value(totals.base),
+            "bonus": api.json_value(totals.bonus),
+            "deductions": api.json_value(totals.deductions),
+            "net": api.json_value(totals.net),
+        }
+    )
+
+@bp.route("/api/v1/dashboard")
+@api_admin_required
+def api_dashboard():
+    return jsonify(dashboard.get_dashboard_counters(cache, get_db_connection(),
+                                                    ttl=current_app.config["DASHBOARD_CACHE_TTL"]))
+
+
+# ---------- Attendance Analytics ----------
+# The heatmap page is a shell; its data comes from the cached JSON endpoint
+def parse_analytics_filters(args):
+    today = date.today()
+    def parse_day(name, default):
+        try:
+            return datetime.strptime(args.get(name, ""), "%Y-%m-%d").date()
+        except ValueError:
+            return default
+    end = parse_day("end", today)
+    start = parse_day("start", end - timedelta(days=current_app.config["ANALYTICS_DEFAULT_DAYS"] - 1))
+    if start > end:
+        start, end = end, start
+    # Longer ranges are cut at the start
+    start = max(start, end - timedelta(days=current_app.config["ANALYTICS_MAX_DAYS"] - 1))
+    emp_id_raw = args.get("emp_id", "").strip()
+    return {
+        "start": start,
+        "end": end,
+        "department": args.get("department", "").strip(),
+        "emp_id": int(emp_id_raw) if emp_id_raw.isdigit() else None,
+    }
+
+@bp.route("/admin/attendance/analytics")
+@login_required
+@admin_required
+def admin_attendance_analytics():
+    return render_template("admin/analytics.html", **parse_analytics_filters(request.args))
+
+@bp.route("/api/v1/analytics/attendance")
+@api_admin_required
+@cached_page("employees", "attendance")
+def api_attendance_analytics():
+    filters = parse_analytics_filters(request.args)
+    start, end = filters["start"], filters["end"]
+    archived = any(year in archived_years("attendance") for year in range(start.year, end.year + 1))
+
+    started = time.perf_counter()
+    columns, employees = analytics.load(get_read_connection(), start, end + timedelta(days=1),
+                                        filters["department"], filters["emp_id"], archived)
+    load_seconds = time.perf_counter() - started
+
+    config = current_app.config
+    hours, minutes = (int(part) for part in config["ANALYTICS_WORKDAY_START"].split(":"))
+    on_time = hours * 3600 + minutes * 60 + config["ANALYTICS_LATE_GRACE_MINUTES"] * 60
+    result = analytics.summarize(columns, employees, start, (end - start).days + 1, on_time)
+    result["load_seconds"] = round(load_seconds, 4)
+    result["filters"] = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "department": filters["department"],
+        "emp_id": filters["emp_id"],
+    }
+    return jsonify(result)
+
+
+# ---------- Report Exports ----------
+# Rows are streamed from an unbuffered cursor straight into the response, so
+# memory stays flat however large the month is; totals are summed on the way.
+def export_response(fmt, filename, header, rows):
+    writer, mimetype = exports.WRITERS[fmt]
+    return Response(
+        stream_with_context(writer(header, rows)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+def export_format():
+    fmt = request.args.get("format", "csv").lower()
+    return fmt if fmt in exports.WRITERS else None
+
+@bp.route("/admin/salary/export")
+@login_required
+@admin_required
+def admin_salary_export():
+    fmt = export_format()
+    if fmt is None:
+        flash("Unsupported export format", "danger")
+        return redirect(url_for("admin.admin_salary"))
+
+    dt, emp_id = parse_salary_filters(request.args)
+    salary_query, params = SalaryRepo.month_query(dt.year, dt.month, emp_id,
+                                                  archived=dt.year in archived_years("salaries"))
+
+    conn = get_stream_connection()
+
+    def rows():
+        totals = [Decimal(0)] * 4
+        count = 0
+        for r in exports.stream_query(conn, salary_query, params):
+            amounts = [Decimal(str(r[col])) for col in ("base_salary", "bonus", "deductions", "net")]
+            totals = [t + a for t, a in zip(totals, amounts)]
+            count += 1
+            yield [r["emp_id"], f"{r['first_name']} {r['last_name']}".strip(), *amounts,
+                   r["paid_status"], r["created_at"]]
+        yield ["TOTAL", f"{count} rows", *totals, "", ""]
+
+    header = ["emp_id", "employee", "base_salary", "bonus", "deductions", "net", "paid_status", "created_at"]
+    return export_response(fmt, f"salary-{dt.strftime('%Y-%m')}", header, rows())
+
+@bp.route("/admin/attendance/export")
+@login_required
+@admin_required
+def admin_attendance_export():
+    fmt = export_format()
+    if fmt is None:
+        flash("Unsupported export format", "danger")
+        return redirect(url_for("admin.admin_attendance"))
+
+    filters = parse_attendance_filters(request.args)
+    query, params = AttendanceRepo.list_query(filters)
+    conn = get_stream_connection()
+
+    def rows():
+        counts = {}
+        for r in exports.stream_query(conn, query, params):
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+            yield [r["date"], r["emp_id"], r["full_name"], r["check_in"], r["check_out"], r["status"]]
+        for status in ("PRESENT", "LEAVE", "ABSENT"):
+            yield ["TOTAL", "", status, "", "", counts.get(status, 0)]
+
+    if filters["emp_id"]:
+        filename = f"attendance-{filters['emp_id']}-{filters['range_start'].strftime('%Y-%m')}"
+    else:
+        filename = f"attendance-{filters['attendance_date']}"
+    header = ["date", "emp_id", "employee", "check_in", "check_out", "status"]
+    return export_response(fmt, filename, header, rows())
+
+
+@bp.route("/admin/attendance/import", methods=["POST"])
+@login_required
+@admin_required
+def admin_attendance_import():
+    # Accepts {"events": [...]} JSON or a multipart CSV upload named "file"
+    try:
+        if request.is_json:
+            payload = request.get_json(silent=True) or {}
+            rows = payload.get("events")
+            if not isinstance(rows, list):
+                return jsonify({"error": "Expected a JSON object with an 'events' list"}), 400
+        elif "file" in request.files:
+            stream = io.TextIOWrapper(request.files["file"].stream, encoding="utf-8-sig")
+            rows = list(punches.read_csv(stream))
+        else:
+            return jsonify({"error": "Send JSON events or a CSV file"}), 400
+    except (punches.PunchError, UnicodeDecodeError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    max_rows = current_app.config["PUNCH_IMPORT_MAX_ROWS"]
+    if len(rows) > max_rows:
+        return jsonify({"error": f"At most {max_rows} events per request"}), 413
+
+    report = import_punches(rows)
+    return jsonify(report)
+
+@bp.route("/admin/attendance/journal")
+@login_required
+@admin_required
+def admin_attendance_journal():
+    journal = resources().journal
+    if journal is None:
+        return jsonify({"error": "Write-behind is disabled (set ATTENDANCE_WRITE_BEHIND=1)"}), 404
+    drainer = ensure_journal_drainer()
+    return jsonify(drainer.stats() if drainer else journal.stats())
+
+@bp.route("/admin/salary/payroll-run", methods=["POST"])
+@login_required
+@admin_required
+def admin_payroll_run():
+    import payroll
+
+    raw_month = request.form.get("month", "")
+    try:
+        period = payroll.parse_period(raw_month)
+    except payroll.PayrollError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for("admin.admin_salary"))
+
+    report = run_payroll(period, force=bool(request.form.get("force")))
+    skipped = sum(1 for d in report["departments"].values() if d["status"] == "skipped")
+    flash(f"Payroll {report['period']}: {report['employees']} salaries generated"
+          f"{f', {skipped} department(s) already done' if skipped else ''}", "success")
+    if report["missing_base_salary"]:
+        flash(f"{report['missing_base_salary']} active employee(s) have no base salary and were skipped", "warning")
+    return redirect(url_for("admin.admin_salary", month=report["period"]))
+
+@bp.route("/admin/db/pool")
+@login_required
+@admin_required
+def admin_db_pool_stats():
+    stats = db_pool.stats()
+    replicas = resources().replicas
+    if replicas is not None:
+        stats["replicas"] = replicas.stats()
+    return jsonify(stats)
+
+@bp.route("/admin/db/slow-queries")
+@login_required
+@admin_required
+def admin_db_slow_queries():
+    metrics = resources().metrics
+    if metrics is None:
+        return jsonify({"error": "Instrumentation is disabled (set METRICS_ENABLED=1)"}), 404
+    return jsonify(metrics.slow_queries())
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    # Prometheus scrape: bearer METRICS_TOKEN, or a logged-in admin
+    config = current_app.config
+    metrics = resources().metrics
+    if metrics is None or not config["METRICS_ENABLED"]:
+        abort(404)
+    authorization = request.headers.get("Authorization", "")
+    token_ok = bool(config["METRICS_TOKEN"]) and hmac.compare_digest(authorization, f"Bearer {config['METRICS_TOKEN']}")
+    if not token_ok and session.get("role") != "admin":
+        abort(403)
+    journal = resources().journal
+    journal_stats = None
+    if journal is not None:
+        drainer = resources().journal_drainer
+        journal_stats = drainer.stats() if drainer else journal.stats()
+    return Response(metrics.render(db_pool.stats(), journal_stats), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,262 @@
+"""Attendance analytics over a date range, computed on columnar arrays.
+
+``load`` reads the range in one query as five integer columns (employee,
+day offset, check-in and check-out seconds, status code) and ``summarize``
+turns them into the JSON behind the attendance heatmap: daily counts,
+per-employee punctuality, average hours and absence streaks, and weekly
+department trends. With NumPy installed every metric is one vectorised
+pass (bincount over the columns); without it the same numbers come from a
+plain Python loop.
+
+An absence streak is a run of consecutive attendance records marked
+absent; days without a record (weekends) neither break nor extend it.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+import pymysql
+
+# NumPy is optional (the pure Python path gives the same results) and costs
+# a noticeable share of app startup, so it is imported on the first load or
+# summarize instead of with this module.
+_UNSET = object()
+np = _UNSET
+
+
+def numpy():
+    """The numpy module, or None when it is not installed."""
+    global np
+    if np is _UNSET:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+    return np
+
+PRESENT, ABSENT, LEAVE = 1, 2, 3
+NO_TIME = -1
+
+_LOAD_SQL = """
+    SELECT a.emp_id,
+           DATEDIFF(a.attendance_date, %s) AS day,
+           COALESCE(TIME_TO_SEC(a.check_in), -1) AS check_in,
+           COALESCE(TIME_TO_SEC(a.check_out), -1) AS check_out,
+           CASE a.status WHEN 'present' THEN 1 WHEN 'absent' THEN 2 ELSE 3 END AS status
+    FROM {table} a
+"""
+
+
+@dataclass(slots=True)
+class Columns:
+    """One entry per attendance row; NumPy arrays when available, else lists."""
+    emp: object
+    day: object
+    check_in: object
+    check_out: object
+    status: object
+
+    def __len__(self):
+        return len(self.emp)
+
+
+def load(conn, start, end, department=None, emp_id=None, archived=False, batch_size=50000):
+    """``(Columns, {emp_id: (name, department)})`` for ``start <= date < end``.
+
+    ``archived`` also reads attendance_archive (years moved out by
+    ``flask db archive``). Rows are streamed from an unbuffered cursor.
+    """
+    where = " WHERE a.attendance_date >= %s AND a.attendance_date < %s"
+    params = [start, end]
+    join = ""
+    if department:
+        join = " JOIN employees e ON e.emp_id = a.emp_id"
+        where += " AND e.department = %s"
+        params.append(department)
+    if emp_id:
+        where += " AND a.emp_id = %s"
+        params.append(emp_id)
+    tables = ("attendance", "attendance_archive") if archived else ("attendance",)
+    sql = " UNION ALL ".join(_LOAD_SQL.format(table=t) + join + where for t in tables)
+
+    numpy()
+    batches = []
+    with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(sql, [start, *params] * len(tables))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batches.append(np.array(rows, dtype=np.int64) if np is not None else rows)
+
+    if np is not None:
+        data = np.concatenate(batches) if batches else np.empty((0, 5), dtype=np.int64)
+        columns = Columns(*(data[:, i] for i in range(5)))
+    else:
+        flat = [row for batch in batches for row in batch]
+        columns = Columns(*(list(col) for col in zip(*flat))) if flat else Columns([], [], [], [], [])
+
+    sql = "SELECT emp_id, CONCAT(first_name, ' ', last_name) AS name, department FROM employees"
+    params = []
+    if emp_id:
+        sql += " WHERE emp_id = %s"
+        params.append(emp_id)
+    elif department:
+        sql += " WHERE department = %s"
+        params.append(department)
+    with conn.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(sql, params)
+        employees = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    return columns, employees
+
+
+def summarize(columns, employees, start, days, on_time_seconds):
+    """Heatmap and per-employee/department figures for ``days`` days from ``start``.
+
+    A check-in at or before ``on_time_seconds`` past midnight is on time.
+    """
+    started = time.perf_counter()
+    if numpy() is not None:
+        daily, per_employee, per_department = _summarize_numpy(columns, employees, start, days, on_time_seconds)
+    else:
+        daily, per_employee, per_department = _summarize_python(columns, employees, start, days, on_time_seconds)
+
+    week_zero = start - timedelta(days=start.weekday())
+    result = {
+        "start": start.isoformat(),
+        "end": (start + timedelta(days=days - 1)).isoformat(),
+        "rows": len(columns),
+        "engine": "numpy" if np is not None else "python",
+        "daily": {
+            "fields": ["date", "present", "absent", "leave"],
+            "rows": [[(start + timedelta(days=d)).isoformat(), *counts] for d, counts in enumerate(daily)],
+        },
+        "employees": [],
+        "departments": [],
+    }
+    for emp_id, (present, absent, leave, timed, on_time, worked, worked_seconds, longest, current) in sorted(per_employee.items()):
+        name, department = employees.get(emp_id, ("", ""))
+        result["employees"].append({
+            "emp_id": emp_id,
+            "name": name,
+            "department": department,
+            "present": present,
+            "absent": absent,
+            "leave": leave,
+            "on_time_rate": round(on_time / timed, 3) if timed else None,
+            "avg_hours": round(worked_seconds / worked / 3600, 2) if worked else None,
+            "longest_absence_streak": longest,
+            "current_absence_streak": current,
+        })
+    for department, weeks in sorted(per_department.items()):
+        trend = []
+        for week, (present, total, worked, worked_seconds) in sorted(weeks.items()):
+            trend.append({
+                "week_start": (week_zero + timedelta(weeks=week)).isoformat(),
+                "attendance_rate": round(present / total, 3) if total else None,
+                "avg_hours": round(worked_seconds / worked / 3600, 2) if worked else None,
+            })
+        result["departments"].append({"department": department, "weeks": trend})
+    result["compute_seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _summarize_numpy(columns, employees, start, days, on_time_seconds):
+    emp, day, check_in, check_out, status = (columns.emp, columns.day, columns.check_in,
+                                             columns.check_out, columns.status)
+    daily = np.bincount(day * 4 + status, minlength=days * 4).reshape(days, 4)[:, 1:]
+    ids, inv = np.unique(emp, return_inverse=True)
+    n = len(ids)
+
+    counts = np.bincount(inv * 4 + status, minlength=n * 4).reshape(n, 4)
+    timed = (status == PRESENT) & (check_in != NO_TIME)
+    worked = timed & (check_out > check_in)
+    seconds = check_out - check_in
+    timed_n = np.bincount(inv[timed], minlength=n)
+    on_time_n = np.bincount(inv[timed & (check_in <= on_time_seconds)], minlength=n)
+    worked_n = np.bincount(inv[worked], minlength=n)
+    worked_sum = np.bincount(inv[worked], weights=seconds[worked], minlength=n)
+
+    # Absence runs over each employee's records in date order
+    order = np.lexsort((day, inv))
+    e = inv[order]
+    absent = status[order] == ABSENT
+    same = np.r_[False, e[1:] == e[:-1]]
+    run_start = absent & ~(np.r_[False, absent[:-1]] & same)
+    run_id = np.cumsum(run_start)
+    lengths = np.bincount(run_id[absent], minlength=int(run_id[-1]) + 1) if len(e) else np.zeros(1, dtype=np.int64)
+    longest = np.zeros(n, dtype=np.int64)
+    np.maximum.at(longest, e[run_start], lengths[1:])
+    last = np.r_[~same[1:], True] if len(e) else np.zeros(0, dtype=bool)
+    current = np.zeros(n, dtype=np.int64)
+    ends_absent = last & absent
+    current[e[ends_absent]] = lengths[run_id[ends_absent]]
+
+    per_employee = {
+        int(ids[i]): (int(counts[i, PRESENT]), int(counts[i, ABSENT]), int(counts[i, LEAVE]),
+                      int(timed_n[i]), int(on_time_n[i]), int(worked_n[i]), float(worked_sum[i]),
+                      int(longest[i]), int(current[i]))
+        for i in range(n)
+    }
+
+    names = sorted({dept for _, dept in employees.values()} | {""})
+    dept_index = {dept: i for i, dept in enumerate(names)}
+    emp_dept = np.array([dept_index[employees.get(int(i), ("", ""))[1]] for i in ids], dtype=np.int64)
+    week = (day + start.weekday()) // 7
+    weeks = int(week.max()) + 1 if len(week) else 0
+    cell = emp_dept[inv] * weeks + week
+    size = len(names) * weeks
+    present_n = np.bincount(cell[status == PRESENT], minlength=size)
+    total_n = np.bincount(cell, minlength=size)
+    dept_worked_n = np.bincount(cell[worked], minlength=size)
+    dept_worked_sum = np.bincount(cell[worked], weights=seconds[worked], minlength=size)
+    per_department = {}
+    for c in np.flatnonzero(total_n):
+        dept, w = divmod(int(c), weeks)
+        per_department.setdefault(names[dept], {})[w] = (
+            int(present_n[c]), int(total_n[c]), int(dept_worked_n[c]), float(dept_worked_sum[c]))
+    return daily.tolist(), per_employee, per_department
+
+
+def _summarize_python(columns, employees, start, days, on_time_seconds):
+    daily = [[0, 0, 0] for _ in range(days)]
+    stats = {}
+    per_department = {}
+    offset = start.weekday()
+    order = sorted(range(len(columns)), key=lambda i: (columns.emp[i], columns.day[i]))
+    for i in order:
+        emp_id, day, check_in, check_out, status = (columns.emp[i], columns.day[i], columns.check_in[i],
+                                                    columns.check_out[i], columns.status[i])
+        daily[day][status - 1] += 1
+        # present, absent, leave, timed, on time, worked, worked seconds, longest run, current run
+        s = stats.get(emp_id)
+        if s is None:
+            s = stats[emp_id] = [0, 0, 0, 0, 0, 0, 0.0, 0, 0]
+        s[status - 1] += 1
+        worked = False
+        if status == PRESENT and check_in != NO_TIME:
+            s[3] += 1
+            if check_in <= on_time_seconds:
+                s[4] += 1
+            if check_out > check_in:
+                worked = True
+                s[5] += 1
+                s[6] += check_out - check_in
+        if status == ABSENT:
+            s[8] += 1
+            s[7] = max(s[7], s[8])
+        else:
+            s[8] = 0
+
+        department = employees.get(emp_id, ("", ""))[1]
+        cell = per_department.setdefault(department, {}).setdefault((day + offset) // 7, [0, 0, 0, 0.0])
+        cell[0] += status == PRESENT
+        cell[1] += 1
+        if worked:
+            cell[2] += 1
+            cell[3] += check_out - check_in
+
+    per_employee = {emp_id: (*s[:6], float(s[6]), s[7], s[8]) for emp_id, s in stats.items()}
+    per_department = {dept: {week: tuple(cell) for week, cell in weeks.items()}
+                      for dept, weeks in per_department.items()}
+    return daily, per_employee, per_department
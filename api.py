@@ -0,0 +1,80 @@
+"""Helpers for the /api/v1 JSON endpoints.
+
+Rows are selected down to the ``fields`` a client asks for and, with
+``compact=1``, sent as arrays under a single ``fields`` header instead of
+repeating every key per row. Responses are compressed with brotli when the
+``brotli`` package is installed and the client accepts it, else gzip.
+"""
+import gzip
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+EMPLOYEE_FIELDS = ("emp_id", "first_name", "last_name", "phone", "department", "role")
+ATTENDANCE_FIELDS = ("date", "emp_id", "full_name", "check_in", "check_out", "status")
+SALARY_FIELDS = ("emp_id", "first_name", "last_name", "full_name", "base_salary", "bonus",
+                 "deductions", "net", "paid_status")
+
+
+class FieldError(ValueError):
+    pass
+
+
+def parse_fields(raw, available):
+    """``fields=a,b`` as a tuple in the order given; all of ``available`` when empty."""
+    if not raw:
+        return available
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise FieldError(f"Unknown field(s): {', '.join(unknown)}; choose from {', '.join(available)}")
+    return fields or available
+
+
+def json_value(value):
+    if isinstance(value, Decimal):
+        return str(value)  # exact, money columns keep their two decimals
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        # MySQL TIME columns come back as timedelta
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return value
+
+
+def rows_payload(rows, fields, compact=False):
+    """``{"fields": [...], "rows": [...]}``, rows as dicts or, compact, as arrays."""
+    values = [[json_value(getattr(row, f)) for f in fields] for row in rows]
+    if not compact:
+        values = [dict(zip(fields, v)) for v in values]
+    return {"fields": list(fields), "rows": values}
+
+
+def compress(response, accept_encodings, min_size=500):
+    """Compress ``response`` in place when it is big enough and the client accepts it."""
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    if brotli is not None and accept_encodings["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accept_encodings["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        return response
+    # The bytes changed, so only a weak validator still holds (as nginx does)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
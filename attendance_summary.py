@@ -0,0 +1,158 @@
+from datetime import date
+
+# status -> (daily column, monthly column)
+STATUS_COLUMNS = {
+    "present": ("present_count", "present_days"),
+    "absent": ("absent_count", "absent_days"),
+    "leave": ("leave_count", "leave_days"),
+}
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def record_status(cursor, emp_id, day, status, delta=1):
+    """Add ``delta`` attendance rows of ``status`` to both rollups.
+
+    Runs on the caller's cursor so it commits together with the attendance write.
+    """
+    daily_col, monthly_col = STATUS_COLUMNS[status]
+    cursor.execute(f"""
+        INSERT INTO attendance_daily_summary (attendance_date, {daily_col})
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE {daily_col} = {daily_col} + VALUES({daily_col})
+    """, (day, delta))
+    cursor.execute(f"""
+        INSERT INTO attendance_monthly_summary (emp_id, month_start, {monthly_col})
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE {monthly_col} = {monthly_col} + VALUES({monthly_col})
+    """, (emp_id, month_start(day), delta))
+
+
+def record_statuses(cursor, rows):
+    """Batch form of record_status() for ``(emp_id, day, status)`` rows."""
+    daily, monthly = {}, {}
+    for emp_id, day, status in rows:
+        daily[(day, status)] = daily.get((day, status), 0) + 1
+        key = (emp_id, month_start(day), status)
+        monthly[key] = monthly.get(key, 0) + 1
+
+    for status, (daily_col, monthly_col) in STATUS_COLUMNS.items():
+        day_rows = [(day, n) for (day, s), n in daily.items() if s == status]
+        if day_rows:
+            cursor.executemany(f"""
+                INSERT INTO attendance_daily_summary (attendance_date, {daily_col})
+                VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE {daily_col} = {daily_col} + VALUES({daily_col})
+            """, day_rows)
+        month_rows = [(emp_id, month, n) for (emp_id, month, s), n in monthly.items() if s == status]
+        if month_rows:
+            cursor.executemany(f"""
+                INSERT INTO attendance_monthly_summary (emp_id, month_start, {monthly_col})
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE {monthly_col} = {monthly_col} + VALUES({monthly_col})
+            """, month_rows)
+
+
+def _attendance_rows(cursor, where=(), params=()):
+    """``(sql, params)`` of a derived table with every attendance row, live or archived.
+
+    ``where`` clauses apply to both halves. Archived years are read from
+    ``attendance_archive`` only, so rows an interrupted ``archive_year`` left
+    in ``attendance`` are not counted twice.
+    """
+    cursor.execute("SELECT year FROM archived_years WHERE table_name = 'attendance'")
+    years = sorted(int(row["year"]) for row in cursor.fetchall())
+    live_where, live_params = list(where), list(params)
+    for year in years:
+        live_where.append("NOT (attendance_date >= %s AND attendance_date < %s)")
+        live_params += [date(year, 1, 1), date(year + 1, 1, 1)]
+    live_filter = f"WHERE {' AND '.join(live_where)}" if live_where else ""
+    archive_filter = f"WHERE {' AND '.join(where)}" if where else ""
+    sql = f"""(
+        SELECT emp_id, attendance_date, status FROM attendance {live_filter}
+        UNION ALL
+        SELECT emp_id, attendance_date, status FROM attendance_archive {archive_filter}
+    )"""
+    return sql, live_params + list(params)
+
+
+def forget_employee(cursor, emp_id):
+    # The monthly rows cascade with the employee; the daily totals have to be
+    # reduced by hand, archived dates included
+    rows, params = _attendance_rows(cursor, ["emp_id = %s"], [emp_id])
+    cursor.execute(f"""
+        UPDATE attendance_daily_summary d
+        JOIN (
+            SELECT attendance_date,
+                   SUM(status = 'present') AS present_count,
+                   SUM(status = 'absent') AS absent_count,
+                   SUM(status = 'leave') AS leave_count
+            FROM {rows} r
+            GROUP BY attendance_date
+        ) a ON a.attendance_date = d.attendance_date
+        SET d.present_count = d.present_count - a.present_count,
+            d.absent_count = d.absent_count - a.absent_count,
+            d.leave_count = d.leave_count - a.leave_count
+    """, params)
+
+
+def get_daily_totals(cursor, day):
+    cursor.execute("""
+        SELECT present_count, absent_count, leave_count
+        FROM attendance_daily_summary
+        WHERE attendance_date = %s
+    """, (day,))
+    row = cursor.fetchone() or {}
+    return {col: int(row.get(col) or 0) for col, _ in STATUS_COLUMNS.values()}
+
+
+def get_monthly_totals(cursor, emp_id, day):
+    cursor.execute("""
+        SELECT present_days, absent_days, leave_days
+        FROM attendance_monthly_summary
+        WHERE emp_id = %s AND month_start = %s
+    """, (emp_id, month_start(day)))
+    row = cursor.fetchone() or {}
+    return {col: int(row.get(col) or 0) for _, col in STATUS_COLUMNS.values()}
+
+
+def rebuild(conn, start=None, end=None):
+    """Recompute both rollups from ``attendance`` and ``attendance_archive`` for [start, end), or everything.
+
+    The range is widened to whole months so monthly rows are always
+    rebuilt from complete data. Returns the number of daily rows written.
+    """
+    where, params = [], []
+    if start is not None:
+        start = month_start(start)
+        where.append("attendance_date >= %s")
+        params.append(start)
+    if end is not None:
+        if end.day != 1:
+            end = date(end.year + end.month // 12, end.month % 12 + 1, 1)
+        where.append("attendance_date < %s")
+        params.append(end)
+    attendance_filter = f"WHERE {' AND '.join(where)}" if where else ""
+    month_filter = attendance_filter.replace("attendance_date", "month_start")
+
+    with conn.cursor() as cursor:
+        rows, row_params = _attendance_rows(cursor, where, params)
+        cursor.execute(f"DELETE FROM attendance_daily_summary {attendance_filter}", tuple(params))
+        cursor.execute(f"DELETE FROM attendance_monthly_summary {month_filter}", tuple(params))
+        written = cursor.execute(f"""
+            INSERT INTO attendance_daily_summary (attendance_date, present_count, absent_count, leave_count)
+            SELECT attendance_date, SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'leave')
+            FROM {rows} r
+            GROUP BY attendance_date
+        """, tuple(row_params))
+        cursor.execute(f"""
+            INSERT INTO attendance_monthly_summary (emp_id, month_start, present_days, absent_days, leave_days)
+            SELECT emp_id, DATE_FORMAT(attendance_date, '%%Y-%%m-01'),
+                   SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'leave')
+            FROM {rows} r
+            GROUP BY emp_id, DATE_FORMAT(attendance_date, '%%Y-%%m-01')
+        """, tuple(row_params))
+    conn.commit()
+    return written
@@ -0,0 +1,83 @@
+"""The check-in / check-out / absent form."""
+from datetime import datetime, date
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+
+import dashboard
+import punches
+from web import cache, resources, get_db_connection, tables_changed, login_required, ensure_journal_drainer
+
+bp = Blueprint("attendance", __name__)
+
+# ---------- General Attendance Route ----------
+JOURNAL_MESSAGES = {
+    "checkin": "Check-in received",
+    "checkout": "Check-out received",
+    "absent": "Absence received",
+}
+
+@bp.route("/attendance", methods=["GET", "POST"])
+@login_required
+def attendance():
+    if request.method == "POST":
+        emp_id = request.form.get("emp_id")
+        action = request.form.get("action")  # checkin / checkout / absent
+
+        if not emp_id:
+            flash("Employee ID is required", "warning")
+            return redirect(url_for("attendance.attendance"))
+
+        if not emp_id.strip().isdigit():
+            flash("Employee ID must be a number", "warning")
+            return redirect(url_for("attendance.attendance"))
+
+        today = date.today()
+        now_time = datetime.now().time()
+
+        journal = resources().journal
+        if journal is not None and action in punches.ACTIONS:
+            # Acknowledged once it is on local disk; duplicates and unknown IDs are settled by the drainer
+            journal.append(int(emp_id), today, None if action == "absent" else now_time, action)
+            ensure_journal_drainer()
+            flash(JOURNAL_MESSAGES[action], "success")
+            return redirect(url_for("attendance.attendance"))
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            if action == "checkin":
+                if punches.check_in(cursor, emp_id, today, now_time) == "recorded":
+                    conn.commit()
+                    tables_changed("attendance")
+                    dashboard.record_checkin(cache, today)
+                    flash("Check-in successful", "success")
+                else:
+                    flash("Attendance already marked today", "info")
+
+            elif action == "checkout":
+                outcome = punches.check_out(cursor, emp_id, today, now_time)
+                if outcome == "recorded":
+                    conn.commit()
+                    tables_changed("attendance")
+                    flash("Check-out successful", "success")
+                elif outcome == "already_checked_out":
+                    flash("Already checked out", "info")
+                else:
+                    flash("Please check-in first", "warning")
+
+            elif action == "absent":
+                if punches.mark_absent(cursor, emp_id, today) == "recorded":
+                    conn.commit()
+                    tables_changed("attendance")
+                    flash("Marked absent", "success")
+                else:
+                    flash("Attendance already exists today", "info")
+        except punches.PunchError as exc:
+            conn.rollback()
+            flash(str(exc), "warning")
+
+        cursor.close()
+        return redirect(url_for("attendance.attendance"))
+
+    return render_template("attendance/attendance.html")
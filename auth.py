@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields
+
+from werkzeug.security import generate_password_hash
+
+from repositories import LoginUser
+
+LOGIN_USER_KEY = "login:user:v3:{}"  # v3: rows carry the profile (migration 0007), no password hash
+UNKNOWN_USER = 0  # cached for usernames that do not exist
+# Everything but the hash: the cache may be a shared Redis
+CACHED_LOGIN_FIELDS = [f.name for f in fields(LoginUser) if f.name != "password_hash"]
+
+
+# ---------- Password hashing ----------
+_method_prefixes = {}
+
+
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def needs_rehash(pwhash, method):
+    """True when ``pwhash`` was made with other parameters than ``method``.
+
+    Werkzeug fills in defaults (``"pbkdf2"`` -> ``"pbkdf2:sha256:1000000"``),
+    so the configured method's full prefix is learned from one throwaway hash.
+    """
+    prefix = _method_prefixes.get(method)
+    if prefix is None:
+        prefix = generate_password_hash("", method=method).split("$", 1)[0]
+        _method_prefixes[method] = prefix
+    return pwhash.split("$", 1)[0] != prefix
+
+
+# ---------- Login lookup cache ----------
+def login_user_key(username):
+    # Exact spelling: a miss for "Admin" must never hide "admin". Entries for
+    # other spellings of a changed user simply run out their short TTL.
+    return LOGIN_USER_KEY.format(username)
+
+
+def cached_login_user(cache, username, fetch, ttl):
+    """The login row for ``username``, calling ``fetch()`` only on a cache miss.
+
+    Unknown usernames are cached too, so a burst of bad logins stays off the
+    database; registration drops that entry. Password hashes are never
+    cached: a row served from the cache has ``password_hash=None`` and the
+    caller reads the hash by ``user_id``.
+    """
+    key = login_user_key(username)
+    cached = cache.get(key)
+    if cached is not None:
+        return LoginUser(password_hash=None, **dict(zip(CACHED_LOGIN_FIELDS, cached))) if cached else None
+    user = fetch()
+    cache.set(key, [getattr(user, name) for name in CACHED_LOGIN_FIELDS] if user else UNKNOWN_USER, ttl)
+    return user
+
+
+def forget_login_users(cache, *usernames):
+    if usernames:
+        cache.delete(*[login_user_key(u) for u in usernames])
+
+
+# ---------- Rate limiting ----------
+class TokenBucketLimiter:
+    """In-process token buckets: ``per_minute`` tokens refill per key, up to ``burst``.
+
+    At most ``max_keys`` buckets are kept (least recently used go first), so a
+    flood of distinct keys cannot grow memory without bound.
+    """
+
+    def __init__(self, per_minute, burst, max_keys=10000):
+        self.rate = per_minute / 60.0
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, tokens=1):
+        """Take ``tokens`` from ``key``'s bucket; returns 0 or the seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            level, updated = self._buckets.pop(key, (self.burst, now))
+            level = min(self.burst, level + (now - updated) * self.rate)
+            if level >= tokens:
+                level -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens - level) / self.rate if self.rate else float("inf")
+            self._buckets[key] = (level, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
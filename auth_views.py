@@ -0,0 +1,103 @@
+"""Login, registration and logout."""
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session
+from werkzeug.security import check_password_hash
+
+import auth
+import sessions
+from repositories import UserRepo
+from web import cache, resources, get_db_connection
+
+bp = Blueprint("auth", __name__)
+
+# ---------- Authentication Routes ----------
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        username = request.form.get("username", "").strip()
+        password = request.form.get("password", "").strip()
+
+        if not username or not password:
+            flash("All fields are required", "warning")
+            return redirect(url_for("auth.login"))
+
+        if current_app.config["LOGIN_RATE_LIMIT_ENABLED"]:
+            wait = (resources().login_ip_limiter.consume(request.remote_addr or "-")
+                    or resources().login_user_limiter.consume(username.lower()))
+            if wait:
+                flash(f"Too many login attempts. Try again in {int(wait) + 1} seconds.", "danger")
+                return render_template("auth/login.html"), 429
+
+        user = auth.cached_login_user(cache, username, lambda: UserRepo(get_db_connection()).find_for_login(username),
+                                      current_app.config["LOGIN_CACHE_TTL"])
+        if user and user.status == "active" and user.password_hash is None:
+            user.password_hash = UserRepo(get_db_connection()).password_hash(user.user_id)
+        
+        if user and user.status == "active" and user.password_hash and check_password_hash(user.password_hash, password):
+            if auth.needs_rehash(user.password_hash, current_app.config["PASSWORD_HASH_METHOD"]):
+                rehash_password(user, password)
+            sessions.regenerate(session)
+            sessions.store_snapshot(session, user)
+
+            if user.role == "admin":
+                return redirect(url_for("admin.admin_dashboard"))
+            elif user.role == "staff":
+                return redirect(url_for("staff.staff_dashboard"))
+            else:
+                flash("Invalid role. Contact administrator.", "warning")
+                return redirect(url_for("auth.login"))
+        
+        flash("Invalid username or password", "danger")
+        return redirect(url_for("auth.login"))
+
+    return render_template("auth/login.html")
+
+def rehash_password(user, password):
+    # Hash parameters changed since this password was set: upgrade it while we have the plain text
+    conn = get_db_connection()
+    UserRepo(conn).replace_password_hash(user.user_id, user.password_hash,
+                                         auth.hash_password(password, current_app.config["PASSWORD_HASH_METHOD"]))
+    conn.commit()
+    auth.forget_login_users(cache, user.username)
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        emp_id = request.form.get("emp_id", "").strip()
+        username = request.form.get("username", "").strip()
+        password = request.form.get("password", "")
+
+        if not emp_id or not username or not password:
+            flash("All fields are required", "warning")
+            return redirect(url_for("auth.register"))
+
+        if not emp_id.isdigit():
+            flash("Invalid or inactive Employee ID", "warning")
+            return redirect(url_for("auth.register"))
+
+        # One INSERT ... SELECT; the unique keys on users decide the duplicates
+        conn = get_db_connection()
+        outcome = UserRepo(conn).register(int(emp_id), username,
+                                          auth.hash_password(password, current_app.config["PASSWORD_HASH_METHOD"]))
+        conn.commit()
+
+        if outcome == "inactive_employee":
+            flash("Invalid or inactive Employee ID", "warning")
+            return redirect(url_for("auth.register"))
+        if outcome == "employee_has_account":
+            flash("Account already exists for this Employee ID", "info")
+            return redirect(url_for("auth.login"))
+        if outcome == "username_taken":
+            flash("Username already taken", "warning")
+            return redirect(url_for("auth.register"))
+
+        auth.forget_login_users(cache, username)
+        flash("Account created successfully", "success")
+        return redirect(url_for("auth.login"))
+
+    return render_template("auth/register.html")
+
+@bp.route("/logout")
+def logout():
+    session.clear()
+    flash("You have been logged out successfully", "success")
+    return redirect(url_for("auth.login"))
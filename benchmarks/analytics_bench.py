@@ -0,0 +1,84 @@
+"""Attendance analytics benchmark.
+
+    python benchmarks/analytics_bench.py --rows 1000000
+
+Times analytics.summarize() on synthetic columns, with NumPy (when it is
+installed) and with the pure Python fallback, and checks both agree. The
+database side (streaming the rows out of MySQL) is not included.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+
+DEPARTMENTS = ("hr", "sales", "it", "finance", "operations")
+START = date(2026, 1, 1)
+
+
+def synthetic_columns(rows, days, seed=42):
+    """About ``rows`` records: one per employee per weekday of ``days``."""
+    rng = random.Random(seed)
+    weekdays = [d for d in range(days) if (START.weekday() + d) % 7 < 5]
+    employees = max(1, rows // len(weekdays))
+    emp, day, check_in, check_out, status = [], [], [], [], []
+    for emp_id in range(1, employees + 1):
+        for d in weekdays:
+            roll = rng.random()
+            emp.append(emp_id)
+            day.append(d)
+            if roll < 0.9:
+                start = 8 * 3600 + rng.randrange(0, 5400)
+                status.append(analytics.PRESENT)
+                check_in.append(start)
+                check_out.append(start + rng.randrange(7 * 3600, 10 * 3600) if roll < 0.88 else analytics.NO_TIME)
+            else:
+                status.append(analytics.ABSENT if roll < 0.96 else analytics.LEAVE)
+                check_in.append(analytics.NO_TIME)
+                check_out.append(analytics.NO_TIME)
+    names = {e: (f"Employee {e}", DEPARTMENTS[e % len(DEPARTMENTS)]) for e in range(1, employees + 1)}
+    return analytics.Columns(emp, day, check_in, check_out, status), names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    columns, employees = synthetic_columns(args.rows, args.days)
+    print(f"{len(columns):,} rows, {len(employees):,} employees, {args.days} days")
+    on_time = 9 * 3600 + 5 * 60
+
+    numpy = analytics.numpy()
+    engines = [("numpy", numpy)] if numpy is not None else []
+    engines.append(("python", None))
+    results = {}
+    for name, module in engines:
+        analytics.np = module
+        data = columns
+        if module is not None:
+            data = analytics.Columns(*(module.asarray(col, dtype=module.int64) for col in
+                                       (columns.emp, columns.day, columns.check_in, columns.check_out, columns.status)))
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = analytics.summarize(data, employees, START, args.days, on_time)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {k: result[k] for k in ("daily", "employees", "departments")}
+        print(f"{name:<7} best {best:.3f}s  {len(columns) / best:,.0f} rows/s")
+    analytics.np = numpy
+
+    if len(results) > 1 and results["numpy"] != results["python"]:
+        raise SystemExit("numpy and python results differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Index check for the admin attendance and salary reports (MySQL only).
+
+    python -m benchmarks.explain_indexes                  # DB_* from config/.env
+    python -m benchmarks.explain_indexes --scale 100k     # seed first if the DB is empty
+
+Runs EXPLAIN on the queries behind admin_attendance and admin_salary, exactly
+as the repositories build them, and exits 1 unless each one reads its table
+through the index from migrations/0002_attendance_salary_indexes.sql (and not
+with a full scan). The optimizer only prefers an index once a table has rows
+to choose from, so an empty database is seeded first.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness  # noqa: E402
+from benchmarks import seed as seeding  # noqa: E402
+
+
+def sample_values(conn):
+    """A day, an employee and a month that exist in the data."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT MAX(attendance_date) AS day FROM attendance")
+        day = cursor.fetchone()["day"]
+        cursor.execute("SELECT emp_id, created_at FROM salaries ORDER BY salary_id DESC LIMIT 1")
+        salary = cursor.fetchone()
+    if day is None or salary is None:
+        raise SystemExit("No attendance or salary rows to explain; seed the database first.")
+    return day, salary["emp_id"], salary["created_at"]
+
+
+def checks(day, emp_id, month):
+    """``(name, sql, params, table alias, expected key)`` for every report query."""
+    from repositories import AttendanceRepo, SalaryRepo
+
+    by_date = {"emp_id": None, "attendance_date": day, "archived": False}
+    date_sql, date_params = AttendanceRepo.list_query(by_date)
+    salary_sql, salary_params = SalaryRepo.month_query(month.year, month.month, emp_id, limit=50)
+    return [
+        ("admin_attendance (day)", date_sql, date_params, "a", "idx_attendance_date_status"),
+        ("admin_salary (employee month)", salary_sql, salary_params, "s", "idx_salaries_emp_created"),
+    ]
+
+
+def explain(conn, sql, params, alias):
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = cursor.fetchall()
+    for row in plan:
+        if row["table"] == alias:
+            return row
+    raise SystemExit(f"EXPLAIN has no row for table {alias!r}: {plan}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the report queries use their indexes.")
+    parser.add_argument("--scale", default="100k", help="Attendance rows to seed if the DB is empty.")
+    args = parser.parse_args()
+
+    conn = harness.connect_backend("mysql", None)
+    if not seeding.is_seeded(conn):
+        print("Seeding an empty database")
+        seeding.seed(conn, seeding.parse_scale(args.scale))
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE TABLE attendance, salaries")
+        cursor.fetchall()
+
+    problems = []
+    print(f"{'query':<32}{'type':<8}{'key':<30}{'rows':>8}")
+    for name, sql, params, alias, expected in checks(*sample_values(conn)):
+        row = explain(conn, sql, params, alias)
+        print(f"{name:<32}{row['type']:<8}{row['key'] or '-':<30}{row['rows']:>8}")
+        if row["type"] == "ALL":
+            problems.append(f"{name}: full scan of {alias}")
+        if row["key"] != expected:
+            problems.append(f"{name}: uses {row['key'] or 'no index'}, expected {expected}")
+    conn.close()
+
+    for problem in problems:
+        print(f"index check failed: {problem}", file=sys.stderr)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
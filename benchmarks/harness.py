@@ -0,0 +1,196 @@
+"""Backends, clients and statistics shared by the benchmark scripts."""
+import http.cookiejar
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import sqlite_db  # noqa: E402
+
+
+# ---------- Backends ----------
+def connect_backend(backend, db_path, metrics=None):
+    """A single connection to the benchmark database, schema up to date."""
+    if backend == "sqlite":
+        sqlite_db.create_schema(db_path)
+        return sqlite_db.connection_class(metrics)(db_path)
+
+    import pymysql
+    import migrate
+    from config import Config
+
+    conn = pymysql.connect(host=Config.DB_HOST, port=Config.DB_PORT, user=Config.DB_USER,
+                           password=Config.DB_PASSWORD, database=Config.DB_NAME,
+                           cursorclass=Config.DB_CURSORCLASS)
+    migrate.upgrade(conn)
+    return conn
+
+
+def app_resources(app):
+    """The per-process pools and caches of an app from ``create_app()``."""
+    from web import EXTENSION_KEY
+
+    return app.extensions[EXTENSION_KEY]
+
+
+def install_backend(app, backend, db_path, pool_size):
+    """Point the app's pool at the SQLite stand-in; MySQL uses the app's own pool."""
+    if backend != "sqlite":
+        return
+    from db import ConnectionPool
+
+    sqlite_db.create_schema(db_path)
+    resources = app_resources(app)
+    # Set before first use, so no MySQL pool is ever opened
+    resources.db_pool = ConnectionPool(
+        {"database": db_path},
+        min_size=0,
+        max_size=pool_size,
+        ping_on_checkout=False,
+        connection_class=sqlite_db.connection_class(resources.metrics),
+    )
+
+
+# ---------- Statistics ----------
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+_QUERIES = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def parse_server_timing(header):
+    """``(queries, db_ms)`` from the app's Server-Timing header, or ``(None, None)``."""
+    match = _QUERIES.search(header or "")
+    if not match:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+
+def summarize(route, latencies, elapsed, errors, queries):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "route": route,
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def print_table(results, title):
+    print(f"\n{title}")
+    print(f"{'route':<22}{'reqs':>7}{'errs':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}")
+    for r in results:
+        queries = "-" if r["queries_per_request"] is None else r["queries_per_request"]
+        print(f"{r['route']:<22}{r['requests']:>7}{r['errors']:>6}{r['rps'] or 0:>10}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{queries:>9}")
+
+
+# ---------- HTTP ----------
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time only the request itself; a 302 after a POST is a success
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Minimal cookie-keeping client for a running server."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect)
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                return resp.status, resp.headers.get("Server-Timing")
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            return exc.code, exc.headers.get("Server-Timing")
+
+
+class TestClientAdapter:
+    """Same ``request()`` shape on top of Flask's test client."""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def request(self, method, path, data=None):
+        resp = self.client.open(path, method=method, data=data)
+        resp.close()
+        return resp.status_code, resp.headers.get("Server-Timing")
+
+
+def serve(flask_app):
+    """Run the app on a threaded local server; returns ``(server, base_url)``."""
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def drive(make_client, login, scenario, requests, concurrency, rng_factory):
+    """Issue ``requests`` calls of ``scenario`` from ``concurrency`` threads.
+
+    Each thread gets its own client (logged in with ``login`` when given)
+    before the clock starts. Returns ``(latencies, elapsed, errors, queries)``.
+    """
+    clients = []
+    for worker in range(concurrency):
+        client = make_client()
+        if login:
+            login(client)
+        clients.append((client, rng_factory(worker)))
+
+    lock = threading.Lock()
+    remaining = [requests]
+    latencies, queries, errors = [], [], [0]
+
+    def work(client, rng):
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            method, path, data = scenario(rng)
+            started = time.perf_counter()
+            status, timing = client.request(method, path, data)
+            took = time.perf_counter() - started
+            count, _ = parse_server_timing(timing)
+            with lock:
+                latencies.append(took)
+                if count is not None:
+                    queries.append(count)
+                if status >= 400:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=work, args=pair) for pair in clients]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started, errors[0], queries
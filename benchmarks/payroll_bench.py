@@ -0,0 +1,62 @@
+"""Payroll computation benchmark.
+
+    python benchmarks/payroll_bench.py --employees 50000 --workers 1 2 4
+
+Times payroll.compute() on synthetic employees, inline and with a process
+pool, so PAYROLL_WORKERS / PAYROLL_BATCH_SIZE can be tuned for the host.
+The database side (one multi-row upsert per department) is not included.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import payroll  # noqa: E402
+
+
+def synthetic_rows(count, days, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for emp_id in range(1, count + 1):
+        base = Decimal(rng.randrange(250000, 1500000)) / 100
+        absent = rng.choice((0, 0, 0, 0, 1, 2, 3))
+        leave = rng.choice((0, 0, 1, 2))
+        rows.append((emp_id, base, days - absent - leave, absent, leave))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    period = date(2026, 10, 1)
+    days = payroll.working_days(period)
+    rows = synthetic_rows(args.employees, days)
+    print(f"{args.employees} employees, {days} working days, batch size {args.batch_size}")
+
+    baseline = None
+    for workers in args.workers:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = payroll.compute(rows, days, "0.05", workers=workers, batch_size=args.batch_size)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        if baseline is None:
+            baseline = results
+        elif results != baseline:
+            raise SystemExit(f"workers={workers}: results differ from workers={args.workers[0]}")
+        print(f"workers={workers:<3} best {best:.3f}s  {len(rows) / best:,.0f} employees/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Hot-route benchmark.
+
+    python -m benchmarks.routes --scale 100k                      # SQLite stand-in, fresh DB
+    python -m benchmarks.routes --backend mysql --scale 1m        # DB_* from config/.env
+    python -m benchmarks.routes --concurrency 8 --save bench.json
+    python -m benchmarks.routes --baseline bench.json             # exit 1 on regression
+    python -m benchmarks.routes --backend mysql --url http://127.0.0.1:5000 --concurrency 64
+
+Seeds a database (see benchmarks/seed.py), then drives login, attendance
+check-in, admin_employees, admin_attendance and admin_salary through the
+Flask test client and, with --concurrency > 1, through a threaded local
+HTTP server (or the server at --url, e.g. one started with serve.py on the
+same database). Reports throughput, p50/p95/p99 latency and queries per
+request (from the Server-Timing header). Also checks that concurrent
+check-ins for one employee record exactly one attendance row.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Per-request query counts come from the Server-Timing header
+os.environ.setdefault("SERVER_TIMING", "1")
+# Every benchmark client logs in from 127.0.0.1
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "0")
+# Measure rendering and queries, not cache hits (PAGE_CACHE_ENABLED=1 to compare)
+os.environ.setdefault("PAGE_CACHE_ENABLED", "0")
+
+from benchmarks import harness, seed as seeding  # noqa: E402
+
+
+def build_scenarios(ctx):
+    emp_ids = ctx["employees"]
+    first_day, days = ctx["first_day"], ctx["days"]
+    today = date.today()
+    months = sorted({(first_day + timedelta(days=d)).strftime("%Y-%m") for d in range(days)} | {today.strftime("%Y-%m")})
+    users = len(emp_ids)
+
+    def login(rng):
+        return "POST", "/login", {"username": f"bench{rng.randint(2, users)}", "password": seeding.PASSWORD}
+
+    def attendance_checkin(rng):
+        return "POST", "/attendance", {"emp_id": str(rng.choice(emp_ids)), "action": "checkin"}
+
+    def admin_employees(rng):
+        roll = rng.random()
+        if roll < 0.2:
+            return "GET", f"/admin/employees?q={rng.choice(seeding.FIRST_NAMES)}", None
+        if roll < 0.3:
+            return "GET", f"/admin/employees?department={rng.choice(seeding.DEPARTMENTS)}", None
+        return "GET", f"/admin/employees?page={rng.randint(1, 5)}", None
+
+    def admin_attendance(rng):
+        day = (first_day + timedelta(days=rng.randrange(days))).isoformat()
+        if rng.random() < 0.3:
+            return "GET", f"/admin/attendance?date={day}&emp_id={rng.choice(emp_ids)}", None
+        return "GET", f"/admin/attendance?date={day}", None
+
+    def admin_salary(rng):
+        return "GET", f"/admin/salary?month={rng.choice(months)}", None
+
+    # name -> (scenario, needs admin session)
+    return {
+        "login": (login, False),
+        "attendance_checkin": (attendance_checkin, True),
+        "admin_employees": (admin_employees, True),
+        "admin_attendance": (admin_attendance, True),
+        "admin_salary": (admin_salary, True),
+    }
+
+
+def admin_login(client):
+    status, _ = client.request("POST", "/login", {"username": seeding.ADMIN_USERNAME, "password": seeding.PASSWORD})
+    if status != 302:
+        raise SystemExit(f"Admin login failed with HTTP {status}")
+
+
+def check_duplicate_checkin(webapp, threads):
+    """Fire ``threads`` simultaneous check-ins for a fresh employee.
+
+    Exactly one attendance row and +1 in each rollup must come out of it,
+    whatever the interleaving.
+    """
+    today = date.today()
+    db_pool = harness.app_resources(webapp).db_pool
+    conn = db_pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO employees (first_name, last_name, email, phone, department, role)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, ("Race", "Check", f"race-{os.getpid()}-{random.getrandbits(32)}@example.com", "0", "it", "staff"))
+            emp_id = cursor.lastrowid
+        conn.commit()
+        before = _present_today(conn, today)
+    finally:
+        db_pool.release(conn)
+
+    clients = []
+    for _ in range(threads):
+        client = harness.TestClientAdapter(webapp)
+        admin_login(client)
+        clients.append(client)
+    barrier = threading.Barrier(threads)
+
+    def punch(client):
+        barrier.wait()
+        client.request("POST", "/attendance", {"emp_id": str(emp_id), "action": "checkin"})
+
+    workers = [threading.Thread(target=punch, args=(c,)) for c in clients]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    conn = db_pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM attendance WHERE emp_id = %s AND attendance_date = %s",
+                           (emp_id, today))
+            rows = int(cursor.fetchone()["total"])
+            cursor.execute("SELECT present_days FROM attendance_monthly_summary WHERE emp_id = %s AND month_start = %s",
+                           (emp_id, date(today.year, today.month, 1)))
+            monthly = cursor.fetchone()
+        daily_delta = _present_today(conn, today) - before
+    finally:
+        db_pool.release(conn)
+
+    monthly_days = int(monthly["present_days"]) if monthly else 0
+    return {
+        "threads": threads,
+        "attendance_rows": rows,
+        "daily_present_delta": daily_delta,
+        "monthly_present_days": monthly_days,
+        "passed": rows == 1 and daily_delta == 1 and monthly_days == 1,
+    }
+
+
+def _present_today(conn, today):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT present_count FROM attendance_daily_summary WHERE attendance_date = %s", (today,))
+        row = cursor.fetchone()
+    conn.commit()  # end the read so the next one sees other connections' commits
+    return int(row["present_count"]) if row else 0
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against a saved run, as readable lines."""
+    previous = {r["route"]: r for r in baseline.get("inprocess", [])}
+    problems = []
+    for r in results:
+        old = previous.get(r["route"])
+        if not old:
+            continue
+        if r["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            problems.append(f"{r['route']}: p95 {old['p95_ms']} -> {r['p95_ms']} ms")
+        if (r["queries_per_request"] or 0) > (old["queries_per_request"] or 0):
+            problems.append(f"{r['route']}: queries/request {old['queries_per_request']} -> {r['queries_per_request']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot routes.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--db", default=None, help="SQLite file (default: a fresh temporary file).")
+    parser.add_argument("--scale", default="1k", help="Attendance rows: 1k, 100k, 1m or a number.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP load threads (1 disables the HTTP pass).")
+    parser.add_argument("--url", default=None, help="Drive this running server instead of a local one.")
+    parser.add_argument("--routes", nargs="+", default=None, help="Only these routes.")
+    parser.add_argument("--race-threads", type=int, default=16, help="Threads for the duplicate check-in check.")
+    parser.add_argument("--save", default=None, help="Write results as JSON.")
+    parser.add_argument("--baseline", default=None, help="Fail if p95 or query counts regress against this JSON.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown vs baseline.")
+    args = parser.parse_args()
+    if args.url and args.backend != "mysql":
+        parser.error("--url needs --backend mysql: the server must see the seeded data")
+
+    from app import create_app
+
+    webapp = create_app()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="mini-erp-bench-"), "bench.sqlite3")
+    harness.install_backend(webapp, args.backend, db_path, pool_size=max(args.concurrency, args.race_threads) + 2)
+    if args.backend == "mysql":
+        conn = harness.connect_backend("mysql", None)
+    else:
+        conn = harness.connect_backend("sqlite", db_path)
+    if seeding.is_seeded(conn):
+        raise SystemExit("Database already holds benchmark data; point --db at a fresh database.")
+    print(f"Seeding {args.backend} ({db_path if args.backend == 'sqlite' else 'DB_NAME'})")
+    ctx = seeding.seed(conn, seeding.parse_scale(args.scale))
+    conn.close()
+
+    scenarios = build_scenarios(ctx)
+    names = args.routes or list(scenarios)
+    report = {"backend": args.backend, "scale": args.scale, "requests": args.requests, "inprocess": [], "http": []}
+
+    for name in names:
+        scenario, needs_admin = scenarios[name]
+        login = admin_login if needs_admin else None
+        make_client = lambda: harness.TestClientAdapter(webapp)  # noqa: E731
+        harness.drive(make_client, login, scenario, args.warmup, 1, lambda w: random.Random(w))
+        latencies, elapsed, errors, queries = harness.drive(
+            make_client, login, scenario, args.requests, 1, lambda w: random.Random(1000 + w))
+        report["inprocess"].append(harness.summarize(name, latencies, elapsed, errors, queries))
+    harness.print_table(report["inprocess"], "Flask test client, sequential")
+
+    if args.concurrency > 1:
+        if args.url:
+            server, base_url = None, args.url
+        else:
+            server, base_url = harness.serve(webapp)
+        try:
+            for name in names:
+                scenario, needs_admin = scenarios[name]
+                login = admin_login if needs_admin else None
+                latencies, elapsed, errors, queries = harness.drive(
+                    lambda: harness.HttpClient(base_url), login, scenario, args.requests,
+                    args.concurrency, lambda w: random.Random(2000 + w))
+                report["http"].append(harness.summarize(name, latencies, elapsed, errors, queries))
+        finally:
+            if server is not None:
+                server.shutdown()
+        harness.print_table(report["http"], f"HTTP, {args.concurrency} concurrent clients ({base_url})")
+
+    race = check_duplicate_checkin(webapp, args.race_threads)
+    report["duplicate_checkin"] = race
+    print(f"\nConcurrent duplicate check-in ({race['threads']} threads): "
+          f"{race['attendance_rows']} row(s), daily +{race['daily_present_delta']}, "
+          f"monthly {race['monthly_present_days']} -> {'PASS' if race['passed'] else 'FAIL'}")
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    failed = not race["passed"]
+    if args.baseline:
+        with open(args.baseline) as fh:
+            problems = compare(report["inprocess"], json.load(fh), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
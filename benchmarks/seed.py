@@ -0,0 +1,149 @@
+"""Synthetic data for the benchmarks.
+
+    python -m benchmarks.seed --backend sqlite --db /tmp/bench.sqlite3 --scale 100k
+    python -m benchmarks.seed --backend mysql --scale 1m     # uses DB_* from config/.env
+
+Scale is the number of attendance rows; employees, users and salary rows
+are derived from it. Attendance covers the days before today, so check-ins
+during the benchmark still insert. Every user's password is PASSWORD.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import attendance_summary  # noqa: E402
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEPARTMENTS = ("hr", "it", "sales", "finance", "operations", "marketing")
+FIRST_NAMES = ("Ali", "Sara", "Omar", "Ayesha", "Bilal", "Fatima", "Hamza", "Zainab", "Usman", "Hina",
+               "John", "Maria", "Wei", "Priya", "Lucas", "Emma", "Noah", "Olivia", "Yusuf", "Mei")
+LAST_NAMES = ("Khan", "Ahmed", "Malik", "Hussain", "Sheikh", "Smith", "Garcia", "Chen", "Patel", "Silva",
+              "Brown", "Rossi", "Novak", "Kim", "Haddad", "Okafor", "Ivanova", "Larsen", "Mendes", "Sato")
+ADMIN_USERNAME = "bench_admin"
+PASSWORD = "bench-pass-123"
+CHUNK = 5000
+
+
+def parse_scale(value):
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    return int(value)
+
+
+def plan(attendance_rows):
+    """Employees x days that gives roughly ``attendance_rows`` rows."""
+    employees = max(20, min(5000, attendance_rows // 250))
+    days = max(1, -(-attendance_rows // employees))
+    return employees, days
+
+
+def _insert(conn, sql, rows):
+    with conn.cursor() as cursor:
+        for i in range(0, len(rows), CHUNK):
+            cursor.executemany(sql, rows[i:i + CHUNK])
+    conn.commit()
+
+
+def is_seeded(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS total FROM users WHERE username = %s", (ADMIN_USERNAME,))
+        return cursor.fetchone()["total"] > 0
+
+
+def seed(conn, attendance_rows, seed_value=7, today=None, log=print):
+    """Insert employees, users, attendance, salaries and rebuild the rollups."""
+    rng = random.Random(seed_value)
+    today = today or date.today()
+    employee_count, days = plan(attendance_rows)
+    started = time.perf_counter()
+
+    employees = []
+    for i in range(1, employee_count + 1):
+        employees.append((
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f"bench{i}@example.com",
+            f"+92-300-{i:07d}", DEPARTMENTS[i % len(DEPARTMENTS)], "admin" if i == 1 else "staff",
+            Decimal(rng.randrange(250000, 1500000)) / 100,
+        ))
+    _insert(conn, """
+        INSERT INTO employees (first_name, last_name, email, phone, department, role, base_salary)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, employees)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT emp_id, role FROM employees WHERE email LIKE %s ORDER BY emp_id", ("bench%@example.com",))
+        emp_rows = cursor.fetchall()
+    emp_ids = [row["emp_id"] for row in emp_rows]
+    log(f"employees: {len(emp_ids)}")
+
+    # One hash for everyone: hashing is per login, not per seeded user
+    password_hash = generate_password_hash(PASSWORD)
+    users = [(emp_rows[0]["emp_id"], ADMIN_USERNAME, password_hash, "admin")]
+    users += [(row["emp_id"], f"bench{n}", password_hash, row["role"]) for n, row in enumerate(emp_rows[1:], start=2)]
+    _insert(conn, "INSERT INTO users (emp_id, username, password_hash, role) VALUES (%s, %s, %s, %s)", users)
+    log(f"users: {len(users)}")
+
+    attendance = []
+    first_day = today - timedelta(days=days)
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for emp_id in emp_ids:
+            if len(attendance) >= attendance_rows:
+                break
+            roll = rng.random()
+            if roll < 0.06:
+                attendance.append((emp_id, day, None, None, "absent"))
+            elif roll < 0.10:
+                attendance.append((emp_id, day, None, None, "leave"))
+            else:
+                check_in = timedelta(hours=8, minutes=rng.randrange(0, 90))
+                attendance.append((emp_id, day, check_in, check_in + timedelta(hours=8, minutes=rng.randrange(0, 60)), "present"))
+    _insert(conn, """
+        INSERT INTO attendance (emp_id, attendance_date, check_in, check_out, status)
+        VALUES (%s, %s, %s, %s, %s)
+    """, attendance)
+    log(f"attendance: {len(attendance)} rows over {days} days")
+
+    salaries = []
+    month = date(first_day.year, first_day.month, 1)
+    while month <= today:
+        for emp_id, employee in zip(emp_ids, employees):
+            base = employee[6]
+            salaries.append((emp_id, month.year, month, base, Decimal(rng.randrange(0, 20000)) / 100,
+                             Decimal(rng.randrange(0, 10000)) / 100, "paid" if month.month != today.month else "unpaid",
+                             datetime(month.year, month.month, 1, 9)))
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    _insert(conn, """
+        INSERT INTO salaries (emp_id, month, pay_period, base_salary, bonus, deductions, paid_status, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, salaries)
+    log(f"salaries: {len(salaries)}")
+
+    attendance_summary.rebuild(conn)
+    log(f"seeded in {time.perf_counter() - started:.1f}s")
+    return {"employees": emp_ids, "days": days, "first_day": first_day}
+
+
+def main():
+    from benchmarks.harness import connect_backend
+
+    parser = argparse.ArgumentParser(description="Seed synthetic benchmark data.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--db", default="bench.sqlite3", help="SQLite file (sqlite backend).")
+    parser.add_argument("--scale", default="1k", help="Attendance rows: 1k, 100k, 1m or a number.")
+    args = parser.parse_args()
+
+    conn = connect_backend(args.backend, args.db)
+    if is_seeded(conn):
+        raise SystemExit("Database already holds benchmark data; use a fresh database.")
+    seed(conn, parse_scale(args.scale))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""SQLite stand-in for a PyMySQL connection, for benchmarking without MySQL.
+
+Covers the SQL the hot routes use: ``%s`` parameters, ``ON DUPLICATE KEY
+UPDATE`` (rewritten to ``ON CONFLICT``), ``VALUES(col)`` and the MySQL
+functions CONCAT, IF, LEAST, GREATEST, DATE_FORMAT, TIME_FORMAT, DATEDIFF
+and TIME_TO_SEC. Rows come back as dicts (tuples for a plain ``pymysql.cursors.Cursor``) with
+DATE, TIME (as timedelta, like PyMySQL) and DECIMAL columns converted. ``UPDATE ... JOIN`` is not supported, so employee
+deletion and bulk check-out imports cannot be benchmarked on it.
+
+Numbers from this backend are useful for comparing versions of the app
+with each other, not for predicting MySQL latency.
+"""
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from decimal import Decimal
+
+import pymysql
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50),
+    email VARCHAR(100) NOT NULL UNIQUE,
+    phone VARCHAR(20),
+    department VARCHAR(50) NOT NULL,
+    role VARCHAR(10) NOT NULL DEFAULT 'staff',
+    base_salary DECIMAL(10,2),
+    status VARCHAR(10) DEFAULT 'active',
+    status_version INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS attendance (
+    attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    check_in TIME,
+    check_out TIME,
+    status VARCHAR(10) NOT NULL,
+    UNIQUE (emp_id, attendance_date)
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_date_status ON attendance (attendance_date, status);
+CREATE TABLE IF NOT EXISTS salaries (
+    salary_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id INT NOT NULL REFERENCES employees(emp_id) ON DELETE CASCADE,
+    month INT NOT NULL,
+    pay_period DATE,
+    base_salary DECIMAL(10,2) NOT NULL,
+    bonus DECIMAL(10,2) DEFAULT 0,
+    deductions DECIMAL(10,2) DEFAULT 0,
+    paid_status VARCHAR(10) DEFAULT 'unpaid',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (emp_id, pay_period)
+);
+CREATE INDEX IF NOT EXISTS idx_salaries_emp_created ON salaries (emp_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_salaries_created ON salaries (created_at);
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id INT NOT NULL UNIQUE REFERENCES employees(emp_id) ON DELETE CASCADE,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    role VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS attendance_daily_summary (
+    attendance_date DATE PRIMARY KEY,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    leave_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS attendance_monthly_summary (
+    emp_id INT NOT NULL REFERENCES employees(emp_id) ON DELETE CASCADE,
+    month_start DATE NOT NULL,
+    present_days INT NOT NULL DEFAULT 0,
+    absent_days INT NOT NULL DEFAULT 0,
+    leave_days INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (emp_id, month_start)
+);
+CREATE TABLE IF NOT EXISTS attendance_archive (
+    attendance_id INTEGER PRIMARY KEY,
+    emp_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    check_in TIME,
+    check_out TIME,
+    status VARCHAR(10) NOT NULL,
+    UNIQUE (emp_id, attendance_date)
+);
+CREATE TABLE IF NOT EXISTS salaries_archive (
+    salary_id INTEGER PRIMARY KEY,
+    emp_id INT NOT NULL,
+    month INT NOT NULL,
+    pay_period DATE,
+    base_salary DECIMAL(10,2) NOT NULL,
+    bonus DECIMAL(10,2) DEFAULT 0,
+    deductions DECIMAL(10,2) DEFAULT 0,
+    paid_status VARCHAR(10) DEFAULT 'unpaid',
+    created_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_salaries_archive_created ON salaries_archive (created_at);
+CREATE TABLE IF NOT EXISTS archived_years (
+    table_name VARCHAR(64) NOT NULL,
+    year INT NOT NULL,
+    rows_moved INT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, year)
+);
+CREATE TABLE IF NOT EXISTS payroll_runs (
+    pay_period DATE NOT NULL,
+    department VARCHAR(50) NOT NULL,
+    employees INT NOT NULL DEFAULT 0,
+    total_net DECIMAL(14,2) NOT NULL DEFAULT 0,
+    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (pay_period, department)
+);
+"""
+
+
+# ---------- Type conversion ----------
+def _parse_time(raw):
+    hours, minutes, seconds = raw.decode().split(".")[0].split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds))
+
+
+def _adapt_timedelta(value):
+    seconds = int(value.total_seconds())
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+sqlite3.register_adapter(dt_time, lambda value: value.replace(microsecond=0).isoformat())
+sqlite3.register_adapter(timedelta, _adapt_timedelta)
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()[:10]))
+sqlite3.register_converter("TIME", _parse_time)
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("DECIMAL", lambda raw: Decimal(raw.decode()))
+
+
+# ---------- MySQL functions ----------
+def _concat(*args):
+    return None if None in args else "".join(str(a) for a in args)
+
+
+def _date_format(value, fmt):
+    if value is None:
+        return None
+    return datetime.fromisoformat(str(value)).strftime(fmt)
+
+
+def _time_format(value, fmt):
+    if value is None:
+        return None
+    return datetime.strptime(str(value).split(".")[0], "%H:%M:%S").strftime(fmt.replace("%i", "%M"))
+
+
+def _datediff(a, b):
+    if a is None or b is None:
+        return None
+    return (date.fromisoformat(str(a)[:10]) - date.fromisoformat(str(b)[:10])).days
+
+
+def _time_to_sec(value):
+    if value is None:
+        return None
+    hours, minutes, seconds = str(value).split(".")[0].split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _least(*args):
+    return None if None in args else min(args)
+
+
+def _greatest(*args):
+    return None if None in args else max(args)
+
+
+# ---------- SQL rewriting ----------
+_DUPLICATE_NOOP = re.compile(r"ON DUPLICATE KEY UPDATE\s+(\w+)\s*=\s*\1\b(?!\s*[+,-])", re.I)
+_DUPLICATE = re.compile(r"ON DUPLICATE KEY UPDATE", re.I)
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)", re.I)
+_SQL_CACHE = {}
+
+
+def translate(sql, has_params):
+    key = (sql, has_params)
+    cached = _SQL_CACHE.get(key)
+    if cached is not None:
+        return cached
+    out = sql.replace("%s", "?")
+    if has_params:
+        out = out.replace("%%", "%")
+    out = _DUPLICATE_NOOP.sub("ON CONFLICT DO NOTHING", out)
+    out = _DUPLICATE.sub("ON CONFLICT DO UPDATE SET", out)
+    out = _VALUES_REF.sub(r"excluded.\1", out)
+    out = re.sub(r"\bCURDATE\(\)", "date('now', 'localtime')", out, flags=re.I)
+    out = re.sub(r"\bNOW\(\)", "datetime('now', 'localtime')", out, flags=re.I)
+    if len(_SQL_CACHE) < 2000:
+        _SQL_CACHE[key] = out
+    return out
+
+
+def _mysql_error(exc):
+    # Same error codes and "for key" text as MySQL, which the app classifies
+    message = str(exc)
+    if message.startswith("UNIQUE constraint failed: "):
+        key = message.split(": ", 1)[1].split(",")[0].strip()
+        return pymysql.err.IntegrityError(1062, f"Duplicate entry for key '{key}'")
+    if "FOREIGN KEY" in message:
+        return pymysql.err.IntegrityError(1452, message)
+    return pymysql.err.IntegrityError(1048, message)
+
+
+class Cursor:
+    def __init__(self, connection, as_dict=True):
+        self.connection = connection
+        self.as_dict = as_dict
+        self._cursor = connection._db.cursor()
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, sql, params=None):
+        started = time.perf_counter()
+        try:
+            self._cursor.execute(translate(sql, params is not None), tuple(params or ()))
+        except sqlite3.IntegrityError as exc:
+            raise _mysql_error(exc) from exc
+        finally:
+            metrics = self.connection.metrics
+            if metrics is not None:
+                metrics.observe_query(sql, time.perf_counter() - started, max(self._cursor.rowcount, 0))
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        return max(self.rowcount, 0)
+
+    def executemany(self, sql, seq):
+        total = 0
+        for params in seq:
+            total += self.execute(sql, params)
+        self.rowcount = total
+        return total
+
+    def _row(self, values):
+        if values is None or not self.as_dict:
+            return values
+        return {col[0]: value for col, value in zip(self._cursor.description, values)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(v) for v in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(v) for v in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """Just enough of ``pymysql.connections.Connection`` for the app and the pool."""
+
+    metrics = None
+
+    def __init__(self, database, **_ignored):
+        self._db = sqlite3.connect(database, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   isolation_level="IMMEDIATE", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.create_function("CONCAT", -1, _concat)
+        self._db.create_function("IF", 3, lambda cond, a, b: a if cond else b)
+        self._db.create_function("LEAST", -1, _least)
+        self._db.create_function("GREATEST", -1, _greatest)
+        self._db.create_function("DATE_FORMAT", 2, _date_format)
+        self._db.create_function("TIME_FORMAT", 2, _time_format)
+        self._db.create_function("DATEDIFF", 2, _datediff)
+        self._db.create_function("TIME_TO_SEC", 1, _time_to_sec)
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        # Dict rows unless a plain (tuple) PyMySQL cursor class is asked for
+        if cursorclass is None:
+            return Cursor(self)
+        return Cursor(self, issubclass(cursorclass, pymysql.cursors.DictCursorMixin))
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def ping(self, reconnect=False):
+        if not self.open:
+            raise sqlite3.ProgrammingError("connection closed")
+
+    def close(self):
+        if self.open:
+            self.open = False
+            self._db.close()
+
+
+_schema_lock = threading.Lock()
+
+
+def create_schema(path):
+    with _schema_lock:
+        db = sqlite3.connect(path)
+        db.executescript(SCHEMA)
+        db.close()
+
+
+def connection_class(metrics=None):
+    return type("SQLiteConnection", (SQLiteConnection,), {"metrics": metrics})
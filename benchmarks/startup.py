@@ -0,0 +1,121 @@
+"""Cold-start benchmark.
+
+    python -m benchmarks.startup                          # 10 fresh interpreters
+    python -m benchmarks.startup --runs 20 --save startup.json
+    python -m benchmarks.startup --import-budget 300 --first-request-budget 150   # exit 1 over budget
+    python -m benchmarks.startup --top 15                 # slowest modules (python -X importtime)
+
+Each run starts a new interpreter and times ``import app``, ``create_app()``
+and the first and second GET /login through the test client, i.e. what a
+worker pays before and while serving its first request. No database is
+needed: the login page opens no connection. Reports the median and worst
+run of each phase in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ("import", "create_app", "first_request", "second_request")
+
+_CHILD = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+status = client.get("/login").status_code
+first = time.perf_counter()
+client.get("/login")
+second = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import": (imported - started) * 1000,
+    "create_app": (created - imported) * 1000,
+    "first_request": (first - created) * 1000,
+    "second_request": (second - first) * 1000,
+}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    # Nothing in the measured path may touch a shared store
+    env.setdefault("SESSION_BACKEND", "cookie")
+    env.setdefault("CACHE_BACKEND", "memory")
+    return env
+
+
+def run_once():
+    out = subprocess.run([sys.executable, "-c", _CHILD], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if result["status"] != 200:
+        raise SystemExit(f"GET /login returned HTTP {result['status']}")
+    return result
+
+
+def slowest_imports(top):
+    """``(self_ms, module)`` of the modules that take longest to import under ``import app``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True)
+    found = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        found.append((int(self_us) / 1000, name.strip()))
+    return sorted(found, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import and first-request latency.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to start.")
+    parser.add_argument("--import-budget", type=float, default=None, help="Max median import + create_app ms.")
+    parser.add_argument("--first-request-budget", type=float, default=None, help="Max median first request ms.")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest modules to import.")
+    parser.add_argument("--save", default=None, help="Write results as JSON.")
+    args = parser.parse_args()
+
+    run_once()  # warm the bytecode cache so every measured run starts alike
+    runs = [run_once() for _ in range(args.runs)]
+    report = {"runs": args.runs, "phases": {}}
+    print(f"{'phase':<16}{'median ms':>12}{'max ms':>10}")
+    for phase in PHASES:
+        values = [r[phase] for r in runs]
+        report["phases"][phase] = {"median_ms": round(statistics.median(values), 1), "max_ms": round(max(values), 1)}
+        print(f"{phase:<16}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+    startup = statistics.median(r["import"] + r["create_app"] for r in runs)
+    report["startup_ms"] = round(startup, 1)
+    print(f"{'startup':<16}{startup:>12.1f}")
+
+    if args.top:
+        report["slowest_imports"] = slowest_imports(args.top)
+        print("\nSlowest imports (ms, excluding their own imports)")
+        for ms, name in report["slowest_imports"]:
+            print(f"{ms:>8.1f}  {name}")
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    problems = []
+    if args.import_budget is not None and startup > args.import_budget:
+        problems.append(f"import + create_app {startup:.1f} ms > {args.import_budget} ms")
+    first = report["phases"]["first_request"]["median_ms"]
+    if args.first_request_budget is not None and first > args.first_request_budget:
+        problems.append(f"first request {first} ms > {args.first_request_budget} ms")
+    for problem in problems:
+        print(f"over budget: {problem}", file=sys.stderr)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
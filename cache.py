@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe in-process cache with per-key TTL and LRU eviction."""
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expiry(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[0]
+
+    def get_many(self, keys):
+        with self._lock:
+            result = []
+            for key in keys:
+                entry = self._live(key)
+                result.append(None if entry is None else entry[0])
+            return result
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, self._expiry(ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key, delta=1):
+        """Add ``delta`` to a cached integer; returns None if the key is missing."""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return None
+            value = entry[0] + delta
+            self._data[key] = (value, entry[1])
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Same interface on top of a Redis-compatible client.
+
+    Only ``get``, ``mget``, ``set(ex=)``, ``delete``, ``incrby``, ``ttl`` and
+    ``flushdb`` are used, so any client (or test fake) providing those works.
+    Values are stored as JSON.
+    """
+
+    def __init__(self, client, prefix="mini_erp:", default_ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _load(raw):
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return json.loads(raw)
+
+    def get(self, key):
+        return self._load(self.client.get(self._key(key)))
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return [self._load(raw) for raw in self.client.mget([self._key(k) for k in keys])]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self._key(key), json.dumps(value), ex=ttl or None)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self._key(k) for k in keys])
+
+    def incr(self, key, delta=1):
+        full_key = self._key(key)
+        value = self.client.incrby(full_key, delta)
+        # INCRBY creates missing keys without an expiry; those were not cached
+        if self.default_ttl and self.client.ttl(full_key) < 0:
+            self.client.delete(full_key)
+            return None
+        return value
+
+    def clear(self):
+        self.client.flushdb()
+
+
+def cache_from_config(config):
+    if config.CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        return RedisCache(
+            redis.Redis.from_url(config.CACHE_REDIS_URL),
+            prefix=config.CACHE_KEY_PREFIX,
+            default_ttl=config.CACHE_DEFAULT_TTL,
+        )
+    return LRUCache(max_entries=config.CACHE_MAX_ENTRIES, default_ttl=config.CACHE_DEFAULT_TTL)
@@ -0,0 +1,201 @@
+"""``flask`` CLI command groups; ``register_commands()`` adds them to an app.
+
+Modules that only some commands need (migrations, payroll, account
+provisioning) are imported inside those commands to keep app startup small.
+"""
+import csv
+import json
+from datetime import date
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import attendance_summary
+import auth
+import partitions
+import punches
+from web import (ARCHIVED_YEARS_KEY, cache, resources, get_db_connection, tables_changed, import_punches,
+                 make_journal_drainer, run_payroll)
+
+db_cli = AppGroup("db", help="Database schema migrations and partition maintenance.")
+
+@db_cli.command("upgrade")
+@click.option("--target", type=int, default=None, help="Stop after this migration version.")
+def db_upgrade(target):
+    """Apply pending migrations."""
+    import migrate
+
+    conn = get_db_connection()
+    applied = migrate.upgrade(conn, target=target)
+    if not applied:
+        click.echo("Database is up to date.")
+    for version, name in applied:
+        click.echo(f"Applied {version:04d}_{name}")
+
+@db_cli.command("status")
+def db_status():
+    """List migrations and whether they have been applied."""
+    import migrate
+
+    conn = get_db_connection()
+    for version, name, applied in migrate.migration_status(conn):
+        click.echo(f"{'[x]' if applied else '[ ]'} {version:04d}_{name}")
+
+@db_cli.command("partitions")
+@click.option("--months-ahead", type=int, default=None, help="Months after the current one to create (default ATTENDANCE_PARTITION_MONTHS_AHEAD).")
+def db_partitions(months_ahead):
+    """Create the monthly attendance partitions up to N months ahead."""
+    months_ahead = current_app.config["ATTENDANCE_PARTITION_MONTHS_AHEAD"] if months_ahead is None else months_ahead
+    through = date.today().replace(day=1)
+    for _ in range(months_ahead):
+        through = partitions.next_month(through)
+    try:
+        created = partitions.ensure_partitions(get_db_connection(), through)
+    except partitions.PartitionError as exc:
+        raise click.ClickException(str(exc))
+    click.echo(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}.")
+
+@db_cli.command("archive")
+@click.argument("year", type=int)
+def db_archive(year):
+    """Move a closed YEAR of attendance and salaries into the archive tables."""
+    try:
+        result = partitions.archive_year(get_db_connection(), year)
+    except partitions.PartitionError as exc:
+        raise click.ClickException(str(exc))
+    cache.delete(ARCHIVED_YEARS_KEY)
+    tables_changed("attendance", "salaries")
+    moved = result["moved"]
+    click.echo(f"Archived {year}: {moved['attendance']} attendance and {moved['salaries']} salary rows, "
+               f"dropped {len(result['dropped_partitions'])} partition(s).")
+    config = current_app.config
+    if config["CACHE_BACKEND"] == "memory":
+        # The deletes above only reached this process; running workers catch up on expiry
+        click.echo(f"CACHE_BACKEND=memory: running web workers read {year} from the archive within "
+                   f"{max(config['ARCHIVED_YEARS_TTL'], config['PAGE_CACHE_TTL'])}s "
+                   "(ARCHIVED_YEARS_TTL, PAGE_CACHE_TTL).")
+
+attendance_cli = AppGroup("attendance", help="Attendance maintenance.")
+
+@attendance_cli.command("rebuild-summary")
+@click.option("--from", "start", type=click.DateTime(["%Y-%m-%d"]), default=None, help="First day to rebuild.")
+@click.option("--to", "end", type=click.DateTime(["%Y-%m-%d"]), default=None, help="Day after the last one to rebuild.")
+def attendance_rebuild_summary(start, end):
+    """Recompute the daily and monthly attendance rollups."""
+    written = attendance_summary.rebuild(
+        get_db_connection(),
+        start.date() if start else None,
+        end.date() if end else None,
+    )
+    tables_changed("attendance")
+    click.echo(f"Rebuilt {written} daily summary rows.")
+
+@attendance_cli.command("import")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--report", "report_file", type=click.File("w"), default=None, help="Write the per-row report as JSON.")
+def attendance_import(csv_file, report_file):
+    """Import check-in/check-out/absent punches from a CSV file.
+
+    Columns: emp_id, date (YYYY-MM-DD), time (HH:MM[:SS]), action.
+    """
+    try:
+        rows = list(punches.read_csv(csv_file))
+    except punches.PunchError as exc:
+        raise click.ClickException(str(exc))
+
+    report = import_punches(rows)
+    for outcome, count in sorted(report["totals"].items()):
+        click.echo(f"{outcome}: {count}")
+    click.echo(f"{report['received']} rows in {report['seconds']}s ({report['rows_per_second']} rows/s)")
+    for row in report["rows"]:
+        if "error" in row:
+            click.echo(f"row {row['row']}: {row['outcome']} - {row['error']}", err=True)
+    if report_file:
+        json.dump(report, report_file, indent=2)
+
+@attendance_cli.command("drain-journal")
+@click.option("--once", is_flag=True, help="Exit once the journal is empty.")
+def attendance_drain_journal(once):
+    """Apply write-behind punches from the journal to the database."""
+    journal = resources().journal
+    if journal is None:
+        raise click.ClickException("Write-behind is disabled (set ATTENDANCE_WRITE_BEHIND=1)")
+    drainer = make_journal_drainer()
+    if not once:
+        click.echo(f"Draining {current_app.config['ATTENDANCE_JOURNAL_PATH']} (Ctrl+C to stop)")
+        drainer.run()
+        return
+    if not journal.claim(drainer.owner, drainer.lease_ttl):
+        raise click.ClickException("Another process is draining this journal")
+    try:
+        total = 0
+        while True:
+            drained = drainer.drain_once()
+            total += drained
+            if drained < drainer.batch_size:
+                break
+    finally:
+        journal.release(drainer.owner)
+    stats = drainer.stats()
+    click.echo(f"Applied {stats['applied']} punches, dropped {stats['rejected']}; {stats['depth']} left.")
+
+payroll_cli = AppGroup("payroll", help="Payroll runs.")
+
+@payroll_cli.command("run")
+@click.argument("month")
+@click.option("--department", "departments", multiple=True, help="Only run these departments (repeatable).")
+@click.option("--workers", type=int, default=None, help="Worker processes (default PAYROLL_WORKERS).")
+@click.option("--force", is_flag=True, help="Recompute departments that already finished.")
+def payroll_run(month, departments, workers, force):
+    """Generate salaries for MONTH (YYYY-MM) from base pay and attendance."""
+    import payroll
+
+    try:
+        period = payroll.parse_period(month)
+    except payroll.PayrollError as exc:
+        raise click.ClickException(str(exc))
+
+    report = run_payroll(period, departments=list(departments) or None, force=force, workers=workers)
+    for department, result in report["departments"].items():
+        if result["status"] == "skipped":
+            click.echo(f"{department}: already done")
+        else:
+            click.echo(f"{department}: {result['employees']} employees, net {result['total_net']} "
+                       f"({result['seconds']}s)")
+    if report["missing_base_salary"]:
+        click.echo(f"{report['missing_base_salary']} active employee(s) without base salary skipped", err=True)
+    click.echo(f"{report['employees']} salaries for {report['period']} "
+               f"({report['working_days']} working days), net {report['total_net']} in {report['seconds']}s")
+
+users_cli = AppGroup("users", help="Login accounts.")
+
+@users_cli.command("provision")
+@click.option("--output", "output_file", type=click.File("w", encoding="utf-8"), required=True,
+              help="CSV to write the new usernames and passwords to.")
+@click.option("--department", default=None, help="Only employees of this department.")
+@click.option("--username-format", default="emp{emp_id}", show_default=True, help="Username pattern.")
+@click.option("--workers", type=int, default=0, help="Processes for password hashing.")
+def users_provision(output_file, department, username_format, workers):
+    """Create logins for all active employees that have none."""
+    if "{emp_id}" not in username_format:
+        raise click.ClickException("--username-format must contain {emp_id}")
+
+    import accounts
+    report = accounts.provision(get_db_connection(), current_app.config["PASSWORD_HASH_METHOD"],
+                                username_format=username_format, department=department, workers=workers)
+    writer = csv.writer(output_file)
+    writer.writerow(["emp_id", "username", "password", "role"])
+    for account in report["created"]:
+        writer.writerow([account["emp_id"], account["username"], account["password"], account["role"]])
+    auth.forget_login_users(cache, *[account["username"] for account in report["created"]])
+
+    for account in report["skipped"]:
+        click.echo(f"emp {account['emp_id']}: skipped ({account['username']} taken or account exists)", err=True)
+    click.echo(f"Created {len(report['created'])} accounts in {report['seconds']}s; "
+               f"passwords written to {output_file.name}")
+
+
+def register_commands(app):
+    for group in (db_cli, attendance_cli, payroll_cli, users_cli):
+        app.cli.add_command(group)
@@ -0,0 +1,62 @@
+from datetime import date
+
+from repositories import Repo, TOTAL_EMPLOYEES_SQL, PRESENT_ON_SQL, UNPAID_SALARIES_SQL
+
+TOTAL_EMPLOYEES_KEY = "dashboard:total_employees"
+UNPAID_SALARIES_KEY = "dashboard:unpaid_salaries"
+
+
+def present_key(day):
+    return f"dashboard:present:{day.isoformat()}"
+
+
+def get_dashboard_counters(cache, conn, ttl=None, today=None):
+    """Return the three admin dashboard counters, querying only cache misses."""
+    today = today or date.today()
+    keys = [TOTAL_EMPLOYEES_KEY, present_key(today), UNPAID_SALARIES_KEY]
+    total_employees, present_today, unpaid_salaries = cache.get_many(keys)
+
+    if None in (total_employees, present_today, unpaid_salaries):
+        # One round trip for all three; refreshing the ones that were still
+        # cached costs nothing extra and keeps them consistent
+        counters = Repo(conn).scalars(
+            total_employees=(TOTAL_EMPLOYEES_SQL, ()),
+            present_today=(PRESENT_ON_SQL, (today,)),
+            unpaid_salaries=(UNPAID_SALARIES_SQL, ()),
+        )
+        total_employees = counters["total_employees"]
+        present_today = counters["present_today"] or 0
+        unpaid_salaries = counters["unpaid_salaries"]
+        cache.set(TOTAL_EMPLOYEES_KEY, total_employees, ttl)
+        cache.set(present_key(today), present_today, ttl)
+        cache.set(UNPAID_SALARIES_KEY, unpaid_salaries, ttl)
+
+    return {
+        "total_employees": int(total_employees),
+        "present_today": int(present_today),
+        "unpaid_salaries": int(unpaid_salaries),
+    }
+
+
+# ---------- Incremental updates from write paths ----------
+# incr() is a no-op on a cold key, the next dashboard hit recomputes it.
+
+def record_employee_created(cache):
+    cache.incr(TOTAL_EMPLOYEES_KEY, 1)
+
+
+def record_employee_deleted(cache):
+    # Attendance and salary rows cascade with the employee
+    cache.incr(TOTAL_EMPLOYEES_KEY, -1)
+    cache.delete(present_key(date.today()), UNPAID_SALARIES_KEY)
+
+
+def record_checkin(cache, day, count=1):
+    cache.incr(present_key(day), count)
+
+
+def record_salaries_changed(cache, unpaid_delta=None):
+    if unpaid_delta is None:
+        cache.delete(UNPAID_SALARIES_KEY)
+    else:
+        cache.incr(UNPAID_SALARIES_KEY, unpaid_delta)
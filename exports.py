@@ -0,0 +1,156 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+import pymysql
+
+FLUSH_ROWS = 500
+FETCH_SIZE = 1000
+
+CSV_MIMETYPE = "text/csv"  # Werkzeug appends "; charset=utf-8" to text/* types
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def stream_query(conn, sql, params=()):
+    """Yield dict rows of ``sql`` from an unbuffered cursor on ``conn``.
+
+    The result set is read from the socket ``FETCH_SIZE`` rows at a time
+    instead of being loaded whole. ``conn`` stays busy until the generator
+    finishes or is closed by the client disconnecting, so the caller must
+    not use it for anything else meanwhile.
+    """
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, timedelta):
+        # PyMySQL returns TIME columns as timedelta
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return str(value)
+
+
+# ---------- CSV ----------
+def csv_stream(header, rows):
+    """Yield a CSV document in chunks of ``FLUSH_ROWS`` lines."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_cell_text(v) for v in row])
+        if count % FLUSH_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+# ---------- XLSX ----------
+# A minimal single-sheet workbook written straight into a zip stream. The
+# sink has no tell()/seek(), so zipfile writes data descriptors after each
+# member and never needs the whole file in memory.
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+_SHEET_HEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>"""
+
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+class _Sink:
+    """Write-only buffer that hands its bytes over on ``drain()``."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, bool) or value is None:
+            text = "" if value is None else str(value)
+            cells.append(f'<c t="inlineStr"><is><t>{escape(text)}</t></is></c>')
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(_cell_text(value))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def xlsx_stream(header, rows, sheet_name="Report"):
+    """Yield an .xlsx workbook with one sheet, flushing every ``FLUSH_ROWS`` rows."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            lines = [_SHEET_HEAD, _xlsx_row(header)]
+            for count, row in enumerate(rows, start=1):
+                lines.append(_xlsx_row(row))
+                if count % FLUSH_ROWS == 0:
+                    sheet.write("".join(lines).encode("utf-8"))
+                    lines = []
+                    data = sink.drain()
+                    if data:
+                        yield data
+            lines.append(_SHEET_TAIL)
+            sheet.write("".join(lines).encode("utf-8"))
+    yield sink.drain()
+
+
+WRITERS = {
+    "csv": (csv_stream, CSV_MIMETYPE),
+    "xlsx": (xlsx_stream, XLSX_MIMETYPE),
+}
@@ -0,0 +1,236 @@
+import contextvars
+import re
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_STATEMENTS = 500
+OTHER_STATEMENT = "(other)"
+POOL_COUNTERS = {"checkouts", "waits", "wait_time", "timeouts", "created", "closed", "failed_pings"}
+JOURNAL_SERIES = (
+    ("depth", "gauge", "Punches waiting in the write-behind journal."),
+    ("lag_seconds", "gauge", "Age of the oldest queued punch."),
+    ("applied", "counter", "Punches applied by this process's drainer."),
+    ("rejected", "counter", "Punches dropped as invalid by this process's drainer."),
+    ("failures", "counter", "Failed drain attempts in this process."),
+)
+
+# Per-request database totals, read back for the Server-Timing header
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROW_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+
+def normalize_sql(sql):
+    """Strip literals and collapse IN/VALUES lists so one statement shape is one label.
+
+    The SQL seen here already has its parameters interpolated, so this is
+    also what keeps values (names, hashes) out of the metrics.
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _ROW_LIST.sub("(...)", sql)
+    return sql[:200]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Metrics:
+    """Request and query counters rendered in the Prometheus text format.
+
+    Queries are recorded by InstrumentedConnection, requests by the Flask
+    hooks in web.py. Statements are labelled by their normalised SQL; past
+    ``MAX_STATEMENTS`` distinct shapes they are counted under "(other)".
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_query_threshold=0.5, slow_query_samples=50):
+        self.buckets = tuple(buckets)
+        self.slow_query_threshold = slow_query_threshold
+        self._lock = threading.Lock()
+        self._slow = deque(maxlen=slow_query_samples)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}      # (endpoint, method) -> Histogram
+            self._responses = {}   # (endpoint, method, status) -> count
+            self._statements = {}  # normalised sql -> [count, seconds, rows, errors]
+            self._slow.clear()
+
+    # ---------- Requests ----------
+    def begin_request(self):
+        return _request_stats.set({"started": time.perf_counter(), "db_time": 0.0, "db_queries": 0})
+
+    def end_request(self, token, endpoint, method, status):
+        """Record the request and return its ``{"total", "db_time", "db_queries"}``."""
+        stats = _request_stats.get()
+        _request_stats.reset(token)
+        if stats is None:
+            return None
+        stats["total"] = time.perf_counter() - stats["started"]
+        endpoint = endpoint or "(unmatched)"
+        with self._lock:
+            hist = self._routes.get((endpoint, method))
+            if hist is None:
+                hist = self._routes[(endpoint, method)] = Histogram(self.buckets)
+            hist.observe(stats["total"])
+            key = (endpoint, method, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+        return stats
+
+    # ---------- Queries ----------
+    def observe_query(self, sql, seconds, rows, failed=False):
+        statement = normalize_sql(sql)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats["db_time"] += seconds
+            stats["db_queries"] += 1
+        with self._lock:
+            entry = self._statements.get(statement)
+            if entry is None:
+                if len(self._statements) >= MAX_STATEMENTS:
+                    statement = OTHER_STATEMENT
+                entry = self._statements.setdefault(statement, [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += rows
+            entry[3] += failed
+            if seconds >= self.slow_query_threshold:
+                self._slow.append({
+                    "statement": statement,
+                    "seconds": round(seconds, 6),
+                    "rows": rows,
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                })
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow)
+
+    # ---------- Exposition ----------
+    def render(self, pool_stats=None, journal_stats=None):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            routes = {key: (list(h.counts), h.sum, h.count) for key, h in self._routes.items()}
+            responses = dict(self._responses)
+            statements = {key: list(v) for key, v in self._statements.items()}
+
+        metric("mini_erp_request_duration_seconds", "histogram", "Request latency by endpoint.")
+        for (endpoint, method), (counts, total, count) in sorted(routes.items()):
+            labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'mini_erp_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'mini_erp_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"mini_erp_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"mini_erp_request_duration_seconds_count{{{labels}}} {count}")
+
+        metric("mini_erp_responses_total", "counter", "Responses by endpoint and status.")
+        for (endpoint, method, status), n in sorted(responses.items()):
+            lines.append(f'mini_erp_responses_total{{endpoint="{_label(endpoint)}",method="{method}",status="{status}"}} {n}')
+
+        for name, index, help_text in (
+            ("mini_erp_db_queries_total", 0, "Statements executed."),
+            ("mini_erp_db_query_seconds_total", 1, "Time spent executing statements."),
+            ("mini_erp_db_rows_total", 2, "Rows returned or affected."),
+            ("mini_erp_db_query_errors_total", 3, "Statements that raised."),
+        ):
+            metric(name, "counter", help_text)
+            for statement, values in sorted(statements.items()):
+                value = f"{values[index]:.6f}" if index == 1 else values[index]
+                lines.append(f'{name}{{statement="{_label(statement)}"}} {value}')
+
+        if pool_stats:
+            for key, value in sorted(pool_stats.items()):
+                name, kind = f"mini_erp_db_pool_{key}", "gauge"
+                if key in POOL_COUNTERS:
+                    name, kind = f"{name}_total", "counter"
+                metric(name, kind, f"Connection pool {key.replace('_', ' ')}.")
+                lines.append(f"{name} {value}")
+
+        if journal_stats:
+            for key, kind, help_text in JOURNAL_SERIES:
+                if journal_stats.get(key) is None:
+                    continue
+                name = f"mini_erp_punch_journal_{key}" + ("_total" if kind == "counter" else "")
+                metric(name, kind, help_text)
+                lines.append(f"{name} {journal_stats[key]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def server_timing(stats):
+    """``Server-Timing`` header value for a finished request's stats."""
+    return (f'db;dur={stats["db_time"] * 1000:.1f};desc="{stats["db_queries"]} queries", '
+            f'total;dur={stats["total"] * 1000:.1f}')
+
+
+class InstrumentedConnection(pymysql.connections.Connection):
+    """PyMySQL connection that reports every statement to ``metrics``.
+
+    Only used when instrumentation is enabled; the pool builds plain
+    connections otherwise. Rows are the buffered row count (or affected
+    rows); unbuffered reads report 0 and only the time to the first row.
+    """
+
+    metrics = None
+
+    def query(self, sql, unbuffered=False):
+        started = time.perf_counter()
+        try:
+            rows = super().query(sql, unbuffered)
+        except Exception:
+            self.metrics.observe_query(sql, time.perf_counter() - started, 0, failed=True)
+            raise
+        self.metrics.observe_query(sql, time.perf_counter() - started, 0 if unbuffered else rows or 0)
+        return rows
+
+
+def connection_class(metrics):
+    return type("InstrumentedConnection", (InstrumentedConnection,), {"metrics": metrics})
+
+
+def metrics_from_config(config):
+    if not (config.METRICS_ENABLED or config.SERVER_TIMING):
+        return None
+    return Metrics(
+        slow_query_threshold=config.SLOW_QUERY_THRESHOLD,
+        slow_query_samples=config.SLOW_QUERY_SAMPLES,
+    )
@@ -0,0 +1,104 @@
+import re
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+_FILENAME_RE = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return ``(version, name, path)`` tuples sorted by version."""
+    migrations = []
+    seen = {}
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = _FILENAME_RE.match(path.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise MigrationError(f"Duplicate migration version {version}: {seen[version]} and {path.name}")
+        seen[version] = path.name
+        migrations.append((version, match.group(2), path))
+    migrations.sort()
+    return migrations
+
+
+def split_statements(sql):
+    # Migrations are plain DDL/DML; statements end with ';' at end of line.
+    statements = []
+    buffer = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not buffer and (not stripped or stripped.startswith("--")):
+            continue
+        buffer.append(line)
+        if stripped.endswith(";"):
+            statement = "\n".join(buffer).strip().rstrip(";").strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    tail = "\n".join(buffer).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def ensure_migrations_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+
+
+def applied_versions(conn):
+    ensure_migrations_table(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row["version"] for row in cursor.fetchall()}
+
+
+def pending_migrations(conn, directory=MIGRATIONS_DIR):
+    applied = applied_versions(conn)
+    return [m for m in discover_migrations(directory) if m[0] not in applied]
+
+
+def apply_migration(conn, version, name, path):
+    # MySQL commits implicitly around DDL, so a failed migration is reported
+    # with the statement that broke and is left unrecorded for a re-run.
+    statements = split_statements(Path(path).read_text(encoding="utf-8"))
+    with conn.cursor() as cursor:
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception as exc:
+                conn.rollback()
+                raise MigrationError(f"Migration {version}_{name} failed: {exc}\n{statement}") from exc
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (version, name),
+        )
+    conn.commit()
+
+
+def upgrade(conn, target=None, directory=MIGRATIONS_DIR):
+    applied = []
+    for version, name, path in pending_migrations(conn, directory):
+        if target is not None and version > target:
+            break
+        apply_migration(conn, version, name, path)
+        applied.append((version, name))
+    return applied
+
+
+def migration_status(conn, directory=MIGRATIONS_DIR):
+    applied = applied_versions(conn)
+    return [(version, name, version in applied) for version, name, _ in discover_migrations(directory)]
@@ -1,8 +1,7 @@
+-- Baseline schema (formerly mineerp.sql).
+-- IF NOT EXISTS keeps this a no-op on databases created from the old dump.
 
-CREATE DATABASE mini_erp CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
-USE mini_erp;
-
-CREATE TABLE employees (
+CREATE TABLE IF NOT EXISTS employees (
     emp_id INT AUTO_INCREMENT PRIMARY KEY,
     first_name VARCHAR(50) NOT NULL,
     last_name VARCHAR(50),
@@ -14,7 +13,7 @@ CREATE TABLE employees (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
-CREATE TABLE attendance (
+CREATE TABLE IF NOT EXISTS attendance (
     attendance_id INT AUTO_INCREMENT PRIMARY KEY,
     emp_id INT NOT NULL,
     attendance_date DATE NOT NULL,
@@ -24,7 +23,7 @@ CREATE TABLE attendance (
     CONSTRAINT fk_attendance_employee FOREIGN KEY (emp_id) REFERENCES employees(emp_id) ON DELETE CASCADE
 );
 
-CREATE TABLE salaries (
+CREATE TABLE IF NOT EXISTS salaries (
     salary_id INT AUTO_INCREMENT PRIMARY KEY,
     emp_id INT NOT NULL,
     month YEAR(4) NOT NULL,
@@ -35,7 +34,7 @@ CREATE TABLE salaries (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT fk_salary_employee FOREIGN KEY (emp_id) REFERENCES employees(emp_id) ON DELETE CASCADE
 );
-CREATE TABLE users (
+CREATE TABLE IF NOT EXISTS users (
     user_id INT AUTO_INCREMENT PRIMARY KEY,
     emp_id INT NOT NULL,
     username VARCHAR(50) UNIQUE NOT NULL,
@@ -44,4 +43,3 @@ CREATE TABLE users (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT fk_user_employee FOREIGN KEY (emp_id) REFERENCES employees(emp_id) ON DELETE CASCADE
 );
-
@@ -0,0 +1,21 @@
+-- Secondary indexes for the admin attendance and salary reports.
+
+-- Keep the earliest row when an employee has more than one record for a day,
+-- otherwise the unique key below cannot be created.
+DELETE a1 FROM attendance a1
+JOIN attendance a2
+  ON a1.emp_id = a2.emp_id
+ AND a1.attendance_date = a2.attendance_date
+ AND a1.attendance_id > a2.attendance_id;
+
+-- (emp_id, attendance_date) serves the per-employee month view and the
+-- check-in lookup; (attendance_date, status) serves the per-day view.
+ALTER TABLE attendance
+    ADD UNIQUE KEY uq_attendance_emp_date (emp_id, attendance_date),
+    ADD KEY idx_attendance_date_status (attendance_date, status);
+
+-- (emp_id, created_at) serves the per-employee salary month filter,
+-- (created_at) the whole-month report.
+ALTER TABLE salaries
+    ADD KEY idx_salaries_emp_created (emp_id, created_at),
+    ADD KEY idx_salaries_created (created_at);
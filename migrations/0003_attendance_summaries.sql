@@ -0,0 +1,46 @@
+-- Attendance rollups maintained on write (see attendance_summary.py).
+
+CREATE TABLE IF NOT EXISTS attendance_daily_summary (
+    attendance_date DATE PRIMARY KEY,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    leave_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS attendance_monthly_summary (
+    emp_id INT NOT NULL,
+    month_start DATE NOT NULL,
+    present_days INT NOT NULL DEFAULT 0,
+    absent_days INT NOT NULL DEFAULT 0,
+    leave_days INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (emp_id, month_start),
+    CONSTRAINT fk_attendance_monthly_employee FOREIGN KEY (emp_id) REFERENCES employees(emp_id) ON DELETE CASCADE
+);
+
+-- Backfill from existing attendance rows
+INSERT INTO attendance_daily_summary (attendance_date, present_count, absent_count, leave_count)
+SELECT attendance_date,
+       SUM(status = 'present'),
+       SUM(status = 'absent'),
+       SUM(status = 'leave')
+FROM attendance
+GROUP BY attendance_date
+ON DUPLICATE KEY UPDATE
+    present_count = VALUES(present_count),
+    absent_count = VALUES(absent_count),
+    leave_count = VALUES(leave_count);
+
+INSERT INTO attendance_monthly_summary (emp_id, month_start, present_days, absent_days, leave_days)
+SELECT emp_id,
+       DATE_FORMAT(attendance_date, '%Y-%m-01'),
+       SUM(status = 'present'),
+       SUM(status = 'absent'),
+       SUM(status = 'leave')
+FROM attendance
+GROUP BY emp_id, DATE_FORMAT(attendance_date, '%Y-%m-01')
+ON DUPLICATE KEY UPDATE
+    present_days = VALUES(present_days),
+    absent_days = VALUES(absent_days),
+    leave_days = VALUES(leave_days);
@@ -0,0 +1,34 @@
+-- Payroll runs (see payroll.py).
+
+-- Monthly base pay used by the payroll run, seeded from each employee's
+-- most recent salary row.
+ALTER TABLE employees
+    ADD COLUMN base_salary DECIMAL(10,2) NULL AFTER role;
+
+UPDATE employees e
+JOIN (
+    SELECT s.emp_id, s.base_salary
+    FROM salaries s
+    JOIN (
+        SELECT emp_id, MAX(salary_id) AS salary_id
+        FROM salaries
+        GROUP BY emp_id
+    ) latest ON latest.salary_id = s.salary_id
+) l ON l.emp_id = e.emp_id
+SET e.base_salary = l.base_salary;
+
+-- Generated rows carry the month they pay for, which makes a re-run an
+-- upsert. Rows entered by hand keep pay_period NULL and are not affected.
+ALTER TABLE salaries
+    ADD COLUMN pay_period DATE NULL AFTER month,
+    ADD UNIQUE KEY uq_salaries_emp_period (emp_id, pay_period);
+
+-- One row per finished department, so an interrupted run can resume.
+CREATE TABLE IF NOT EXISTS payroll_runs (
+    pay_period DATE NOT NULL,
+    department VARCHAR(50) NOT NULL,
+    employees INT NOT NULL DEFAULT 0,
+    total_net DECIMAL(14,2) NOT NULL DEFAULT 0,
+    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (pay_period, department)
+);
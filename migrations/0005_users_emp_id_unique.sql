@@ -0,0 +1,10 @@
+-- One login per employee, enforced by the database (see UserRepo.register).
+
+-- Registration used to check for an existing account before inserting, so
+-- two simultaneous sign-ups could both get through. Keep the oldest account
+-- of any such pair.
+DELETE u FROM users u
+JOIN users older ON older.emp_id = u.emp_id AND older.user_id < u.user_id;
+
+ALTER TABLE users
+    ADD UNIQUE KEY uq_users_emp_id (emp_id);
@@ -0,0 +1,54 @@
+-- Monthly range partitions for attendance and archive tables for closed
+-- years (see partitions.py).
+
+-- Partitioned InnoDB tables cannot have foreign keys, and every unique key
+-- has to contain the partitioning column. Employee deletion removes the
+-- attendance rows itself now (EmployeeRepo.delete), and punches check that
+-- the employee exists (punches._insert_day).
+ALTER TABLE attendance DROP FOREIGN KEY fk_attendance_employee;
+
+ALTER TABLE attendance
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (attendance_id, attendance_date);
+
+-- A single catch-all partition to start with; `flask db partitions` splits
+-- one partition per month off it, ahead of time.
+ALTER TABLE attendance
+    PARTITION BY RANGE COLUMNS (attendance_date) (
+        PARTITION p_future VALUES LESS THAN (MAXVALUE)
+    );
+
+-- Closed years moved out by `flask db archive`, compressed and read only by
+-- the admin views of those years.
+CREATE TABLE IF NOT EXISTS attendance_archive (
+    attendance_id INT NOT NULL PRIMARY KEY,
+    emp_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    check_in TIME DEFAULT NULL,
+    check_out TIME DEFAULT NULL,
+    status ENUM('present', 'absent', 'leave') NOT NULL,
+    UNIQUE KEY uq_attendance_archive_emp_date (emp_id, attendance_date),
+    KEY idx_attendance_archive_date_status (attendance_date, status)
+) ROW_FORMAT=COMPRESSED;
+
+CREATE TABLE IF NOT EXISTS salaries_archive (
+    salary_id INT NOT NULL PRIMARY KEY,
+    emp_id INT NOT NULL,
+    month YEAR NOT NULL,
+    pay_period DATE NULL,
+    base_salary DECIMAL(10,2) NOT NULL,
+    bonus DECIMAL(10,2) DEFAULT 0,
+    deductions DECIMAL(10,2) DEFAULT 0,
+    paid_status ENUM('paid', 'unpaid') DEFAULT 'unpaid',
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    KEY idx_salaries_archive_emp_created (emp_id, created_at),
+    KEY idx_salaries_archive_created (created_at)
+) ROW_FORMAT=COMPRESSED;
+
+CREATE TABLE IF NOT EXISTS archived_years (
+    table_name VARCHAR(64) NOT NULL,
+    year SMALLINT NOT NULL,
+    rows_moved INT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, year)
+);
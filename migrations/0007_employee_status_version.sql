@@ -0,0 +1,5 @@
+-- Version counter for the login snapshot kept in each session (sessions.py).
+-- Every employee edit bumps it; a session whose snapshot carries an older
+-- version reloads it, and one whose employee is gone or inactive ends.
+ALTER TABLE employees
+    ADD COLUMN status_version INT NOT NULL DEFAULT 0;
@@ -0,0 +1,50 @@
+"""Change versions per table and the page-cache keys derived from them.
+
+Every write path bumps the version of the tables it touched. A cached page
+is keyed by its URL, its user and the versions of the tables it reads, so a
+bump makes every dependent page miss without tracking which pages exist.
+Versions carry the same TTL as the pages: writes made where this cache
+cannot see them (another process with an in-memory cache, a SQL console)
+show up once the version expires and is re-created.
+"""
+import hashlib
+import time
+from email.utils import formatdate
+
+TABLES = ("employees", "attendance", "salaries")
+VERSION_KEY = "version:{}"
+PAGE_KEY = "page:{}"
+
+
+def versions(cache, tables, ttl):
+    """``{table: version}``; a missing version starts now."""
+    keys = [VERSION_KEY.format(t) for t in tables]
+    found = dict(zip(tables, cache.get_many(keys)))
+    for table, version in found.items():
+        if version is None:
+            found[table] = time.time_ns()
+            cache.set(VERSION_KEY.format(table), found[table], ttl)
+    return found
+
+
+def bump(cache, ttl, *tables):
+    now = time.time_ns()
+    for table in tables:
+        cache.set(VERSION_KEY.format(table), now, ttl)
+
+
+def etag(endpoint, args, user_id, table_versions, today):
+    # ``today`` because pages without a date/month filter show the current one
+    parts = [endpoint, str(user_id), today.isoformat()]
+    parts += [f"{k}={v}" for k, v in sorted(args.items(multi=True))]
+    parts += [f"{t}:{v}" for t, v in sorted(table_versions.items())]
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def last_modified(table_versions):
+    """HTTP date of the newest version."""
+    return formatdate(max(table_versions.values()) / 1e9, usegmt=True)
+
+
+def page_key(tag):
+    return PAGE_KEY.format(tag)
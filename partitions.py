@@ -0,0 +1,156 @@
+"""Monthly partitions of ``attendance`` and archiving of closed years.
+
+Migration 0006 leaves attendance with one catch-all partition, ``p_future``
+(VALUES LESS THAN MAXVALUE). ``ensure_partitions`` splits months off it
+ahead of time: ``p202610`` holds the dates before 2026-11-01. Rows for a
+month without its own partition still land in ``p_future``, so a missed
+maintenance run costs pruning, never inserts.
+
+``archive_year`` copies a closed year of attendance and salaries into the
+compressed ``*_archive`` tables, records it in ``archived_years`` and then
+removes it from the live tables, dropping whole attendance partitions
+instead of deleting row by row. The admin views read the archive tables for
+archived years.
+"""
+from datetime import date, timedelta
+
+CATCH_ALL = "p_future"
+
+_ATTENDANCE_COLUMNS = "attendance_id, emp_id, attendance_date, check_in, check_out, status"
+_SALARY_COLUMNS = ("salary_id, emp_id, month, pay_period, base_salary, bonus, deductions, "
+                   "paid_status, created_at")
+
+
+class PartitionError(Exception):
+    pass
+
+
+def partition_name(month_start):
+    return f"p{month_start:%Y%m}"
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def list_partitions(cursor, table="attendance"):
+    """``[(name, upper_bound)]`` in order; the bound is a date, or None for MAXVALUE."""
+    cursor.execute("""
+        SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    partitions = []
+    for row in cursor.fetchall():
+        bound = row["bound"]
+        partitions.append((row["name"], None if bound == "MAXVALUE" else date.fromisoformat(bound.strip("'"))))
+    return partitions
+
+
+def ensure_partitions(conn, through):
+    """Give every month up to and including ``through`` its own attendance partition.
+
+    The first run starts at the oldest attendance month, so existing rows are
+    spread over their months once. Returns the names of the new partitions.
+    """
+    with conn.cursor() as cursor:
+        partitions = list_partitions(cursor)
+        if not partitions or partitions[-1] != (CATCH_ALL, None):
+            raise PartitionError(f"attendance has no {CATCH_ALL} partition; run `flask db upgrade` first")
+        bounds = [bound for _, bound in partitions if bound is not None]
+        if bounds:
+            month = bounds[-1]
+        else:
+            cursor.execute("SELECT MIN(attendance_date) AS first_day FROM attendance")
+            month = (cursor.fetchone()["first_day"] or date.today()).replace(day=1)
+
+        new = []
+        while month <= through:
+            new.append((partition_name(month), next_month(month)))
+            month = next_month(month)
+        if not new:
+            return []
+        # Dates are generated here, never taken from input
+        definitions = ",\n".join(f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" for name, bound in new)
+        cursor.execute(f"""
+            ALTER TABLE attendance REORGANIZE PARTITION {CATCH_ALL} INTO (
+                {definitions},
+                PARTITION {CATCH_ALL} VALUES LESS THAN (MAXVALUE)
+            )
+        """)
+    return [name for name, _ in new]
+
+
+def archived_years(conn):
+    """``{table: sorted years}`` of what ``archive_year`` has moved out."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT table_name, year FROM archived_years ORDER BY table_name, year")
+        rows = cursor.fetchall()
+    found = {}
+    for row in rows:
+        found.setdefault(row["table_name"], []).append(int(row["year"]))
+    return found
+
+
+def archive_year(conn, year, today=None):
+    """Move ``year`` of attendance and salaries into the archive tables.
+
+    The copy is committed before anything is removed, and re-running it for
+    the same year is safe. Returns the rows moved and the dropped partitions.
+    """
+    today = today or date.today()
+    if year >= today.year:
+        raise PartitionError(f"{year} is not a closed year")
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO attendance_archive ({_ATTENDANCE_COLUMNS})
+                SELECT {_ATTENDANCE_COLUMNS} FROM attendance
+                WHERE attendance_date >= %s AND attendance_date < %s
+                ON DUPLICATE KEY UPDATE
+                    check_in = VALUES(check_in),
+                    check_out = VALUES(check_out),
+                    status = VALUES(status)
+            """, (start, end))
+            cursor.execute(f"""
+                INSERT INTO salaries_archive ({_SALARY_COLUMNS})
+                SELECT {_SALARY_COLUMNS} FROM salaries
+                WHERE created_at >= %s AND created_at < %s
+                ON DUPLICATE KEY UPDATE
+                    base_salary = VALUES(base_salary),
+                    bonus = VALUES(bonus),
+                    deductions = VALUES(deductions),
+                    paid_status = VALUES(paid_status)
+            """, (start, end))
+            moved = {}
+            for table, column in (("attendance", "attendance_date"), ("salaries", "created_at")):
+                cursor.execute(f"SELECT COUNT(*) AS n FROM {table}_archive WHERE {column} >= %s AND {column} < %s",
+                               (start, end))
+                moved[table] = cursor.fetchone()["n"]
+                cursor.execute("""
+                    INSERT INTO archived_years (table_name, year, rows_moved) VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE rows_moved = VALUES(rows_moved)
+                """, (table, year, moved[table]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    with conn.cursor() as cursor:
+        # Partitions wholly inside the year go at once (DDL, commits by itself)
+        dropped = []
+        lower = None
+        for name, bound in list_partitions(cursor):
+            if lower is not None and bound is not None and lower >= start and bound <= end:
+                dropped.append(name)
+            lower = bound
+        if dropped:
+            cursor.execute(f"ALTER TABLE attendance DROP PARTITION {', '.join(dropped)}")
+        # Whatever shares a partition with other years
+        cursor.execute("DELETE FROM attendance WHERE attendance_date >= %s AND attendance_date < %s", (start, end))
+        cursor.execute("DELETE FROM salaries WHERE created_at >= %s AND created_at < %s", (start, end))
+    conn.commit()
+    return {"year": year, "moved": moved, "dropped_partitions": dropped}
@@ -0,0 +1,162 @@
+import calendar
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+
+
+class PayrollError(ValueError):
+    pass
+
+
+def parse_period(text):
+    """``YYYY-MM`` -> first day of that month."""
+    try:
+        return datetime.strptime(text.strip(), "%Y-%m").date()
+    except (AttributeError, ValueError):
+        raise PayrollError(f"Invalid month '{text}', expected YYYY-MM") from None
+
+
+def working_days(period):
+    """Monday-Friday days in the month of ``period``."""
+    _, days = calendar.monthrange(period.year, period.month)
+    return sum(1 for day in range(1, days + 1) if date(period.year, period.month, day).weekday() < 5)
+
+
+# ---------- Computation ----------
+# Pure functions over plain tuples so batches can be shipped to worker processes.
+
+def compute_batch(rows, days, bonus_rate):
+    """``(emp_id, base, present, absent, leave)`` rows -> ``(emp_id, base, bonus, deductions)``.
+
+    Absent days are deducted at base / working days (never more than base).
+    Employees with no absences whose present plus leave days cover every
+    working day get ``bonus_rate`` of base as an attendance bonus.
+    """
+    bonus_rate = Decimal(bonus_rate)
+    results = []
+    for emp_id, base, present, absent, leave in rows:
+        base = Decimal(base)
+        deductions = min(base, base * absent / days).quantize(CENT, ROUND_HALF_UP)
+        if not absent and present + leave >= days:
+            bonus = (base * bonus_rate).quantize(CENT, ROUND_HALF_UP)
+        else:
+            bonus = Decimal("0.00")
+        results.append((emp_id, base, bonus, deductions))
+    return results
+
+
+def compute(rows, days, bonus_rate, workers=0, batch_size=5000):
+    """Run compute_batch() inline, or across ``workers`` processes in batches."""
+    if workers <= 1 or len(rows) <= batch_size:
+        return compute_batch(rows, days, bonus_rate)
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in executor.map(compute_batch, batches, [days] * len(batches), [bonus_rate] * len(batches)):
+            results.extend(batch)
+    return results
+
+
+# ---------- Database ----------
+def active_departments(cursor):
+    cursor.execute("SELECT DISTINCT department FROM employees WHERE status = 'active' ORDER BY department")
+    return [row["department"] for row in cursor.fetchall()]
+
+
+def completed_departments(cursor, period):
+    cursor.execute("SELECT department FROM payroll_runs WHERE pay_period = %s", (period,))
+    return {row["department"] for row in cursor.fetchall()}
+
+
+def _load_department(cursor, period, department):
+    # Attendance comes from the monthly rollup, one row per employee
+    cursor.execute("""
+        SELECT e.emp_id, e.base_salary,
+               COALESCE(m.present_days, 0) AS present_days,
+               COALESCE(m.absent_days, 0) AS absent_days,
+               COALESCE(m.leave_days, 0) AS leave_days
+        FROM employees e
+        LEFT JOIN attendance_monthly_summary m
+               ON m.emp_id = e.emp_id AND m.month_start = %s
+        WHERE e.status = 'active' AND e.department = %s
+        ORDER BY e.emp_id
+    """, (period, department))
+    rows, missing_base = [], 0
+    for row in cursor.fetchall():
+        if row["base_salary"] is None:
+            missing_base += 1
+            continue
+        rows.append((row["emp_id"], row["base_salary"], int(row["present_days"]),
+                     int(row["absent_days"]), int(row["leave_days"])))
+    return rows, missing_base
+
+
+def _write_department(cursor, period, department, results):
+    # Rows already marked paid are left alone on a re-run
+    created_at = datetime(period.year, period.month, 1)
+    cursor.executemany("""
+        INSERT INTO salaries (emp_id, month, base_salary, bonus, deductions, pay_period, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            base_salary = IF(paid_status = 'paid', base_salary, VALUES(base_salary)),
+            bonus = IF(paid_status = 'paid', bonus, VALUES(bonus)),
+            deductions = IF(paid_status = 'paid', deductions, VALUES(deductions))
+    """, [(emp_id, period.year, base, bonus, deductions, period, created_at)
+          for emp_id, base, bonus, deductions in results])
+    total_net = sum((base + bonus - deductions for _, base, bonus, deductions in results), Decimal("0.00"))
+    cursor.execute("""
+        INSERT INTO payroll_runs (pay_period, department, employees, total_net)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE employees = VALUES(employees), total_net = VALUES(total_net),
+                                finished_at = CURRENT_TIMESTAMP
+    """, (period, department, len(results), total_net))
+    return total_net
+
+
+def run(conn, period, departments=None, workers=0, batch_size=5000, bonus_rate="0.05", force=False):
+    """Generate the salary rows of ``period`` for every active employee.
+
+    Each department is computed and written in its own transaction, which
+    also records it in ``payroll_runs``; an interrupted run picks up at the
+    first department not recorded there. ``force`` recomputes finished
+    departments. Re-running is safe: rows are keyed on (emp_id, pay_period).
+    """
+    started = time.perf_counter()
+    days = working_days(period)
+    report = {"period": period.strftime("%Y-%m"), "working_days": days, "departments": {},
+              "employees": 0, "missing_base_salary": 0, "total_net": Decimal("0.00")}
+
+    with conn.cursor() as cursor:
+        if departments is None:
+            departments = active_departments(cursor)
+        done = set() if force else completed_departments(cursor, period)
+
+        for department in departments:
+            if department in done:
+                report["departments"][department] = {"status": "skipped"}
+                continue
+            dept_started = time.perf_counter()
+            rows, missing_base = _load_department(cursor, period, department)
+            results = compute(rows, days, bonus_rate, workers=workers, batch_size=batch_size)
+            try:
+                total_net = _write_department(cursor, period, department, results)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            report["departments"][department] = {
+                "status": "done",
+                "employees": len(results),
+                "missing_base_salary": missing_base,
+                "total_net": total_net,
+                "seconds": round(time.perf_counter() - dept_started, 3),
+            }
+            report["employees"] += len(results)
+            report["missing_base_salary"] += missing_base
+            report["total_net"] += total_net
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
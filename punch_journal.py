@@ -0,0 +1,222 @@
+"""Write-behind journal for attendance punches.
+
+With ATTENDANCE_WRITE_BEHIND on, the attendance page appends each punch to
+a local SQLite file (WAL, synchronous=FULL, so an acknowledged punch is on
+disk) and answers at once. A ``JournalDrainer`` thread moves the oldest
+punches into MySQL in batches through ``punches.import_events``, whose
+upserts are idempotent: a batch that was applied but not yet removed from
+the journal when the process died is simply applied again on restart.
+
+Only one process drains a journal at a time; the others keep appending.
+The drainer holds a lease row in the journal and renews it every pass, so
+a crashed drainer is replaced once its lease expires.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import punches
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS punches (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT,
+    action TEXT NOT NULL,
+    received_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS drain_lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS drain_state (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class PunchJournal:
+    """Append-only punch queue in a SQLite file, safe across threads and processes."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        db = self._db()
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        # One sqlite3 connection per thread; sqlite handles the cross-process locking
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = FULL")
+            self._local.db = db
+        return db
+
+    def append(self, emp_id, day, at, action):
+        """Durably queue one punch; returns its sequence number."""
+        cur = self._db().execute(
+            "INSERT INTO punches (emp_id, date, time, action, received_at) VALUES (?, ?, ?, ?, ?)",
+            (str(emp_id), day.isoformat(), at.strftime("%H:%M:%S") if at else None, action, time.time()),
+        )
+        return cur.lastrowid
+
+    def peek(self, limit):
+        """Oldest ``limit`` punches as ``(seq, row)`` pairs, rows shaped for ``punches.parse_event``."""
+        rows = self._db().execute(
+            "SELECT seq, emp_id, date, time, action FROM punches ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+        return [(seq, {"emp_id": emp_id, "date": day, "time": at, "action": action})
+                for seq, emp_id, day, at, action in rows]
+
+    def ack(self, through_seq):
+        """Drop every punch up to and including ``through_seq``."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM punches WHERE seq <= ?", (through_seq,))
+            db.execute("INSERT OR REPLACE INTO drain_state (key, value) VALUES ('last_drain', ?)", (time.time(),))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def claim(self, owner, ttl):
+        """Take or renew the drain lease; True when ``owner`` holds it."""
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("""
+                INSERT INTO drain_lease (id, owner, expires_at) VALUES (1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE drain_lease.owner = excluded.owner OR drain_lease.expires_at < ?
+            """, (owner, now + ttl, now))
+            held = db.execute("SELECT owner FROM drain_lease WHERE id = 1").fetchone()[0] == owner
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return held
+
+    def release(self, owner):
+        self._db().execute("DELETE FROM drain_lease WHERE id = 1 AND owner = ?", (owner,))
+
+    def stats(self):
+        """Queue depth and drain lag (age of the oldest queued punch, in seconds)."""
+        db = self._db()
+        depth, oldest = db.execute("SELECT COUNT(*), MIN(received_at) FROM punches").fetchone()
+        last_drain = db.execute("SELECT value FROM drain_state WHERE key = 'last_drain'").fetchone()
+        now = time.time()
+        return {
+            "depth": depth,
+            "lag_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "seconds_since_drain": round(now - last_drain[0], 3) if last_drain else None,
+        }
+
+
+class JournalDrainer:
+    """Background thread that applies journaled punches to MySQL in batches.
+
+    ``on_applied(report)`` is called with each ``punches.import_events``
+    report after its batch is committed (used to bump dashboard counters).
+    A batch whose transaction fails stays in the journal and is retried
+    after ``retry_delay`` seconds.
+    """
+
+    def __init__(self, journal, pool, batch_size=500, interval=0.5, retry_delay=5.0,
+                 lease_ttl=30.0, on_applied=None):
+        self.journal = journal
+        self.pool = pool
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.lease_ttl = lease_ttl
+        self.on_applied = on_applied
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread = None
+        self._holding = False
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "applied": 0, "rejected": 0, "failures": 0, "last_error": None}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="punch-journal-drainer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._holding = self.journal.claim(self.owner, self.lease_ttl)
+                    if not self._holding:
+                        self._stop.wait(self.lease_ttl / 2)
+                        continue
+                    drained = self.drain_once()
+                except Exception as exc:
+                    log.warning("Punch journal drain failed: %s", exc)
+                    with self._lock:
+                        self._stats["failures"] += 1
+                        self._stats["last_error"] = str(exc)
+                    self._stop.wait(self.retry_delay)
+                    continue
+                if drained < self.batch_size:
+                    self._stop.wait(self.interval)
+        finally:
+            self._holding = False
+            self.journal.release(self.owner)
+
+    def drain_once(self):
+        """Apply one batch; returns the number of punches taken off the journal."""
+        batch = self.journal.peek(self.batch_size)
+        if not batch:
+            return 0
+        conn = self.pool.acquire()
+        try:
+            report = punches.import_events(conn, [row for _, row in batch], chunk_size=self.batch_size)
+        finally:
+            self.pool.release(conn)
+        errors = report["totals"].get("error", 0)
+        if errors:
+            failed = next(r["error"] for r in report["rows"] if r["outcome"] == "error")
+            raise RuntimeError(f"{errors} punch(es) not applied: {failed}")
+
+        self.journal.ack(batch[-1][0])
+        rejected = report["totals"].get("rejected", 0)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["applied"] += len(batch) - rejected
+            self._stats["rejected"] += rejected
+            self._stats["last_error"] = None
+        if rejected:
+            log.warning("Punch journal dropped %d invalid punch(es)", rejected)
+        if self.on_applied is not None:
+            self.on_applied(report)
+        return len(batch)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(self.journal.stats())
+        # False in the processes that only append while another one drains
+        stats["draining"] = self._holding
+        return stats
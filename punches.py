@@ -0,0 +1,290 @@
+import csv
+import time
+from datetime import datetime, time as dt_time
+
+import attendance_summary
+
+ACTIONS = ("checkin", "checkout", "absent")
+
+
+class PunchError(ValueError):
+    pass
+
+
+def parse_event(raw, default_day=None):
+    """Validate one punch ``{emp_id, date, time, action}`` and normalise its types."""
+    action = str(raw.get("action") or "").strip().lower()
+    if action not in ACTIONS:
+        raise PunchError(f"Unknown action '{raw.get('action')}'")
+
+    emp_id = str(raw.get("emp_id") or "").strip()
+    if not emp_id.isdigit():
+        raise PunchError("emp_id must be a positive integer")
+
+    raw_day = str(raw.get("date") or "").strip()
+    if raw_day:
+        try:
+            day = datetime.strptime(raw_day, "%Y-%m-%d").date()
+        except ValueError:
+            raise PunchError(f"Invalid date '{raw_day}', expected YYYY-MM-DD") from None
+    elif default_day:
+        day = default_day
+    else:
+        raise PunchError("date is required")
+
+    raw_time = str(raw.get("time") or "").strip()
+    punch_time = None
+    if raw_time:
+        for fmt in ("%H:%M:%S", "%H:%M"):
+            try:
+                punch_time = datetime.strptime(raw_time, fmt).time()
+                break
+            except ValueError:
+                continue
+        else:
+            raise PunchError(f"Invalid time '{raw_time}', expected HH:MM[:SS]")
+    elif action != "absent":
+        raise PunchError(f"time is required for {action}")
+
+    return {"emp_id": int(emp_id), "date": day, "time": punch_time, "action": action}
+
+
+# ---------- Single punches (kiosk / attendance page) ----------
+# Each is one statement against the (emp_id, attendance_date) unique key; the
+# outcome comes from the affected-row count instead of a SELECT beforehand.
+# "ON DUPLICATE KEY UPDATE attendance_date = attendance_date" reports 0 rows
+# for an existing day.
+
+def _insert_day(cursor, emp_id, day, check_in, status):
+    # Selected from active employees: partitioned attendance has no foreign
+    # key to reject unknown IDs, and the bulk import rejects inactive ones too
+    if cursor.execute("""
+        INSERT INTO attendance (emp_id, attendance_date, check_in, status)
+        SELECT emp_id, %s, %s, %s FROM employees WHERE emp_id = %s AND status = 'active'
+        ON DUPLICATE KEY UPDATE attendance_date = attendance_date
+    """, (day, check_in, status, emp_id)):
+        return 1
+    # Only the failure path needs to know why
+    cursor.execute("SELECT 1 FROM employees WHERE emp_id = %s AND status = 'active'", (emp_id,))
+    if not cursor.fetchone():
+        raise PunchError("Unknown or inactive employee")
+    return 0
+
+
+def check_in(cursor, emp_id, day, at):
+    """Returns "recorded" or "already_marked"."""
+    if not _insert_day(cursor, emp_id, day, at, "present"):
+        return "already_marked"
+    attendance_summary.record_status(cursor, emp_id, day, "present")
+    return "recorded"
+
+
+def mark_absent(cursor, emp_id, day):
+    """Returns "recorded" or "already_marked"."""
+    if not _insert_day(cursor, emp_id, day, None, "absent"):
+        return "already_marked"
+    attendance_summary.record_status(cursor, emp_id, day, "absent")
+    return "recorded"
+
+
+def check_out(cursor, emp_id, day, at):
+    """Returns "recorded", "already_checked_out" or "not_checked_in"."""
+    updated = cursor.execute("""
+        UPDATE attendance SET check_out = %s
+        WHERE emp_id = %s AND attendance_date = %s
+          AND check_in IS NOT NULL AND check_out IS NULL
+    """, (at, emp_id, day))
+    if updated:
+        return "recorded"
+    # Only the failure path needs to know why
+    cursor.execute("""
+        SELECT 1 FROM attendance
+        WHERE emp_id = %s AND attendance_date = %s AND check_in IS NOT NULL
+    """, (emp_id, day))
+    return "already_checked_out" if cursor.fetchone() else "not_checked_in"
+
+
+# ---------- Bulk import ----------
+def read_csv(stream):
+    """Yield rows from a ``emp_id,date,time,action`` CSV (header required)."""
+    reader = csv.DictReader(stream)
+    missing = {"emp_id", "action"} - set(reader.fieldnames or [])
+    if missing:
+        raise PunchError(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+    yield from reader
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _fetch_days(cursor, keys):
+    if not keys:
+        return {}
+    placeholders = ", ".join(["(%s, %s)"] * len(keys))
+    params = [value for key in keys for value in key]
+    cursor.execute(f"""
+        SELECT emp_id, attendance_date, check_in, check_out, status
+        FROM attendance
+        WHERE (emp_id, attendance_date) IN ({placeholders})
+    """, params)
+    return {(row["emp_id"], row["attendance_date"]): row for row in cursor.fetchall()}
+
+
+def _active_employees(cursor, emp_ids):
+    placeholders = ", ".join(["%s"] * len(emp_ids))
+    cursor.execute(
+        f"SELECT emp_id FROM employees WHERE status = 'active' AND emp_id IN ({placeholders})",
+        list(emp_ids),
+    )
+    return {row["emp_id"] for row in cursor.fetchall()}
+
+
+def _as_time(value):
+    # PyMySQL returns TIME columns as timedelta
+    if value is None or hasattr(value, "hour"):
+        return value
+    seconds = int(value.total_seconds())
+    return datetime.min.replace(hour=seconds // 3600, minute=seconds % 3600 // 60, second=seconds % 60).time()
+
+
+def _outcome(event, row):
+    if event["action"] == "checkin":
+        if row is None or row["status"] != "present":
+            return "already_marked"
+        return "recorded" if _as_time(row["check_in"]) == event["time"] else "already_checked_in"
+    if event["action"] == "absent":
+        if row is not None and row["status"] == "absent" and row["check_in"] is None:
+            return "recorded"
+        return "already_marked"
+    if row is None or row["check_in"] is None:
+        return "not_checked_in"
+    return "recorded" if _as_time(row["check_out"]) == event["time"] else "already_checked_out"
+
+
+def apply_chunk(cursor, events):
+    """Write one chunk of validated events and return ``(outcomes, new_rows)``.
+
+    Check-ins and absences go in as multi-row ``INSERT ... ON DUPLICATE KEY
+    UPDATE`` statements against the (emp_id, attendance_date) unique key:
+    an existing day keeps its status and the earliest check-in. Check-outs
+    are staged in a temporary table and applied with one UPDATE ... JOIN,
+    keeping the first check-out of a day that has a check-in, as
+    ``check_out()`` does.
+    """
+    keys = list(dict.fromkeys((e["emp_id"], e["date"]) for e in events))
+    before = _fetch_days(cursor, keys)
+
+    checkins = [(e["emp_id"], e["date"], e["time"], "present") for e in events if e["action"] == "checkin"]
+    if checkins:
+        cursor.executemany("""
+            INSERT INTO attendance (emp_id, attendance_date, check_in, status)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE check_in = IF(status = 'present' AND check_in IS NOT NULL,
+                                                  LEAST(check_in, VALUES(check_in)), check_in)
+        """, checkins)
+
+    absents = [(e["emp_id"], e["date"], "absent") for e in events if e["action"] == "absent"]
+    if absents:
+        cursor.executemany("""
+            INSERT INTO attendance (emp_id, attendance_date, status)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE emp_id = emp_id
+        """, absents)
+
+    checkouts = [(e["emp_id"], e["date"], e["time"]) for e in events if e["action"] == "checkout"]
+    if checkouts:
+        cursor.execute("""
+            CREATE TEMPORARY TABLE IF NOT EXISTS punch_checkouts (
+                emp_id INT NOT NULL,
+                attendance_date DATE NOT NULL,
+                check_out TIME NOT NULL
+            )
+        """)
+        cursor.execute("DELETE FROM punch_checkouts")
+        cursor.executemany(
+            "INSERT INTO punch_checkouts (emp_id, attendance_date, check_out) VALUES (%s, %s, %s)",
+            checkouts,
+        )
+        cursor.execute("""
+            UPDATE attendance a
+            JOIN (
+                SELECT emp_id, attendance_date, MIN(check_out) AS check_out
+                FROM punch_checkouts
+                GROUP BY emp_id, attendance_date
+            ) p ON p.emp_id = a.emp_id AND p.attendance_date = a.attendance_date
+            SET a.check_out = COALESCE(a.check_out, p.check_out)
+            WHERE a.check_in IS NOT NULL
+        """)
+        cursor.execute("DELETE FROM punch_checkouts")
+
+    after = _fetch_days(cursor, keys)
+    new_rows = [(emp_id, day, after[(emp_id, day)]["status"])
+                for emp_id, day in keys if (emp_id, day) not in before and (emp_id, day) in after]
+    if new_rows:
+        attendance_summary.record_statuses(cursor, new_rows)
+
+    outcomes = [_outcome(e, after.get((e["emp_id"], e["date"]))) for e in events]
+    return outcomes, new_rows
+
+
+def import_events(conn, rows, chunk_size=500, default_day=None):
+    """Validate and apply punches in chunked transactions.
+
+    Returns a report with per-row outcomes (1-based row numbers), totals and
+    throughput. A chunk that fails is rolled back and its rows reported as
+    errors; earlier chunks stay committed.
+    """
+    started = time.perf_counter()
+    results = []
+    valid = []
+    for number, raw in enumerate(rows, start=1):
+        try:
+            valid.append((number, parse_event(raw, default_day)))
+        except PunchError as exc:
+            results.append({"row": number, "outcome": "rejected", "error": str(exc)})
+
+    # Chronological order so a check-out never lands in an earlier chunk than its check-in
+    valid.sort(key=lambda item: (item[1]["date"], item[1]["time"] or dt_time.min, ACTIONS.index(item[1]["action"])))
+
+    new_rows = []
+    with conn.cursor() as cursor:
+        for chunk in _chunks(valid, chunk_size):
+            active = _active_employees(cursor, {event["emp_id"] for _, event in chunk})
+            accepted = []
+            for number, event in chunk:
+                if event["emp_id"] in active:
+                    accepted.append((number, event))
+                else:
+                    results.append({"row": number, "outcome": "rejected", "error": "Unknown or inactive employee"})
+            if not accepted:
+                continue
+            try:
+                outcomes, created = apply_chunk(cursor, [event for _, event in accepted])
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                results.extend({"row": number, "outcome": "error", "error": str(exc)} for number, _ in accepted)
+                continue
+            new_rows.extend(created)
+            results.extend({"row": number, "outcome": outcome} for (number, _), outcome in zip(accepted, outcomes))
+
+    results.sort(key=lambda r: r["row"])
+    elapsed = time.perf_counter() - started
+    totals = {}
+    for result in results:
+        totals[result["outcome"]] = totals.get(result["outcome"], 0) + 1
+    new_present = {}
+    for _, day, status in new_rows:
+        if status == "present":
+            new_present[day.isoformat()] = new_present.get(day.isoformat(), 0) + 1
+    return {
+        "received": len(results),
+        "totals": totals,
+        "new_present_by_day": new_present,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(len(results) / elapsed, 1) if elapsed else None,
+        "rows": results,
+    }
+
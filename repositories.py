@@ -0,0 +1,501 @@
+"""Data access for the routes.
+
+Each repository wraps one connection and owns the SQL for one area. Reads
+go through a plain tuple cursor and are mapped onto ``__slots__``
+dataclasses, which skips building a dict per row. ``Repo.scalars()`` folds
+several single-value reads into one statement (one round trip).
+
+PyMySQL interpolates parameters client-side and has no server-side
+prepared statements, so the reusable part here is the SQL text: every
+statement is a module constant, built once.
+"""
+from calendar import monthrange
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pymysql
+
+
+def month_bounds(year, month):
+    # Half-open [first day, first day of next month) so range predicates stay index-friendly
+    start = date(year, month, 1)
+    end = start + timedelta(days=monthrange(year, month)[1])
+    return start, end
+
+
+# ---------- Row types ----------
+@dataclass(slots=True)
+class Employee:
+    emp_id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone: str
+    department: str
+    role: str
+    base_salary: Decimal
+    status: str
+
+
+@dataclass(slots=True)
+class EmployeeListItem:
+    emp_id: int
+    first_name: str
+    last_name: str
+    phone: str
+    department: str
+    role: str
+
+
+@dataclass(slots=True)
+class LoginUser:
+    user_id: int
+    emp_id: int
+    username: str
+    password_hash: str
+    role: str
+    status: str
+    emp_role: str
+    status_version: int
+    first_name: str
+    last_name: str
+    department: str
+    email: str
+
+
+@dataclass(slots=True)
+class SessionState:
+    status: str
+    status_version: int
+
+
+@dataclass(slots=True)
+class AttendanceRow:
+    date: date
+    emp_id: int
+    full_name: str
+    check_in: str
+    check_out: str
+    status: str
+
+
+@dataclass(slots=True)
+class RecentAttendance:
+    attendance_date: date
+    check_in: str
+    check_out: str
+    status: str
+
+
+@dataclass(slots=True)
+class SalaryRow:
+    emp_id: int
+    first_name: str
+    last_name: str
+    base_salary: Decimal
+    bonus: Decimal
+    deductions: Decimal
+    net: Decimal
+    paid_status: str
+    created_at: object
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}".strip()
+
+
+@dataclass(slots=True)
+class SalaryTotals:
+    rows: int
+    paid: int
+    base: Decimal
+    bonus: Decimal
+    deductions: Decimal
+    net: Decimal
+
+    @property
+    def unpaid(self):
+        return self.rows - self.paid
+
+
+# ---------- Base ----------
+class Repo:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _all(self, model, sql, params=()):
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(sql, params)
+            return [model(*row) for row in cursor.fetchall()]
+
+    def _one(self, model, sql, params=()):
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return None if row is None else model(*row)
+
+    def _value(self, sql, params=()):
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def _write(self, sql, params=()):
+        with self.conn.cursor() as cursor:
+            affected = cursor.execute(sql, params)
+            return affected, cursor.lastrowid
+
+    def scalars(self, **queries):
+        """Run several single-value ``(sql, params)`` reads as one statement.
+
+        ``scalars(total=("SELECT COUNT(*) FROM t", ()), ...)`` returns
+        ``{"total": ...}``; each query becomes a scalar subquery.
+        """
+        names = list(queries)
+        sql = "SELECT " + ", ".join(f"({queries[name][0]}) AS {name}" for name in names)
+        params = [value for name in names for value in queries[name][1]]
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return dict(zip(names, row))
+
+
+# ---------- Employees ----------
+_EMPLOYEE_COLUMNS = "emp_id, first_name, last_name, email, phone, department, role, base_salary, status"
+_EMPLOYEE_LIST_COLUMNS = "emp_id, first_name, last_name, phone, department, role"
+
+
+class EmployeeFilter:
+    """WHERE clause for the employee directory."""
+
+    __slots__ = ("where", "params")
+
+    def __init__(self, emp_id=None, ids=None, department=None, name_like=None):
+        clauses, params = [], []
+        if emp_id is not None:
+            clauses.append("emp_id = %s")
+            params.append(emp_id)
+        if name_like:
+            # Full scan; only for terms the search index cannot match as infixes
+            clauses.append("CONCAT(first_name, ' ', last_name) LIKE %s")
+            params.append("%" + re.sub(r"([\\%_])", r"\\\1", name_like) + "%")
+        if ids is not None:
+            if ids:
+                clauses.append(f"emp_id IN ({', '.join(['%s'] * len(ids))})")
+                params.extend(ids)
+            else:
+                clauses.append("1=0")
+        if department:
+            clauses.append("department = %s")
+            params.append(department)
+        self.where = " AND ".join(clauses) or "1=1"
+        self.params = params
+
+
+class EmployeeRepo(Repo):
+    def get(self, emp_id):
+        return self._one(Employee, f"SELECT {_EMPLOYEE_COLUMNS} FROM employees WHERE emp_id = %s", (emp_id,))
+
+    def count(self, flt):
+        return self._value(f"SELECT COUNT(*) FROM employees WHERE {flt.where}", flt.params)
+
+    def page(self, flt, descending, limit, offset):
+        order = "DESC" if descending else "ASC"
+        return self._all(
+            EmployeeListItem,
+            f"SELECT {_EMPLOYEE_LIST_COLUMNS} FROM employees WHERE {flt.where} ORDER BY emp_id {order} LIMIT %s OFFSET %s",
+            flt.params + [limit, offset],
+        )
+
+    def seek(self, flt, pivot, descending, limit):
+        """Up to ``limit`` rows after ``pivot`` in emp_id order (keyset pagination)."""
+        op, order = ("<", "DESC") if descending else (">", "ASC")
+        return self._all(
+            EmployeeListItem,
+            f"SELECT {_EMPLOYEE_LIST_COLUMNS} FROM employees WHERE {flt.where} AND emp_id {op} %s "
+            f"ORDER BY emp_id {order} LIMIT %s",
+            flt.params + [pivot, limit],
+        )
+
+    def create(self, first_name, last_name, email, phone, department, role, base_salary):
+        _, emp_id = self._write("""
+            INSERT INTO employees (first_name, last_name, email, phone, department, role, base_salary)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (first_name, last_name, email, phone, department, role, base_salary))
+        return emp_id
+
+    def update(self, emp_id, first_name, last_name, email, phone, department, role, base_salary):
+        affected, _ = self._write("""
+            UPDATE employees SET first_name = %s, last_name = %s, email = %s,
+                   phone = %s, department = %s, role = %s, base_salary = %s,
+                   status_version = status_version + 1
+            WHERE emp_id = %s
+        """, (first_name, last_name, email, phone, department, role, base_salary, emp_id))
+        return affected
+
+    def delete(self, emp_id):
+        # Partitioned attendance has no foreign key to cascade through, and
+        # the archive tables have none either
+        for table in ("attendance", "attendance_archive", "salaries_archive"):
+            self._write(f"DELETE FROM {table} WHERE emp_id = %s", (emp_id,))
+        affected, _ = self._write("DELETE FROM employees WHERE emp_id = %s", (emp_id,))
+        return affected
+
+
+# ---------- Users ----------
+# Login plus profile, so the session snapshot needs no second query
+_LOGIN_USER_SQL = """
+    SELECT u.user_id, u.emp_id, u.username, u.password_hash, u.role,
+           e.status, e.role AS emp_role, e.status_version,
+           e.first_name, e.last_name, e.department, e.email
+    FROM users u
+    JOIN employees e ON u.emp_id = e.emp_id
+"""
+# Primary-key lookups only: run on every revalidation, the full row only when the version moved
+_SESSION_STATE_SQL = """
+    SELECT e.status, e.status_version
+    FROM users u
+    JOIN employees e ON u.emp_id = e.emp_id
+    WHERE u.user_id = %s
+"""
+
+
+class UserRepo(Repo):
+    def find_for_login(self, username):
+        return self._one(LoginUser, f"{_LOGIN_USER_SQL} WHERE u.username = %s", (username,))
+
+    def session_user(self, user_id):
+        """The login row again, to reload a session's snapshot."""
+        return self._one(LoginUser, f"{_LOGIN_USER_SQL} WHERE u.user_id = %s", (user_id,))
+
+    def session_state(self, user_id):
+        """Employee status and ``status_version`` behind a login, or None if either row is gone."""
+        return self._one(SessionState, _SESSION_STATE_SQL, (user_id,))
+
+    def register(self, emp_id, username, password_hash):
+        """Create the login of an active employee in one statement.
+
+        Returns "created", "inactive_employee", "employee_has_account" or
+        "username_taken"; the last two come from the unique keys on
+        ``users.emp_id`` and ``users.username``, so there is no window
+        between checking and inserting. The role is copied from the employee.
+        """
+        try:
+            affected, _ = self._write("""
+                INSERT INTO users (emp_id, username, password_hash, role)
+                SELECT emp_id, %s, %s, role
+                FROM employees
+                WHERE emp_id = %s AND status = 'active'
+            """, (username, password_hash, emp_id))
+        except pymysql.err.IntegrityError as exc:
+            outcome = duplicate_key_outcome(exc)
+            if outcome is None:
+                raise
+            return outcome
+        return "created" if affected else "inactive_employee"
+
+    def employees_without_login(self, department=None):
+        """``(emp_id, role)`` of active employees that have no account yet."""
+        sql = """
+            SELECT e.emp_id, e.role
+            FROM employees e
+            LEFT JOIN users u ON u.emp_id = e.emp_id
+            WHERE e.status = 'active' AND u.user_id IS NULL
+        """
+        params = []
+        if department:
+            sql += " AND e.department = %s"
+            params.append(department)
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(sql + " ORDER BY e.emp_id", params)
+            return cursor.fetchall()
+
+    def create_many(self, rows):
+        """Insert ``(emp_id, username, password_hash, role)`` rows as one multi-row statement.
+
+        Rows whose employee or username got an account in the meantime are
+        skipped; returns the emp_ids that were created.
+        """
+        if not rows:
+            return []
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.executemany("""
+                INSERT INTO users (emp_id, username, password_hash, role)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE user_id = user_id
+            """, rows)
+            placeholders = ", ".join(["%s"] * len(rows))
+            cursor.execute(f"SELECT emp_id, password_hash FROM users WHERE emp_id IN ({placeholders})",
+                           [row[0] for row in rows])
+            stored = dict(cursor.fetchall())
+        # Fresh salted hashes are unique, so a matching hash is our row
+        return [row[0] for row in rows if stored.get(row[0]) == row[2]]
+
+    def usernames_for_employee(self, emp_id):
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute("SELECT username FROM users WHERE emp_id = %s", (emp_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def password_hash(self, user_id):
+        # Never cached; read at each password check
+        return self._value("SELECT password_hash FROM users WHERE user_id = %s", (user_id,))
+
+    def replace_password_hash(self, user_id, old_hash, new_hash):
+        # Conditional on the old hash so a concurrent password change wins
+        affected, _ = self._write(
+            "UPDATE users SET password_hash = %s WHERE user_id = %s AND password_hash = %s",
+            (new_hash, user_id, old_hash),
+        )
+        return affected
+
+
+_DUPLICATE_KEY = re.compile(r"for key '(?:\w+\.)?(\w+)'")
+
+
+def duplicate_key_outcome(exc):
+    """Map a duplicate-key error on ``users`` to a registration outcome (None if unknown)."""
+    if not exc.args or exc.args[0] != 1062:  # ER_DUP_ENTRY
+        return None
+    match = _DUPLICATE_KEY.search(str(exc.args[-1]))
+    key = match.group(1) if match else ""
+    if "emp_id" in key:
+        return "employee_has_account"
+    if "username" in key:
+        return "username_taken"
+    return None
+
+
+# ---------- Attendance ----------
+_ATTENDANCE_SELECT = """
+    SELECT
+        a.attendance_date AS date,
+        a.emp_id AS emp_id,
+        CONCAT(e.first_name, ' ', e.last_name) AS full_name,
+        IFNULL(a.check_in, '--:--') AS check_in,
+        IFNULL(a.check_out, '--:--') AS check_out,
+        UPPER(a.status) AS status
+    FROM attendance a
+    JOIN employees e ON a.emp_id = e.emp_id
+"""
+_ATTENDANCE_FOR_EMPLOYEE = _ATTENDANCE_SELECT + """
+    WHERE a.emp_id = %s
+      AND a.attendance_date >= %s
+      AND a.attendance_date < %s
+    ORDER BY a.attendance_date DESC
+"""
+_ATTENDANCE_FOR_DATE = _ATTENDANCE_SELECT + """
+    WHERE a.attendance_date = %s
+    ORDER BY a.status ASC, a.check_in ASC
+"""
+# Years moved out by partitions.archive_year()
+_ARCHIVE_FOR_EMPLOYEE = _ATTENDANCE_FOR_EMPLOYEE.replace("FROM attendance a", "FROM attendance_archive a")
+_ARCHIVE_FOR_DATE = _ATTENDANCE_FOR_DATE.replace("FROM attendance a", "FROM attendance_archive a")
+
+
+class AttendanceRepo(Repo):
+    @staticmethod
+    def list_query(filters):
+        """``(sql, params)`` for the admin attendance view (also used by the export)."""
+        archived = filters.get("archived")
+        if filters["emp_id"]:
+            sql = _ARCHIVE_FOR_EMPLOYEE if archived else _ATTENDANCE_FOR_EMPLOYEE
+            return sql, (filters["emp_id"], filters["range_start"], filters["range_end"])
+        return _ARCHIVE_FOR_DATE if archived else _ATTENDANCE_FOR_DATE, (filters["attendance_date"],)
+
+    def list(self, filters):
+        return self._all(AttendanceRow, *self.list_query(filters))
+
+    def recent(self, emp_id, limit=10, since=None):
+        # ``since`` bounds the scan to the newest partitions
+        sql = """
+            SELECT
+                DATE(attendance_date) AS attendance_date,
+                TIME_FORMAT(check_in, '%%H:%%i') AS check_in,
+                TIME_FORMAT(check_out, '%%H:%%i') AS check_out,
+                status
+            FROM attendance
+            WHERE emp_id = %s
+        """
+        params = [emp_id]
+        if since is not None:
+            sql += " AND attendance_date >= %s"
+            params.append(since)
+        return self._all(RecentAttendance, sql + " ORDER BY attendance_date DESC LIMIT %s", params + [limit])
+
+
+# ---------- Salaries ----------
+_SALARY_FROM = """
+    FROM employees e
+    JOIN salaries s ON s.emp_id = e.emp_id
+    WHERE s.created_at >= %s
+      AND s.created_at < %s
+"""
+_ARCHIVE_SALARY_FROM = _SALARY_FROM.replace("JOIN salaries s", "JOIN salaries_archive s")
+_SALARY_COLUMNS = """
+    SELECT
+        e.emp_id,
+        COALESCE(e.first_name, '') AS first_name,
+        COALESCE(e.last_name, '') AS last_name,
+        COALESCE(s.base_salary, 0) AS base_salary,
+        COALESCE(s.bonus, 0) AS bonus,
+        COALESCE(s.deductions, 0) AS deductions,
+        COALESCE(s.base_salary, 0) + COALESCE(s.bonus, 0) - COALESCE(s.deductions, 0) AS net,
+        COALESCE(s.paid_status, 'unpaid') AS paid_status,
+        s.created_at
+"""
+_SALARY_TOTALS = """
+    SELECT
+        COUNT(*) AS row_count,
+        COALESCE(SUM(s.paid_status = 'paid'), 0) AS paid,
+        COALESCE(SUM(s.base_salary), 0) AS base,
+        COALESCE(SUM(s.bonus), 0) AS bonus,
+        COALESCE(SUM(s.deductions), 0) AS deductions,
+        COALESCE(SUM(COALESCE(s.base_salary, 0) + COALESCE(s.bonus, 0) - COALESCE(s.deductions, 0)), 0) AS net
+"""
+
+
+def _as_decimal(value):
+    # MySQL returns DECIMAL sums as Decimal already; other backends may not
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class SalaryRepo(Repo):
+    @staticmethod
+    def _month_filter(year, month, emp_id, archived=False):
+        # Month is taken from created_at
+        sql = _ARCHIVE_SALARY_FROM if archived else _SALARY_FROM
+        params = list(month_bounds(year, month))
+        if emp_id:
+            sql += " AND e.emp_id = %s"
+            params.append(emp_id)
+        return sql, params
+
+    @classmethod
+    def month_query(cls, year, month, emp_id=None, limit=None, offset=0, archived=False):
+        """``(sql, params)`` for one month's salary rows (also used by the export)."""
+        where, params = cls._month_filter(year, month, emp_id, archived)
+        sql = _SALARY_COLUMNS + where + " ORDER BY e.emp_id ASC, s.salary_id ASC"
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += [limit, offset]
+        return sql, tuple(params)
+
+    def month_page(self, year, month, emp_id, limit, offset, archived=False):
+        return self._all(SalaryRow, *self.month_query(year, month, emp_id, limit, offset, archived))
+
+    def month_totals(self, year, month, emp_id=None, archived=False):
+        """Whole-month totals in one pass."""
+        where, params = self._month_filter(year, month, emp_id, archived)
+        with self.conn.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(_SALARY_TOTALS + where, params)
+            rows, paid, base, bonus, deductions, net = cursor.fetchone()
+        return SalaryTotals(int(rows), int(paid), _as_decimal(base), _as_decimal(bonus),
+                            _as_decimal(deductions), _as_decimal(net))
+
+
+# ---------- Dashboard ----------
+TOTAL_EMPLOYEES_SQL = "SELECT COUNT(*) FROM employees"
+UNPAID_SALARIES_SQL = "SELECT COUNT(*) FROM salaries WHERE paid_status = 'unpaid'"
+PRESENT_ON_SQL = "SELECT present_count FROM attendance_daily_summary WHERE attendance_date = %s"
@@ -0,0 +1,129 @@
+"""Per-process resources of one app: pools, caches, the search index.
+
+Nothing here is created at import or in ``create_app()``: each resource is
+built on first use, in the process that uses it. A server that imports the
+app once and then forks its workers (``SERVER_PRELOAD``) therefore gives
+every worker its own sockets, locks and threads. Should a resource have been
+created before a fork anyway, the child drops its copy (without closing it,
+the parent still uses it) and builds a new one.
+"""
+import os
+import threading
+
+import auth
+import instrumentation
+import punch_journal
+import sessions
+from cache import cache_from_config
+from db import pool_from_config, replicas_from_config
+from search import EmployeeSearchIndex
+
+
+class _Settings:
+    """Attribute access to a Flask config, for the ``*_from_config()`` helpers."""
+
+    __slots__ = ("_config",)
+
+    def __init__(self, config):
+        self._config = config
+
+    def __getattr__(self, name):
+        try:
+            return self._config[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class lazy_resource:
+    """Builds the value on first access; assigning replaces it (benchmarks, tests)."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+
+    def __get__(self, resources, owner):
+        if resources is None:
+            return self
+        return resources._get(self.name, self.factory)
+
+    def __set__(self, resources, value):
+        resources._set(self.name, value)
+
+
+class Resources:
+    def __init__(self, config):
+        self.config = _Settings(config)
+        self._values = {}
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+
+    def _fork_check(self):
+        if self._pid != os.getpid():
+            self._values = {}
+            self._pid = os.getpid()
+            self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        self._fork_check()
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = factory(self)
+            return self._values[name]
+
+    def _set(self, name, value):
+        self._fork_check()
+        with self._lock:
+            self._values[name] = value
+
+    def _connection_class(self):
+        return instrumentation.connection_class(self.metrics) if self.metrics else None
+
+    @lazy_resource
+    def metrics(self):
+        # None unless METRICS_ENABLED or SERVER_TIMING
+        return instrumentation.metrics_from_config(self.config)
+
+    @lazy_resource
+    def db_pool(self):
+        return pool_from_config(self.config, self._connection_class())
+
+    @lazy_resource
+    def replicas(self):
+        return replicas_from_config(self.config, self._connection_class())
+
+    @lazy_resource
+    def cache(self):
+        return cache_from_config(self.config)
+
+    @lazy_resource
+    def search_index(self):
+        return EmployeeSearchIndex(refresh_interval=self.config.SEARCH_INDEX_REFRESH)
+
+    @lazy_resource
+    def session_store(self):
+        return sessions.store_from_config(self.config)
+
+    @lazy_resource
+    def journal(self):
+        # Write-behind check-ins: punches go to a local journal, a drainer thread applies them
+        if not self.config.ATTENDANCE_WRITE_BEHIND:
+            return None
+        return punch_journal.PunchJournal(self.config.ATTENDANCE_JOURNAL_PATH)
+
+    @lazy_resource
+    def journal_drainer(self):
+        # Started by web.ensure_journal_drainer() on first use
+        return None
+
+    # Login throttling is per process; each bucket refills at the configured rate per minute
+    @lazy_resource
+    def login_ip_limiter(self):
+        return auth.TokenBucketLimiter(self.config.LOGIN_RATE_PER_IP, self.config.LOGIN_BURST_PER_IP)
+
+    @lazy_resource
+    def login_user_limiter(self):
+        return auth.TokenBucketLimiter(self.config.LOGIN_RATE_PER_USER, self.config.LOGIN_BURST_PER_USER)
@@ -0,0 +1,269 @@
+import bisect
+import threading
+import time
+import unicodedata
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().split())
+
+
+# Shorter words have no trigram, so the index can only prefix-match them
+MIN_INFIX = 3
+
+
+def indexable(query):
+    """True when every word of ``query`` is long enough for infix lookups."""
+    return all(len(word) >= MIN_INFIX for word in normalize(query).split())
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def deletes(word):
+    """``word`` plus every variant with one character removed."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein distance, giving up once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class EmployeeSearchIndex:
+    """In-process name index for the employee directory.
+
+    Names are split into words and every lookup structure is keyed by the
+    distinct words (the name vocabulary), not by employee, so memory grows
+    with the number of distinct names. A query matches when each of its
+    words is a prefix or infix of some word of the name; when that finds
+    too little, each query word may instead be one insertion, deletion,
+    substitution or transposition away from a name word.
+
+    The index is loaded from the database on first use, kept in sync by the
+    employee write routes and reloaded every ``refresh_interval`` seconds to
+    pick up writes made by other workers.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()  # one reload at a time
+        self._loaded_at = None
+        self._pending = None  # upserts/removes made while a reload reads the table
+        self._reset()
+
+    def _reset(self):
+        self._docs = {}        # emp_id -> (normalized words, display name, department)
+        self._words = {}       # word -> set of emp_id
+        self._prefixes = []    # sorted words (prefix lookup)
+        self._trigrams = {}    # trigram -> set of words (infix lookup)
+        self._deletes = {}     # word with one char removed -> set of words (typo lookup)
+        self._max_id = 0
+
+    # ---------- Loading ----------
+    def needs_refresh(self):
+        if self._loaded_at is None:
+            return True
+        return bool(self.refresh_interval) and time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def ensure_loaded(self, conn):
+        """Load the index, or reload it once ``refresh_interval`` has passed.
+
+        One thread reloads; the others keep searching the current index
+        meanwhile and only wait when nothing has been loaded yet.
+        """
+        if not self.needs_refresh():
+            return
+        if not self._reload_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self.needs_refresh():
+                return
+            with self._lock:
+                self._pending = []
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT emp_id, first_name, last_name, department FROM employees")
+                    rows = cursor.fetchall()
+                self.rebuild(rows)
+            finally:
+                with self._lock:
+                    self._pending = None
+        finally:
+            self._reload_lock.release()
+
+    def rebuild(self, rows):
+        # Built aside and swapped in, so searches never wait for (or see) a half-built index
+        fresh = EmployeeSearchIndex(self.refresh_interval)
+        for row in rows:
+            fresh._add(row["emp_id"], row.get("first_name"), row.get("last_name"),
+                       row.get("department"), sort=False)
+        fresh._prefixes = sorted(fresh._words)
+        with self._lock:
+            self._docs, self._words, self._prefixes = fresh._docs, fresh._words, fresh._prefixes
+            self._trigrams, self._deletes, self._max_id = fresh._trigrams, fresh._deletes, fresh._max_id
+            # Writes made after the rows were read would otherwise be lost until the next reload
+            for emp_id, names in self._pending or ():
+                self._remove(emp_id)
+                if names is not None:
+                    self._add(emp_id, *names)
+            self._loaded_at = time.monotonic()
+
+    # ---------- Maintenance ----------
+    def _add(self, emp_id, first_name, last_name, department, sort=True):
+        display = f"{first_name or ''} {last_name or ''}".strip()
+        words = tuple(dict.fromkeys(normalize(display).split()))
+        self._docs[emp_id] = (words, display, department)
+        self._max_id = max(self._max_id, emp_id)
+        for word in words:
+            ids = self._words.get(word)
+            if ids is None:
+                ids = self._words[word] = set()
+                for gram in trigrams(word):
+                    self._trigrams.setdefault(gram, set()).add(word)
+                for variant in deletes(word):
+                    self._deletes.setdefault(variant, set()).add(word)
+                if sort:
+                    bisect.insort(self._prefixes, word)
+            ids.add(emp_id)
+
+    def _remove(self, emp_id):
+        doc = self._docs.pop(emp_id, None)
+        if doc is None:
+            return
+        for word in doc[0]:
+            ids = self._words.get(word)
+            if ids is None:
+                continue
+            ids.discard(emp_id)
+            if ids:
+                continue
+            del self._words[word]
+            for gram in trigrams(word):
+                self._discard(self._trigrams, gram, word)
+            for variant in deletes(word):
+                self._discard(self._deletes, variant, word)
+            pos = bisect.bisect_left(self._prefixes, word)
+            if pos < len(self._prefixes) and self._prefixes[pos] == word:
+                del self._prefixes[pos]
+
+    @staticmethod
+    def _discard(index, key, word):
+        words = index.get(key)
+        if words is not None:
+            words.discard(word)
+            if not words:
+                del index[key]
+
+    def upsert(self, emp_id, first_name, last_name, department=None):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((emp_id, (first_name, last_name, department)))
+            if self._loaded_at is None:
+                return
+            self._remove(emp_id)
+            self._add(emp_id, first_name, last_name, department)
+
+    def remove(self, emp_id):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((emp_id, None))
+            if self._loaded_at is None:
+                return
+            self._remove(emp_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    # ---------- Lookup ----------
+    def _ids(self, words):
+        ids = set()
+        for word in words:
+            ids |= self._words[word]
+        return ids
+
+    def _prefix_words(self, term):
+        words = []
+        pos = bisect.bisect_left(self._prefixes, term)
+        while pos < len(self._prefixes) and self._prefixes[pos].startswith(term):
+            words.append(self._prefixes[pos])
+            pos += 1
+        return words
+
+    def _infix_words(self, term):
+        grams = trigrams(term)
+        if not grams:
+            return []
+        postings = sorted((self._trigrams.get(g, set()) for g in grams), key=len)
+        return [word for word in set.intersection(*postings)
+                if term in word and not word.startswith(term)]
+
+    def _fuzzy_words(self, term):
+        # Two strings within one edit share a single-deletion variant
+        candidates = set()
+        for variant in deletes(term):
+            candidates |= self._deletes.get(variant, set())
+        return [word for word in candidates if edit_distance(term, word, 1) <= 1]
+
+    def _id_prefix(self, digits, limit):
+        # emp_id prefix: 12 -> 12, 120..129, 1200..1299, ...
+        base, span, found = int(digits), 1, []
+        while 0 < base <= self._max_id and len(found) < (limit or 1000):
+            found.extend(i for i in range(base, base + span) if i in self._docs)
+            base, span = base * 10, span * 10
+        return found[:limit] if limit else found
+
+    def search(self, query, limit=None):
+        """Return matching emp_ids, prefix matches first, then infix, then fuzzy."""
+        q = normalize(query)
+        if not q:
+            return []
+        with self._lock:
+            if q.isdigit():
+                return self._id_prefix(q, limit)
+
+            terms = q.split()
+            prefix = matched = None
+            for term in terms:
+                prefix_ids = self._ids(self._prefix_words(term))
+                term_ids = prefix_ids | self._ids(self._infix_words(term))
+                prefix = prefix_ids if prefix is None else prefix & prefix_ids
+                matched = term_ids if matched is None else matched & term_ids
+            results = sorted(prefix) + sorted(matched - prefix)
+            if results and (not limit or len(results) >= limit):
+                return results[:limit] if limit else results
+
+            fuzzy = None
+            for term in terms:
+                term_ids = self._ids(self._fuzzy_words(term))
+                fuzzy = term_ids if fuzzy is None else fuzzy & term_ids
+            results.extend(sorted(fuzzy - matched))
+            return results[:limit] if limit else results
+
+    def describe(self, emp_id):
+        doc = self._docs.get(emp_id)
+        if doc is None:
+            return None
+        return {"emp_id": emp_id, "name": doc[1], "department": doc[2]}
+
+    def __len__(self):
+        return len(self._docs)
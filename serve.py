@@ -0,0 +1,129 @@
+"""Production launcher: gunicorn settings built from ``Config``.
+
+    python serve.py                             # gunicorn with the SERVER_* settings
+    gunicorn -c serve.py 'serve:load_app()'     # same settings, gunicorn's own CLI
+
+Worker classes:
+
+- ``gthread`` (default): SERVER_THREADS threads per process, each blocking
+  on MySQL in its own thread. Threads default to DB_POOL_MAX_SIZE so a
+  thread never waits on the pool.
+- ``gevent``: PyMySQL is pure Python, so once gevent patches the socket
+  module every query yields; one process holds SERVER_WORKER_CONNECTIONS
+  in-flight requests and they share DB_POOL_MAX_SIZE connections. Needs the
+  ``gevent`` package.
+
+Pools, caches and the search index are per process; run more than one
+worker with CACHE_BACKEND=redis so invalidations reach every process.
+
+With SERVER_PRELOAD (default) the master builds the app and compiles the
+templates once before forking, so workers start serving without paying for
+imports and share those pages copy-on-write. This is safe because the app
+holds no connections until a request needs one (see resources.py).
+"""
+import gc
+import multiprocessing
+import sys
+
+from config import Config
+
+WORKER_CLASSES = {"sync", "gthread", "gevent"}
+
+
+def _worker_count():
+    return Config.SERVER_WORKERS or multiprocessing.cpu_count() * 2 + 1
+
+
+def settings():
+    """gunicorn settings for the configured worker class."""
+    worker_class = Config.SERVER_WORKER_CLASS
+    if worker_class not in WORKER_CLASSES:
+        raise RuntimeError(f"SERVER_WORKER_CLASS must be one of {', '.join(sorted(WORKER_CLASSES))}")
+    options = {
+        "bind": Config.SERVER_BIND,
+        "workers": _worker_count(),
+        "worker_class": worker_class,
+        "backlog": Config.SERVER_BACKLOG,
+        "timeout": Config.SERVER_TIMEOUT,
+        "graceful_timeout": Config.SERVER_TIMEOUT,
+        "keepalive": Config.SERVER_KEEPALIVE,
+        "max_requests": Config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": Config.SERVER_MAX_REQUESTS // 10,
+        # Pools and caches are created after the fork, on first use in each worker
+        "preload_app": Config.SERVER_PRELOAD,
+        "accesslog": Config.SERVER_ACCESS_LOG or None,
+    }
+    if worker_class == "gthread":
+        options["threads"] = Config.SERVER_THREADS or Config.DB_POOL_MAX_SIZE
+    elif worker_class == "gevent":
+        options["worker_connections"] = Config.SERVER_WORKER_CONNECTIONS
+    return options
+
+
+def _page_cache_unshared(workers):
+    # Table versions would live in each worker: after a POST in one, the
+    # redirect served by another could get its stale page or a 304
+    return workers > 1 and Config.CACHE_BACKEND == "memory" and Config.PAGE_CACHE_ENABLED
+
+
+def config_warnings(options):
+    found = []
+    if options.get("threads", 1) > Config.DB_POOL_MAX_SIZE:
+        found.append(f"{options['threads']} threads share {Config.DB_POOL_MAX_SIZE} pooled connections "
+                     "(DB_POOL_MAX_SIZE); requests will queue for a connection")
+    if options["workers"] > 1 and Config.CACHE_BACKEND == "memory":
+        found.append("CACHE_BACKEND=memory with several workers: cached counts are per process "
+                     "and only converge after their TTL")
+    if _page_cache_unshared(options["workers"]):
+        found.append("CACHE_BACKEND=memory with several workers: the page cache is turned off, "
+                     "use CACHE_BACKEND=redis to keep it")
+    if options["workers"] > 1 and Config.SESSION_BACKEND == "memory":
+        found.append("SESSION_BACKEND=memory with several workers: a session only exists in the "
+                     "worker that created it; use sqlite or redis")
+    return found
+
+
+def load_app():
+    """The app for gunicorn; with SERVER_PRELOAD this runs once, in the master."""
+    from app import create_app
+
+    app = create_app()
+    if _page_cache_unshared(_worker_count()):
+        app.config["PAGE_CACHE_ENABLED"] = False
+    if Config.SERVER_PRELOAD:
+        # Compile every template now instead of in each worker's first requests
+        for name in app.jinja_env.list_templates(extensions=["html"]):
+            app.jinja_env.get_template(name)
+        # Keep the objects built so far out of the collector, so it does not
+        # touch (and un-share) their pages in the forked workers
+        gc.freeze()
+    return app
+
+
+# gunicorn reads module-level names when this file is passed with -c
+globals().update(settings())
+
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as exc:
+        raise SystemExit("serve.py requires the 'gunicorn' package") from exc
+
+    options = settings()
+    for message in config_warnings(options):
+        print(f"warning: {message}", file=sys.stderr)
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    Server().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Server-side sessions and the per-session login snapshot.
+
+The session cookie only carries a random id; the session itself lives in a
+store with the cache interface (``get``/``set``/``delete``): the
+in-process ``LRUCache``, a SQLite file shared by the workers of one host,
+or a Redis-compatible server. ``SESSION_BACKEND=cookie`` keeps Flask's
+signed cookie sessions.
+
+At login the session takes a snapshot of the user's login and profile row
+together with the employee's ``status_version`` (migration 0007, bumped on
+every employee edit). Pages read the snapshot instead of the database. It
+is checked every SESSION_REVALIDATE_SECONDS, and sooner when an edit marks
+the employee as changed in the shared cache: the check reads the
+employee's status and version, ends the session of a deleted or
+deactivated employee, and reloads the snapshot only when the version
+differs. With a per-process cache an edit made in another worker is seen
+within SESSION_REVALIDATE_SECONDS.
+"""
+import copy
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from cache import LRUCache, RedisCache
+
+EMPLOYEE_CHANGED_KEY = "employee:changed:{}"
+SESSION_KEY = "session:{}"
+BACKENDS = ("cookie", "memory", "sqlite", "redis")
+# Profile fields kept in the session for the staff dashboard
+PROFILE_FIELDS = ("first_name", "last_name", "department", "email")
+
+
+# ---------- Stores ----------
+class SQLiteSessionStore:
+    """Sessions in a local SQLite file, with the cache interface used by the other stores.
+
+    Expired rows are skipped on read and purged about once per PURGE_INTERVAL.
+    """
+
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, path, default_ttl=3600):
+        self.path = path
+        self.default_ttl = default_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._purged_at = 0.0
+        self._db().execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def _db(self):
+        # One sqlite3 connection per thread; sqlite handles the cross-process locking
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        row = self._db().execute("SELECT value, expires_at FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        self._db().execute("INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                           (key, json.dumps(value), now + ttl))
+        if now - self._purged_at >= self.PURGE_INTERVAL:
+            self.purge()
+
+    def delete(self, *keys):
+        if keys:
+            self._db().execute(f"DELETE FROM sessions WHERE key IN ({', '.join('?' * len(keys))})", keys)
+
+    def purge(self):
+        """Remove expired sessions; returns how many."""
+        self._purged_at = time.time()
+        return self._db().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+def store_from_config(config):
+    """The session store for SESSION_BACKEND, or None for cookie sessions."""
+    backend = config.SESSION_BACKEND
+    if backend == "cookie":
+        return None
+    if backend == "memory":
+        return LRUCache(max_entries=config.SESSION_MAX_ENTRIES, default_ttl=config.SESSION_TTL)
+    if backend == "sqlite":
+        return SQLiteSessionStore(config.SESSION_SQLITE_PATH, default_ttl=config.SESSION_TTL)
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package") from exc
+        return RedisCache(redis.Redis.from_url(config.SESSION_REDIS_URL),
+                          prefix=config.CACHE_KEY_PREFIX, default_ttl=config.SESSION_TTL)
+    raise RuntimeError(f"SESSION_BACKEND must be one of {', '.join(BACKENDS)}")
+
+
+# ---------- Flask session interface ----------
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, saved_at=0.0):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.saved_at = saved_at
+        self.stale_sid = None
+        self.modified = False
+
+    def regenerate(self):
+        """New id for the same data (call at login, against session fixation)."""
+        if self.sid:
+            self.stale_sid = self.sid
+        self.sid = None
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """Keeps session data in the store from ``get_store()``; the cookie holds only the session id.
+
+    The store is looked up per request, so it can be created lazily in each
+    worker process. Unmodified sessions are written back once per
+    ``refresh`` seconds so an active user's session does not expire after
+    ``ttl``.
+    """
+
+    def __init__(self, get_store, ttl, refresh=300):
+        self.get_store = get_store
+        self.ttl = ttl
+        self.refresh = refresh
+
+    @property
+    def store(self):
+        return self.get_store()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            saved = self.store.get(SESSION_KEY.format(sid))
+            if saved is not None:
+                # A copy: the in-process store hands out the stored dict itself
+                return ServerSession(copy.deepcopy(saved["data"]), sid, saved["saved_at"])
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.stale_sid:
+            self.store.delete(SESSION_KEY.format(session.stale_sid))
+        if not session:
+            if session.sid:
+                self.store.delete(SESSION_KEY.format(session.sid))
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        now = time.time()
+        if not session.modified and session.sid and now - session.saved_at < self.refresh:
+            return
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        self.store.set(SESSION_KEY.format(session.sid), {"data": dict(session), "saved_at": now}, self.ttl)
+        response.vary.add("Cookie")
+        response.set_cookie(name, session.sid, max_age=self.ttl, domain=domain, path=path,
+                            secure=self.get_cookie_secure(app), httponly=self.get_cookie_httponly(app),
+                            samesite=self.get_cookie_samesite(app))
+
+
+def session_interface_from_config(config, get_store):
+    """``get_store()`` returns the ``store_from_config()`` store of the current process."""
+    if config.SESSION_BACKEND not in BACKENDS:
+        raise RuntimeError(f"SESSION_BACKEND must be one of {', '.join(BACKENDS)}")
+    if config.SESSION_BACKEND == "cookie":
+        return SecureCookieSessionInterface()
+    return ServerSessionInterface(get_store, config.SESSION_TTL)
+
+
+def regenerate(session):
+    # Cookie sessions carry no id to fixate
+    if isinstance(session, ServerSession):
+        session.regenerate()
+
+
+# ---------- Login snapshot ----------
+def store_snapshot(session, user, now=None):
+    """Put ``user`` (a ``repositories.LoginUser``) into the session."""
+    session["user_id"] = user.user_id
+    session["username"] = user.username
+    session["role"] = user.emp_role or user.role
+    session["emp_id"] = user.emp_id
+    session["status_version"] = user.status_version
+    session["profile"] = {field: getattr(user, field) for field in PROFILE_FIELDS}
+    session["profile"]["user_role"] = user.role
+    session["validated_at"] = time.time() if now is None else now
+
+
+def snapshot_outdated(session, status_version):
+    """True when the employee was edited after the snapshot was taken."""
+    return session.get("status_version") != status_version
+
+
+def mark_validated(session, now=None):
+    session["validated_at"] = time.time() if now is None else now
+
+
+def employee_changed(cache, ttl, *emp_ids):
+    """Make the sessions of ``emp_ids`` re-check the database on their next request.
+
+    ``ttl`` only needs to cover the revalidation interval: past it, every
+    session checks anyway.
+    """
+    now = time.time()
+    for emp_id in emp_ids:
+        cache.set(EMPLOYEE_CHANGED_KEY.format(emp_id), now, ttl)
+
+
+def needs_check(session, cache, interval, now=None):
+    """True when the snapshot is older than ``interval`` or than the employee's last change.
+
+    Only decides when to look; ``snapshot_outdated()`` compares what was found.
+    """
+    now = time.time() if now is None else now
+    validated_at = session.get("validated_at", 0)
+    if now - validated_at >= interval:
+        return True
+    changed_at = cache.get(EMPLOYEE_CHANGED_KEY.format(session.get("emp_id")))
+    return changed_at is not None and changed_at >= validated_at
@@ -0,0 +1,38 @@
+"""The staff dashboard."""
+from datetime import date, timedelta
+
+from flask import Blueprint, render_template, redirect, url_for, flash, session
+
+from repositories import AttendanceRepo
+from web import get_db_connection, login_required
+
+bp = Blueprint("staff", __name__)
+
+# ---------- Staff Routes ----------
+@bp.route("/staff_dashboard")
+@login_required
+def staff_dashboard():
+    if session.get("role") != "staff":
+        flash("Access denied!", "warning")
+        return redirect(url_for("auth.login"))
+
+    emp_id = session.get("emp_id")
+    if not emp_id:
+        flash("Session expired. Please login again.", "warning")
+        return redirect(url_for("auth.login"))
+
+    # The profile comes from the session snapshot taken at login
+    user_info = session.get("profile")
+    if not user_info:
+        flash("User data not found.", "warning")
+        return redirect(url_for("auth.login"))
+
+    # Last two months first, so only their partitions are read; the whole
+    # history only for employees with fewer rows than that
+    attendance_repo = AttendanceRepo(get_db_connection())
+    month_start = date.today().replace(day=1)
+    attendance_records = attendance_repo.recent(emp_id, limit=10, since=(month_start - timedelta(days=1)).replace(day=1))
+    if len(attendance_records) < 10:
+        attendance_records = attendance_repo.recent(emp_id, limit=10)
+
+    return render_template("staff/dashboard.html", user=user_info, attendance=attendance_records)
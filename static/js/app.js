@@ -1,27 +1,403 @@
 // app.js - Clean version
 document.addEventListener('DOMContentLoaded', function () {
   
-  // Export CSV button
-  const exportBtn = document.getElementById('export-csv');
-  if (exportBtn) {
-    exportBtn.addEventListener('click', function () {
-      alert('Export to CSV (UI placeholder). Implement server-side export endpoint.');
-    });
-  }
-
-  // Delete confirmation for all delete forms
-  const deleteForms = document.querySelectorAll('form.delete-form, form[action*="/delete"]');
-  deleteForms.forEach(function (form) {
-    form.addEventListener('submit', function (e) {
-      const message = form.classList.contains('delete-form') 
-        ? 'Are you sure you want to delete this employee?'
-        : 'Are you sure you want to delete this record?';
-      
-      if (!confirm(message)) {
-        e.preventDefault();
-        e.stopPropagation();
+  // Employee ID autocomplete (admin attendance / salary filters)
+  document.querySelectorAll('input[data-autocomplete]').forEach(function (input) {
+    const list = document.getElementById(input.getAttribute('list'));
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (!q || !list) {
+        return;
       }
+      timer = setTimeout(function () {
+        if (controller) {
+          controller.abort();
+        }
+        controller = new AbortController();
+        fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(q), { signal: controller.signal })
+          .then(function (response) { return response.ok ? response.json() : []; })
+          .then(function (items) {
+            list.innerHTML = '';
+            items.forEach(function (item) {
+              const option = document.createElement('option');
+              option.value = item.emp_id;
+              option.label = item.name + (item.department ? ' (' + item.department.toUpperCase() + ')' : '');
+              list.appendChild(option);
+            });
+          })
+          .catch(function () {});
+      }, 150);
     });
   });
 
-});
\ No newline at end of file
+  // Delete confirmation for all delete forms (delegated, rows may be replaced below)
+  document.addEventListener('submit', function (e) {
+    const form = e.target;
+    if (!form.matches('form.delete-form, form[action*="/delete"]')) {
+      return;
+    }
+    const message = form.classList.contains('delete-form') 
+      ? 'Are you sure you want to delete this employee?'
+      : 'Are you sure you want to delete this record?';
+    
+    if (!confirm(message)) {
+      e.preventDefault();
+      e.stopPropagation();
+    }
+  });
+
+  // Admin tables: filters and pagination fetch /api/v1 and patch the table in place
+  document.querySelectorAll('section[data-api]').forEach(enhanceTable);
+
+  // Attendance analytics: heatmap and tables from the cached JSON
+  document.querySelectorAll('[data-analytics]').forEach(loadAnalytics);
+
+});
+
+// "{emp_id}", "{department:upper}", "{net:money}" -> text for one row
+function fillTemplate(text, values) {
+  return text.replace(/\{(\w+)(?::(\w+))?\}/g, function (_, name, format) {
+    let value = values[name];
+    value = value === null || value === undefined ? '' : String(value);
+    if (format === 'upper') {
+      return value.toUpperCase();
+    }
+    if (format === 'lower') {
+      return value.toLowerCase();
+    }
+    if (format === 'capitalize') {
+      return value.charAt(0).toUpperCase() + value.slice(1).toLowerCase();
+    }
+    if (format === 'money') {
+      return (Number(value) || 0).toFixed(2);
+    }
+    return value;
+  });
+}
+
+function enhanceTable(section) {
+  const table = section.querySelector('table');
+  const template = table && table.querySelector('template[data-row]');
+  const tbody = table && table.querySelector('tbody');
+  if (!template || !tbody || !window.fetch || !window.history.pushState) {
+    return;
+  }
+  const pageUrl = window.location.pathname;
+  const columns = table.querySelectorAll('thead th').length;
+
+  // Only the fields the row template uses are requested
+  const fields = new Set();
+  template.innerHTML.replace(/\{(\w+)(?::\w+)?\}/g, function (_, name) {
+    fields.add(name);
+  });
+
+  let controller = null;
+
+  function load(query, push) {
+    if (controller) {
+      controller.abort();
+    }
+    controller = new AbortController();
+    const params = new URLSearchParams(query);
+    params.set('fields', Array.from(fields).join(','));
+    params.set('compact', '1');
+    const target = pageUrl + (query ? '?' + query : '');
+
+    fetch(section.dataset.api + '?' + params, {
+      signal: controller.signal,
+      headers: { 'Accept': 'application/json' },
+      credentials: 'same-origin'
+    })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error('HTTP ' + response.status);
+        }
+        return response.json();
+      })
+      .then(function (data) {
+        // The summary block differs per mode, let the server render that change
+        if (section.dataset.mode && data.mode !== section.dataset.mode) {
+          window.location.assign(target);
+          return;
+        }
+        patch(data);
+        if (push) {
+          window.history.pushState({ api: true }, '', target);
+        }
+      })
+      .catch(function (err) {
+        if (err.name !== 'AbortError') {
+          window.location.assign(target);
+        }
+      });
+  }
+
+  function patch(data) {
+    const rows = data.rows.map(function (values) {
+      const row = {};
+      data.fields.forEach(function (field, i) { row[field] = values[i]; });
+      return row;
+    });
+
+    const body = document.createDocumentFragment();
+    rows.forEach(function (row) {
+      const tr = template.content.firstElementChild.cloneNode(true);
+      tr.querySelectorAll('*').forEach(function (el) {
+        Array.from(el.attributes).forEach(function (attr) {
+          if (attr.name.indexOf('data-bind-') === 0) {
+            el.setAttribute(attr.name.slice(10), fillTemplate(attr.value, row));
+          }
+        });
+        if (el.hasAttribute('data-text')) {
+          el.textContent = fillTemplate(el.getAttribute('data-text'), row);
+        }
+      });
+      body.appendChild(tr);
+    });
+    if (!rows.length) {
+      const tr = document.createElement('tr');
+      const td = document.createElement('td');
+      td.colSpan = columns;
+      td.className = 'no-data';
+      td.textContent = table.dataset.empty || '';
+      tr.appendChild(td);
+      body.appendChild(tr);
+    }
+    tbody.replaceChildren(body);
+
+    const context = Object.assign({}, data, data.filters, data.summary);
+    section.querySelectorAll('[data-summary]').forEach(function (el) {
+      el.textContent = fillTemplate(el.dataset.summary, context);
+    });
+    section.querySelectorAll('[data-summary-href]').forEach(function (el) {
+      el.href = fillTemplate(el.dataset.summaryHref, context);
+    });
+    section.querySelectorAll('[data-show-if]').forEach(function (el) {
+      el.hidden = !context[el.dataset.showIf];
+    });
+
+    // Keep the filter inputs and export links in step (back/forward navigation)
+    const filters = data.filters || {};
+    section.querySelectorAll('form[method="get"]').forEach(function (form) {
+      Object.keys(filters).forEach(function (name) {
+        const input = form.elements[name];
+        if (input) {
+          input.value = filters[name] === null ? '' : filters[name];
+        }
+      });
+    });
+    section.querySelectorAll('a[data-sync-query]').forEach(function (link) {
+      const url = new URL(link.href);
+      Object.keys(filters).forEach(function (name) {
+        url.searchParams.set(name, filters[name] === null ? '' : filters[name]);
+      });
+      link.href = url.toString();
+    });
+
+    const pagination = section.querySelector('[data-pagination]');
+    if (pagination) {
+      pagination.replaceChildren(renderPagination(pagination.dataset.pagination, data));
+    }
+  }
+
+  section.addEventListener('submit', function (e) {
+    const form = e.target;
+    if ((form.getAttribute('method') || '').toLowerCase() !== 'get') {
+      return;
+    }
+    e.preventDefault();
+    load(new URLSearchParams(new FormData(form)).toString(), true);
+  });
+
+  section.addEventListener('click', function (e) {
+    const link = e.target.closest('[data-pagination] a');
+    if (!link || e.ctrlKey || e.metaKey || e.shiftKey || e.button !== 0) {
+      return;
+    }
+    e.preventDefault();
+    load(new URL(link.href).search.slice(1), true);
+  });
+
+  window.addEventListener('popstate', function () {
+    load(window.location.search.slice(1), false);
+  });
+}
+
+// Same links as the pagination blocks in the admin templates
+function renderPagination(style, data) {
+  const fragment = document.createDocumentFragment();
+  const filters = {};
+  Object.keys(data.filters || {}).forEach(function (name) {
+    filters[name] = data.filters[name] === null ? '' : data.filters[name];
+  });
+
+  const box = document.createElement('div');
+  box.className = 'pagination';
+
+  function link(className, label, params) {
+    const a = document.createElement('a');
+    a.className = className;
+    a.href = '?' + new URLSearchParams(Object.assign(params, filters));
+    a.textContent = label;
+    box.appendChild(a);
+  }
+
+  function span(className, label) {
+    const s = document.createElement('span');
+    s.className = className;
+    s.textContent = label;
+    box.appendChild(s);
+  }
+
+  if (style === 'simple') {
+    if (data.pages <= 1) {
+      return fragment;
+    }
+    if (data.page > 1) {
+      link('page-nav', '\u00ab Prev', { page: data.page - 1 });
+    }
+    span('page-number active', data.page + ' / ' + data.pages);
+    if (data.page < data.pages) {
+      link('page-nav', 'Next \u00bb', { page: data.page + 1 });
+    }
+  } else if (data.page) {
+    if (data.pages <= 1) {
+      return fragment;
+    }
+    const first = data.page_range[0];
+    const last = data.page_range[1];
+    if (data.page > 1) {
+      link('page-nav', '\u00ab Prev', { page: data.page - 1 });
+    }
+    if (first > 1) {
+      link('page-number', '1', { page: 1 });
+      if (first > 2) {
+        span('page-dots', '...');
+      }
+    }
+    for (let p = first; p <= last; p++) {
+      link('page-number' + (p === data.page ? ' active' : ''), String(p), { page: p });
+    }
+    if (last < data.pages) {
+      if (last < data.pages - 1) {
+        span('page-dots', '...');
+      }
+      link('page-number', String(data.pages), { page: data.pages });
+    }
+    if (data.next_cursor) {
+      link('page-nav', 'Next \u00bb', { after_id: data.next_cursor });
+    } else if (data.page < data.pages) {
+      link('page-nav', 'Next \u00bb', { page: data.page + 1 });
+    }
+  } else {
+    // Keyset pages past EMPLOYEE_MAX_OFFSET_PAGE
+    link('page-number', '1', { page: 1 });
+    if (data.prev_cursor) {
+      link('page-nav', '\u00ab Prev', { before_id: data.prev_cursor });
+    }
+    if (data.next_cursor) {
+      link('page-nav', 'Next \u00bb', { after_id: data.next_cursor });
+    }
+  }
+  fragment.appendChild(box);
+  return fragment;
+}
+
+function loadAnalytics(box) {
+  const status = box.querySelector('[data-analytics-status]');
+  fetch(box.dataset.analytics, { headers: { 'Accept': 'application/json' }, credentials: 'same-origin' })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error('HTTP ' + response.status);
+      }
+      return response.json();
+    })
+    .then(function (data) {
+      status.textContent = data.start + ' \u2014 ' + data.end + ': ' + data.rows + ' records';
+      renderHeatmap(box.querySelector('[data-heatmap]'), data);
+      renderDepartments(box.querySelector('[data-departments]'), data.departments);
+      renderEmployees(box.querySelector('[data-employees]'), data.employees);
+    })
+    .catch(function (err) {
+      status.textContent = 'Could not load analytics (' + err.message + ')';
+    });
+}
+
+function heatCell(rate, title) {
+  const cell = document.createElement('span');
+  cell.className = 'heat-cell ' + (rate === null ? 'heat-empty' : 'heat-' + Math.min(4, Math.floor(rate * 5)));
+  cell.title = title;
+  return cell;
+}
+
+// One column per week, Monday on top
+function renderHeatmap(grid, data) {
+  grid.replaceChildren();
+  const first = new Date(data.start + 'T00:00:00');
+  for (let i = 0; i < (first.getDay() + 6) % 7; i++) {
+    grid.appendChild(document.createElement('span'));
+  }
+  data.daily.rows.forEach(function (row) {
+    const total = row[1] + row[2] + row[3];
+    const title = row[0] + ': ' + row[1] + ' present, ' + row[2] + ' absent, ' + row[3] + ' leave';
+    grid.appendChild(heatCell(total ? row[1] / total : null, title));
+  });
+}
+
+function renderDepartments(tbody, departments) {
+  tbody.replaceChildren();
+  departments.forEach(function (dept) {
+    const tr = document.createElement('tr');
+    const name = document.createElement('td');
+    name.textContent = (dept.department || '-').toUpperCase();
+    const weeks = document.createElement('td');
+    weeks.className = 'heat-row';
+    dept.weeks.forEach(function (week) {
+      const rate = week.attendance_rate;
+      const title = 'Week of ' + week.week_start + ': ' +
+        (rate === null ? 'no records' : Math.round(rate * 100) + '% present') +
+        (week.avg_hours === null ? '' : ', ' + week.avg_hours + ' h avg');
+      weeks.appendChild(heatCell(rate, title));
+    });
+    tr.append(name, weeks);
+    tbody.appendChild(tr);
+  });
+}
+
+function renderEmployees(tbody, employees) {
+  tbody.replaceChildren();
+  if (!employees.length) {
+    const tr = document.createElement('tr');
+    const td = document.createElement('td');
+    td.colSpan = 10;
+    td.className = 'no-data';
+    td.textContent = 'No attendance records found';
+    tr.appendChild(td);
+    tbody.appendChild(tr);
+    return;
+  }
+  employees.forEach(function (emp) {
+    const tr = document.createElement('tr');
+    [
+      emp.emp_id,
+      emp.name,
+      (emp.department || '').toUpperCase(),
+      emp.present,
+      emp.absent,
+      emp.leave,
+      emp.on_time_rate === null ? '-' : Math.round(emp.on_time_rate * 100) + '%',
+      emp.avg_hours === null ? '-' : emp.avg_hours.toFixed(2),
+      emp.longest_absence_streak,
+      emp.current_absence_streak
+    ].forEach(function (value) {
+      const td = document.createElement('td');
+      td.textContent = value;
+      tr.appendChild(td);
+    });
+    tbody.appendChild(tr);
+  });
+}
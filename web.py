@@ -0,0 +1,313 @@
+"""Request plumbing shared by the blueprints and the CLI.
+
+``cache``, ``db_pool`` and ``search_index`` are proxies to the current app's
+per-process resources (see resources.py); resources that may be disabled
+(metrics, replicas, the punch journal) are read through ``resources()``.
+"""
+import atexit
+import threading
+import time
+from datetime import date
+from functools import partial, wraps
+
+from flask import (current_app, flash, g, has_request_context, jsonify, make_response, redirect, request, Response,
+                   session, url_for)
+from werkzeug.local import LocalProxy
+
+import dashboard
+import instrumentation
+import page_cache
+import partitions
+import punch_journal
+import punches
+import sessions
+from repositories import UserRepo
+
+EXTENSION_KEY = "mini_erp"
+
+
+def resources():
+    return current_app.extensions[EXTENSION_KEY]
+
+
+cache = LocalProxy(lambda: resources().cache)
+db_pool = LocalProxy(lambda: resources().db_pool)
+search_index = LocalProxy(lambda: resources().search_index)
+
+
+# ---------- Helper Functions ----------
+def get_db_connection():
+    # One pooled connection per request, handed back in close_db_connection()
+    if "db_conn" not in g:
+        g.db_conn = db_pool.acquire()
+    return g.db_conn
+
+def close_db_connection(exc):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        db_pool.release(conn)
+    read = g.pop("read_conn", None)
+    if read is not None:
+        pool, conn = read
+        pool.release(conn)
+
+def money(value):
+    # format() keeps Decimal exact, "%.2f" would round through float
+    return format(value or 0, ".2f")
+
+# ---------- Instrumentation ----------
+# Only registered when METRICS_ENABLED or SERVER_TIMING is set; otherwise
+# requests and connections run without any hooks.
+def start_request_metrics():
+    g.metrics_token = resources().metrics.begin_request()
+
+def finish_request_metrics(response):
+    token = g.pop("metrics_token", None)
+    if token is not None:
+        stats = resources().metrics.end_request(token, request.endpoint, request.method, response.status_code)
+        if stats and current_app.config["SERVER_TIMING"]:
+            response.headers["Server-Timing"] = instrumentation.server_timing(stats)
+    return response
+
+# ---------- Read Replicas ----------
+# Report pages read through get_read_connection(); everything else, and every
+# write, stays on the primary. With no DB_REPLICAS both are the same pool.
+def remember_write():
+    # Called by the write paths (tables_changed, punch imports): pins this user's reads to the primary for a while
+    if has_request_context() and "user_id" in session:
+        session["wrote_at"] = time.time()
+
+def read_pool():
+    """``(replica, pool)`` for a report read; ``(None, db_pool)`` means the primary.
+
+    The primary serves users within DB_READ_YOUR_WRITES_SECONDS of their own
+    write, and cached pages whose tables changed within DB_REPLICA_MAX_LAG:
+    a lagging replica's answer would stay cached under the new version.
+    """
+    replicas = resources().replicas
+    primary = resources().db_pool
+    if replicas is None:
+        return None, primary
+    if time.time() - session.get("wrote_at", 0) < current_app.config["DB_READ_YOUR_WRITES_SECONDS"]:
+        return None, primary
+    versions = g.get("page_versions")
+    if versions and time.time_ns() - max(versions.values()) < current_app.config["DB_REPLICA_MAX_LAG"] * 10**9:
+        return None, primary
+    replica = replicas.choose()
+    if replica is None:
+        return None, primary
+    return replica, replica.pool
+
+def get_read_connection():
+    if "read_conn" in g:
+        return g.read_conn[1]
+    replica, pool = read_pool()
+    if replica is None:
+        return get_db_connection()
+    try:
+        conn = pool.acquire()
+    except Exception as exc:
+        resources().replicas.mark_failed(replica, exc)
+        return get_db_connection()
+    g.read_conn = (pool, conn)
+    return conn
+
+def get_stream_connection():
+    """The read connection for a streamed response, holding nothing else.
+
+    Checked out before the response starts, so a failing replica falls back
+    to the primary instead of breaking the stream. A primary connection the
+    request took earlier (archived_years() on a cache miss) goes back to the
+    pool first unless it is the read connection itself; the stream keeps the
+    request context, and close_db_connection() releases the rest.
+    """
+    conn = get_read_connection()
+    if "read_conn" in g:
+        primary = g.pop("db_conn", None)
+        if primary is not None:
+            db_pool.release(primary)
+    return conn
+
+# ---------- Page Caching ----------
+# Admin list pages and their /api/v1 twins are cached by URL, user and the
+# change versions of the tables they read; write paths call tables_changed()
+# to move those versions.
+def tables_changed(*tables):
+    page_cache.bump(cache, current_app.config["PAGE_CACHE_TTL"], *tables)
+    remember_write()
+
+def cached_page(*tables):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            config = current_app.config
+            # Pending flash messages are part of the page, so those renders bypass the cache
+            if not config["PAGE_CACHE_ENABLED"] or session.get("_flashes"):
+                return f(*args, **kwargs)
+
+            versions = page_cache.versions(cache, tables, config["PAGE_CACHE_TTL"])
+            g.page_versions = versions
+            tag = page_cache.etag(request.endpoint, request.args, session.get("user_id"), versions, date.today())
+            headers = {
+                "ETag": f'"{tag}"',
+                "Last-Modified": page_cache.last_modified(versions),
+                "Cache-Control": "private, no-cache",
+            }
+            if request.if_none_match:
+                # Weak comparison: compressed API responses carry W/"..."
+                if request.if_none_match.contains_weak(tag):
+                    return Response(status=304, headers=headers)
+            elif request.if_modified_since and request.if_modified_since.timestamp() >= max(versions.values()) // 10**9:
+                return Response(status=304, headers=headers)
+
+            cached = cache.get(page_cache.page_key(tag))
+            if cached is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or session.get("_flashes"):
+                    return response
+                cached = [response.get_data(as_text=True), response.mimetype]
+                cache.set(page_cache.page_key(tag), cached, config["PAGE_CACHE_TTL"])
+            body, mimetype = cached
+            return Response(body, mimetype=mimetype, headers=headers)
+        return decorated_function
+    return decorator
+
+# Directory counts share the employees version, so any employee write invalidates every filter
+def _employee_count_key(key):
+    version = page_cache.versions(cache, ("employees",), current_app.config["PAGE_CACHE_TTL"])["employees"]
+    q, department = key
+    return f"employees:count:{version}:{department}:{q}"
+
+def get_cached_employee_count(key):
+    return cache.get(_employee_count_key(key))
+
+def set_cached_employee_count(key, total):
+    cache.set(_employee_count_key(key), total, current_app.config["EMPLOYEE_COUNT_TTL"])
+
+ARCHIVED_YEARS_KEY = "archived_years"
+
+def archived_years(table):
+    # Closed years moved out by `flask db archive`; their reports read the archive tables
+    found = cache.get(ARCHIVED_YEARS_KEY)
+    if found is None:
+        found = partitions.archived_years(get_db_connection())
+        # Kept briefly: an archive run from the CLI cannot reach per-process caches
+        cache.set(ARCHIVED_YEARS_KEY, found, current_app.config["ARCHIVED_YEARS_TTL"])
+    return found.get(table, [])
+
+# ---------- Sessions ----------
+# Logged-in sessions carry a snapshot of the login and profile rows (see
+# sessions.py). When it may be stale, one indexed lookup compares the
+# employee's status and status_version; the full rows are re-read only when
+# the version moved.
+def revalidate_session():
+    if request.endpoint == "static" or "user_id" not in session:
+        return
+    if not sessions.needs_check(session, cache, current_app.config["SESSION_REVALIDATE_SECONDS"]):
+        return
+    repo = UserRepo(get_db_connection())
+    state = repo.session_state(session["user_id"])
+    if state is None or state.status != "active":
+        # Deleted or deactivated since login: the access decorators now see no user
+        session.clear()
+        return
+    if not sessions.snapshot_outdated(session, state.status_version):
+        sessions.mark_validated(session)
+        return
+    user = repo.session_user(session["user_id"])
+    if user is None or user.status != "active":
+        session.clear()
+        return
+    sessions.store_snapshot(session, user)
+
+# ---------- Decorators for Access Control ----------
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session:
+            flash("Please login first", "warning")
+            return redirect(url_for("auth.login"))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session or session.get("role") != "admin":
+            flash("Access denied!", "warning")
+            return redirect(url_for("auth.login"))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_admin_required(f):
+    # JSON errors instead of a redirect to the login page
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session:
+            return jsonify(error="Login required"), 401
+        if session.get("role") != "admin":
+            return jsonify(error="Access denied"), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+# ---------- Punches and Payroll ----------
+# Shared by the routes and the CLI commands
+def import_punches(rows):
+    report = punches.import_events(get_db_connection(), rows,
+                                   chunk_size=current_app.config["PUNCH_IMPORT_CHUNK_SIZE"])
+    record_punch_report(report)
+    return report
+
+def _apply_punch_report(shared_cache, ttl, report):
+    if report["totals"].get("recorded"):
+        page_cache.bump(shared_cache, ttl, "attendance")
+    for day, count in report["new_present_by_day"].items():
+        dashboard.record_checkin(shared_cache, date.fromisoformat(day), count)
+
+def record_punch_report(report):
+    _apply_punch_report(cache, current_app.config["PAGE_CACHE_TTL"], report)
+    if report["totals"].get("recorded"):
+        remember_write()
+
+def make_journal_drainer():
+    # The drainer thread runs outside any app context: it gets the real objects, not the proxies
+    res = resources()
+    config = current_app.config
+    return punch_journal.JournalDrainer(
+        res.journal,
+        res.db_pool,
+        batch_size=config["ATTENDANCE_JOURNAL_BATCH_SIZE"],
+        interval=config["ATTENDANCE_JOURNAL_INTERVAL"],
+        on_applied=partial(_apply_punch_report, res.cache, config["PAGE_CACHE_TTL"]),
+    )
+
+_drainer_lock = threading.Lock()
+
+def ensure_journal_drainer():
+    # Started on first use, not at startup, so CLI commands and forked workers don't inherit it
+    res = resources()
+    if res.journal_drainer is None and current_app.config["ATTENDANCE_JOURNAL_DRAIN_IN_APP"]:
+        with _drainer_lock:
+            # Concurrent first check-ins would each start a drainer on the same journal
+            if res.journal_drainer is None:
+                res.journal_drainer = make_journal_drainer().start()
+                atexit.register(res.journal_drainer.stop, 5)
+    return res.journal_drainer
+
+def run_payroll(period, departments=None, force=False, workers=None):
+    # payroll pulls in the process pool machinery; only admins starting a run need it
+    import payroll
+
+    config = current_app.config
+    report = payroll.run(
+        get_db_connection(), period,
+        departments=departments,
+        workers=config["PAYROLL_WORKERS"] if workers is None else workers,
+        batch_size=config["PAYROLL_BATCH_SIZE"],
+        bonus_rate=config["PAYROLL_ATTENDANCE_BONUS_RATE"],
+        force=force,
+    )
+    if report["employees"]:
+        tables_changed("salaries")
+        dashboard.record_salaries_changed(cache)
+    return report